@@ -0,0 +1,3 @@
+"""
+Бенчмарки производительности. Запуск: python -m benchmarks.<имя_модуля>
+"""
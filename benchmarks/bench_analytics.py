@@ -0,0 +1,73 @@
+"""
+Анализ 1 000 000 расходов: загрузка в столбцы NumPy за один проход,
+векторные суммы по категориям и периодам против GROUP BY в SQLite
+и циклов Python по строкам
+"""
+
+import collections
+import datetime
+import sqlite3
+
+from bookkeeper.repository import analytics
+from benchmarks.common import report, temp_db, timed
+
+N = 1_000_000
+DAYS = 3650
+TODAY = datetime.date(2024, 6, 6)
+
+
+def fill(db_file: str) -> None:
+    """ Расходы 50 категорий равномерно за DAYS дней до TODAY """
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)',
+            ((i % 1000, i % 50, (TODAY - datetime.timedelta(days=i % DAYS)).isoformat())
+             for i in range(N)))
+
+
+def python_loops(rows: list[tuple[int, int, str]]) -> None:
+    """ Суммы по категориям и месяцам циклом по строкам """
+    by_category: collections.Counter[int] = collections.Counter()
+    by_month: collections.Counter[str] = collections.Counter()
+    for amount, category, date in rows:
+        by_category[category] += amount
+        by_month[date[:7]] += amount
+
+
+def sql_group_by(con: sqlite3.Connection) -> None:
+    """ Суммы по категориям и месяцам запросами к сырым расходам """
+    con.execute('SELECT category, SUM(amount) FROM expense '
+                'GROUP BY category').fetchall()
+    con.execute('SELECT substr(date, 1, 7), SUM(amount) FROM expense '
+                'GROUP BY 1').fetchall()
+
+
+def vectorized(columns: analytics.ExpenseColumns) -> None:
+    """ Все агрегаты модуля analytics """
+    analytics.sums_by_category(columns)
+    for period in analytics.PERIODS:
+        analytics.sums_by_period(columns, period)
+    analytics.rolling_mean(columns, 30)
+    analytics.percentiles(columns)
+    analytics.month_deltas(columns)
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        con = sqlite3.connect(db_file)
+        rows = con.execute('SELECT amount, category, date FROM expense').fetchall()
+        report('python loops, categories and months', timed(
+            lambda: python_loops(rows)), N)
+        report('sql group by, categories and months', timed(
+            lambda: sql_group_by(con)), N)
+        columns = analytics.from_connection(con)
+        report('load columns, one pass', timed(
+            lambda: analytics.from_connection(con)), N)
+        report('numpy, categories, 4 periods, rolling, percentiles, deltas',
+               timed(lambda: vectorized(columns)), N)
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
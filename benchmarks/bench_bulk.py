@@ -0,0 +1,43 @@
+"""
+Импорт 50 000 расходов: add по одному объекту против add_many
+"""
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+N = 50_000
+
+
+def make_expenses() -> list[Expense]:
+    """ Расходы из банковской выписки """
+    return [Expense(i, 1, None, '2024-01-01', 'import') for i in range(N)]
+
+
+def add_each(db_file: str) -> None:
+    """ add с commit на каждый объект """
+    manager = ConnectionManager(db_file)
+    repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    for exp in make_expenses():
+        repo.add(exp)
+    manager.close()
+
+
+def add_many(db_file: str) -> None:
+    """ add_many одной транзакцией """
+    manager = ConnectionManager(db_file)
+    repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    repo.add_many(make_expenses())
+    manager.close()
+
+
+def main() -> None:
+    print(f'{N} expenses')
+    for name, func in (('add', add_each), ('add_many', add_many)):
+        with temp_db() as db_file:
+            report(name, timed(lambda: func(db_file)), N)
+
+
+if __name__ == '__main__':
+    main()
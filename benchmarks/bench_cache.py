@@ -0,0 +1,46 @@
+"""
+Повторные чтения категорий, как при выборе категории в списке и сохранении:
+get по id и get_all по названию напрямую из SQLite против CachedRepository
+"""
+
+import sqlite3
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.cached_repository import CachedRepository
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+CATEGORIES = 1_000
+N = 100_000
+
+
+def fill(db_file: str) -> None:
+    """ Заполнить базу категориями """
+    with sqlite3.connect(db_file) as con:
+        con.executemany('INSERT INTO category (name) VALUES (?)',
+                        ((str(i), ) for i in range(CATEGORIES)))
+
+
+def lookups(repo: SQLiteRepository[Category] | CachedRepository[Category]) -> None:
+    """ N чтений по id и по названию """
+    for i in range(N // 2):
+        repo.get(i % CATEGORIES + 1)
+        repo.get_all({'name': str(i % CATEGORIES)})
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        manager = ConnectionManager(db_file)
+        repo = SQLiteRepository[Category](db_file, Category, manager)
+        report('sqlite', timed(lambda: lookups(repo)), N)
+        cached = CachedRepository[Category](repo, maxsize=2 * CATEGORIES)
+        report('cached, first pass', timed(lambda: lookups(cached)), N)
+        report('cached, warm', timed(lambda: lookups(cached)), N)
+        print(cached.stats)
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+10 000 отложенных правок таблицы расходов: поиск правки той же ячейки
+перебором списка против журнала изменений ChangeJournal.
+Каждая ячейка редактируется дважды.
+"""
+
+from bookkeeper.view.changes import Change, ChangeJournal
+from benchmarks.common import report, timed
+
+N = 10_000
+COLUMNS = ('amount', 'comment')
+
+
+def edits() -> list[tuple[int, str, str]]:
+    """ Правки (pk, столбец, значение), каждая ячейка дважды """
+    cells = [(pk, col) for pk in range(1, N // 4 + 1) for col in COLUMNS]
+    return [(pk, col, str(i)) for i, (pk, col) in enumerate(cells * 2)]
+
+
+def with_list(data: list[tuple[int, str, str]]) -> None:
+    changes: list[Change] = []
+    for pk, col, value in data:
+        for c in changes:
+            if c.operator == 'update' and c.row == pk and c.col == col:
+                c.new_value = value
+                break
+        else:
+            changes.append(Change('update', pk, col, value))
+
+
+def with_journal(data: list[tuple[int, str, str]]) -> None:
+    journal = ChangeJournal()
+    for pk, col, value in data:
+        journal.update(pk, Change('update', pk, col, value))
+    journal.batch()
+
+
+def main() -> None:
+    data = edits()
+    report('list scan', timed(lambda: with_list(data)), len(data))
+    report('ChangeJournal', timed(lambda: with_journal(data)), len(data))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Преобразование сумм и дат 200 000 расходов:
+декодирование каждой строки по отдельности против декодирования
+по полям для всей выборки (Mapper.hydrate), отбор по сумме в SQLite против
+отбора в Python после загрузки всех расходов
+"""
+
+import datetime
+import decimal
+import sqlite3
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository import codecs
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import Mapper, SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+N = 200_000
+START = datetime.datetime(2024, 1, 1)
+
+
+def fill(db_file: str) -> None:
+    """ Заполнить базу N расходами, суммы в копейках """
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, expense_date, date, comment) '
+            'VALUES (?, 1, ?, ?, ?)',
+            ((i, codecs.encode_datetime(START + datetime.timedelta(minutes=i)),
+              '2024-01-01', 'comment') for i in range(N)))
+
+
+def decode_rows(rows: list[tuple]) -> list[Expense]:
+    """ Декодирование каждой строки по отдельности """
+    return [Expense(codecs.decode_money(amount), category,
+                    codecs.decode_datetime(expense_date), date, comment, pk)
+            for amount, category, expense_date, date, comment, pk in rows]
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        mapper = Mapper.for_model(Expense)
+        with sqlite3.connect(db_file) as con:
+            rows = con.execute(mapper.select_sql).fetchall()
+        report('decode row by row', timed(lambda: decode_rows(rows)), N)
+        report('decode by fields, Mapper.hydrate', timed(
+            lambda: mapper.hydrate(rows)), N)
+        manager = ConnectionManager(db_file)
+        repo = SQLiteRepository[Expense](db_file, Expense, manager)
+        limit = decimal.Decimal(N // 100)
+        report('amount > limit, filter in Python', timed(
+            lambda: [exp for exp in repo.get_all() if exp.amount > limit]), N)
+        report('amount > limit, filter in SQLite', timed(
+            lambda: repo.get_all({'amount': ('>', limit)})), N)
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Сравнение соединения на каждую операцию с общим соединением
+на 10 000 вставок расходов
+"""
+
+import sqlite3
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+N = 10_000
+
+
+def per_op_connections(db_file: str) -> None:
+    """ Старое поведение: connect, PRAGMA и commit на каждую вставку """
+    for i in range(N):
+        with sqlite3.connect(db_file) as con:
+            con.execute("PRAGMA foreign_keys = ON")
+            con.execute(
+                'INSERT INTO expense (amount, category, expense_date, date, comment) '
+                'VALUES (?, ?, ?, ?, ?)', (i, 1, None, '2024-01-01', ''))
+            con.commit()
+
+
+def pooled(db_file: str) -> None:
+    """ Общее соединение, commit на каждую вставку """
+    manager = ConnectionManager(db_file)
+    repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    for i in range(N):
+        repo.add(Expense(i, 1, None, '2024-01-01'))
+    manager.close()
+
+
+def pooled_session(db_file: str) -> None:
+    """ Общее соединение и одна транзакция на все вставки """
+    manager = ConnectionManager(db_file)
+    repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    with repo.session():
+        for i in range(N):
+            repo.add(Expense(i, 1, None, '2024-01-01'))
+    manager.close()
+
+
+def main() -> None:
+    print(f'{N} inserts')
+    for name, func in (('connection per operation', per_op_connections),
+                       ('pooled connection', pooled),
+                       ('pooled connection + session', pooled_session)):
+        with temp_db() as db_file:
+            report(name, timed(lambda: func(db_file)), N)
+
+
+if __name__ == '__main__':
+    main()
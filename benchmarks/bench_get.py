@@ -0,0 +1,61 @@
+"""
+Загрузка таблицы расходов с названиями категорий, как в MainWindow:
+get_all по расходам и get категории для каждой строки.
+Время на строку должно оставаться постоянным при росте таблицы.
+"""
+
+import sqlite3
+
+from bookkeeper.models.category import Category
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+SIZES = (25_000, 50_000, 100_000)
+CATEGORIES = 1_000
+
+
+def fill(db_file: str, n: int) -> None:
+    """ Заполнить базу n расходами """
+    with sqlite3.connect(db_file) as con:
+        con.executemany('INSERT INTO category (name) VALUES (?)',
+                        ((str(i), ) for i in range(CATEGORIES)))
+        con.executemany(
+            'INSERT INTO expense (amount, category, date, comment) '
+            'VALUES (?, ?, ?, ?)',
+            ((i, i % CATEGORIES + 1, '2024-01-01', '') for i in range(n)))
+
+
+def load(db_file: str) -> None:
+    """ Загрузка таблицы расходов """
+    manager = ConnectionManager(db_file)
+    exp_repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    cat_repo = SQLiteRepository[Category](db_file, Category, manager)
+    for exp in exp_repo.get_all():
+        cat_repo.get(exp.category).name
+    manager.close()
+
+
+def load_many(db_file: str) -> None:
+    """ Загрузка таблицы расходов с одним запросом за категориями """
+    manager = ConnectionManager(db_file)
+    exp_repo = SQLiteRepository[Expense](db_file, Expense, manager)
+    cat_repo = SQLiteRepository[Category](db_file, Category, manager)
+    expenses = exp_repo.get_all()
+    cats = cat_repo.get_many({exp.category for exp in expenses})
+    for exp in expenses:
+        cats[exp.category].name
+    manager.close()
+
+
+def main() -> None:
+    for n in SIZES:
+        with temp_db() as db_file:
+            fill(db_file, n)
+            report(f'get per row, {n} rows', timed(lambda: load(db_file)), n)
+            report(f'get_many, {n} rows', timed(lambda: load_many(db_file)), n)
+
+
+if __name__ == '__main__':
+    main()
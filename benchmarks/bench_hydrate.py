@@ -0,0 +1,68 @@
+"""
+Превращение 200 000 строк таблицы расходов в объекты Expense:
+старое построение списков на каждую строку против распаковки строки,
+выбранной в порядке полей модели (Mapper), с декодированием полей
+в каждом объекте по отдельности и столбцами, и полный get_all.
+
+Старый путь не декодирует поля: суммы остаются целыми копейками.
+Mapper.hydrate создает Decimal для каждой суммы и поэтому работает
+примерно с той же скоростью, что и старый путь, а не быстрее него;
+декодирование столбцами быстрее декодирования в каждом объекте.
+Один запуск отличается от другого на 10-20%, сравнивать стоит
+несколько запусков.
+"""
+
+import itertools
+import sqlite3
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import Mapper, SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+N = 200_000
+
+
+def fill(db_file: str) -> None:
+    """ Заполнить базу N расходами """
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, date, comment) '
+            'VALUES (?, 1, ?, ?)', ((i, '2024-01-01', 'comment') for i in range(N)))
+
+
+def decode_objects(rows: list[tuple]) -> list[Expense]:
+    """
+    Распаковка строк, затем декодирование каждого поля с кодеком
+    в каждом объекте по отдельности
+    """
+    objs = list(itertools.starmap(Expense, rows))
+    for name, codec in Mapper.for_model(Expense).field_codecs.items():
+        for obj in objs:
+            setattr(obj, name, codec.decode(getattr(obj, name)))
+    return objs
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        with sqlite3.connect(db_file) as con:
+            star_rows = con.execute('SELECT * FROM expense').fetchall()
+            mapper = Mapper.for_model(Expense)
+            ordered_rows = con.execute(mapper.select_sql).fetchall()
+        report('rows -> objects, lists, no decoding', timed(
+            lambda: [Expense(*(list(data[1:]) + [data[0]]))
+                     for data in star_rows]), N)
+        report('rows -> objects, decode per object', timed(
+            lambda: decode_objects(ordered_rows)), N)
+        report('rows -> objects, Mapper.hydrate', timed(
+            lambda: mapper.hydrate(ordered_rows)), N)
+        manager = ConnectionManager(db_file)
+        repo = SQLiteRepository[Expense](db_file, Expense, manager)
+        repo.get(1)
+        report('get_all', timed(repo.get_all), N)
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
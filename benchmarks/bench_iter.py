@@ -0,0 +1,63 @@
+"""
+Полный проход по 300 000 расходов: get_all против iter_all.
+Сравниваются пиковая память и время до первой записи.
+"""
+
+import sqlite3
+import time
+import tracemalloc
+import typing
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import temp_db
+
+N = 300_000
+
+
+def fill(db_file: str) -> None:
+    """ Заполнить базу N расходами """
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, date, comment) '
+            'VALUES (?, 1, ?, ?)', ((i, '2024-01-01', 'comment') for i in range(N)))
+
+
+def scan(make_iterable: typing.Callable[[], typing.Iterable[Expense]]
+         ) -> float:
+    """ Пройти по записям, вернуть время до первой записи """
+    start = time.perf_counter()
+    first = None
+    for _ in make_iterable():
+        if first is None:
+            first = time.perf_counter() - start
+    return first or 0.0
+
+
+def measure(name: str,
+            make_iterable: typing.Callable[[], typing.Iterable[Expense]]) -> None:
+    """ Время прохода, время до первой записи и пиковая память """
+    start = time.perf_counter()
+    first = scan(make_iterable)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    scan(make_iterable)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{name:<20} total {elapsed * 1000:8.1f} ms, first row '
+          f'{first * 1000:8.1f} ms, peak {peak / 2 ** 20:7.1f} MiB')
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        manager = ConnectionManager(db_file)
+        repo = SQLiteRepository[Expense](db_file, Expense, manager)
+        measure('get_all', repo.get_all)
+        measure('iter_all', lambda: repo.iter_all(batch_size=1000))
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Профили соединения: 5 000 вставок расходов с фиксацией каждой,
+5 000 чтений по id и полная выборка для каждого профиля
+"""
+
+import random
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.connection import PROFILES, ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+N = 5_000
+
+
+def main() -> None:
+    pks = list(range(1, N + 1))
+    random.seed(0)
+    random.shuffle(pks)
+    for name, profile in PROFILES.items():
+        with temp_db() as db_file:
+            manager = ConnectionManager(db_file, profile)
+            repo = SQLiteRepository[Expense](db_file, Expense, manager)
+            report(f'{name}: add + commit', timed(
+                lambda: [repo.add(Expense(i, 1, None, '2024-01-01'))
+                         for i in range(N)]), N)
+            report(f'{name}: get by id', timed(
+                lambda: [repo.get(pk) for pk in pks]), N)
+            report(f'{name}: get_all', timed(repo.get_all), N)
+            manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Суммы за периоды и по категориям на 1 000 000 расходов:
+агрегатная таблица expense_rollup против SUM по сырым расходам,
+а также цена поддержки агрегатов триггерами при вставке
+"""
+
+import datetime
+import sqlite3
+
+from bookkeeper.repository import rollup, totals
+from benchmarks.common import report, temp_db, timed
+
+N = 1_000_000
+DAYS = 3650
+CATEGORIES = 50
+TODAY = datetime.date(2024, 6, 6)
+REPEAT = 20
+
+
+def rows() -> list[tuple[int, int, str]]:
+    """ Расходы равномерно за DAYS дней до TODAY """
+    return [(i % 1000, i % CATEGORIES + 1,
+             (TODAY - datetime.timedelta(days=i % DAYS)).isoformat())
+            for i in range(N)]
+
+
+def insert(con: sqlite3.Connection, data: list[tuple[int, int, str]]) -> None:
+    """ Вставка расходов одной транзакцией """
+    with con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)', data)
+
+
+def raw(con: sqlite3.Connection) -> None:
+    """ Суммы по сырым расходам """
+    bounds = totals.period_bounds(TODAY)
+    for start, end in bounds.values():
+        con.execute('SELECT SUM(amount) FROM expense WHERE date >= ? AND date < ?',
+                    (start, end)).fetchone()
+    con.execute('SELECT category, SUM(amount) FROM expense GROUP BY category').fetchall()
+
+
+def from_rollup(con: sqlite3.Connection) -> None:
+    """ Суммы по агрегатной таблице """
+    totals.sum_by_periods(con, TODAY)
+    totals.sums_by_category(con)
+
+
+def main() -> None:
+    data = rows()
+    with temp_db() as db_file:
+        con = sqlite3.connect(db_file)
+        con.execute('CREATE INDEX expense_date_amount_idx ON expense (date, amount)')
+        report(f'insert {N} rows without rollup', timed(lambda: insert(con, data)), N)
+        report(f'raw SUM, {N} rows',
+               timed(lambda: [raw(con) for _ in range(REPEAT)]) / REPEAT)
+        report('rollup rebuild', timed(lambda: rollup.install(con)))
+        report(f'rollup, {N} rows',
+               timed(lambda: [from_rollup(con) for _ in range(REPEAT)]) / REPEAT)
+        con.close()
+    with temp_db() as db_file:
+        con = sqlite3.connect(db_file)
+        con.execute('CREATE INDEX expense_date_amount_idx ON expense (date, amount)')
+        rollup.install(con)
+        report(f'insert {N} rows with rollup', timed(lambda: insert(con, data)), N)
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Суммы по поддеревьям категорий: рекурсивный запрос против обхода
+дерева в Python через Category.get_subcategories
+"""
+
+import random
+import sqlite3
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository import rollup, totals
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from benchmarks.common import report, temp_db, timed
+
+CATEGORIES = 3_000
+EXPENSES = 200_000
+
+
+def fill(db_file: str) -> None:
+    """ Случайное дерево категорий и расходы по ним """
+    rnd = random.Random(0)
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO category (id, name, parent) VALUES (?, ?, ?)',
+            ((i, str(i), rnd.randint(1, i - 1) if i > 2 else None)
+             for i in range(2, CATEGORIES + 2)))
+        con.executemany(
+            'INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)',
+            ((i % 1000, rnd.randint(1, CATEGORIES + 1), '2024-01-01')
+             for i in range(EXPENSES)))
+        con.execute('CREATE INDEX category_parent_idx ON category (parent)')
+        rollup.install(con)
+
+
+def python_walk(db_file: str) -> None:
+    """ Поддерево каждой категории через get_subcategories """
+    manager = ConnectionManager(db_file)
+    repo = SQLiteRepository[Category](db_file, Category, manager)
+    con = manager.connection()
+    sums = totals.sums_by_category(con)
+    for cat in repo.get_all():
+        sum(sums.get(c.pk, 0) for c in cat.get_subcategories(repo)) \
+            + sums.get(cat.pk, 0)
+    manager.close()
+
+
+def recursive_query(db_file: str) -> None:
+    """ Поддеревья всех категорий одним запросом """
+    con = sqlite3.connect(db_file)
+    totals.subtree_sums(con)
+    con.close()
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        report(f'get_subcategories, {CATEGORIES} categories',
+               timed(lambda: python_walk(db_file)))
+        report(f'WITH RECURSIVE, {CATEGORIES} categories',
+               timed(lambda: recursive_query(db_file)))
+
+
+if __name__ == '__main__':
+    main()
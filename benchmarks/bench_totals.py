@@ -0,0 +1,64 @@
+"""
+Суммы за день, неделю, месяц и год на 1 000 000 расходов:
+запросы с LIKE, запросы по индексу сырых расходов с полуинтервалами
+и один запрос к агрегатной таблице expense_rollup (totals.sum_by_periods)
+"""
+
+import datetime
+import sqlite3
+
+from bookkeeper.repository import rollup, totals
+from benchmarks.common import report, temp_db, timed
+
+N = 1_000_000
+DAYS = 3650
+TODAY = datetime.date(2024, 6, 6)
+REPEAT = 20
+
+
+def fill(db_file: str) -> None:
+    """ Расходы равномерно за DAYS дней до TODAY """
+    with sqlite3.connect(db_file) as con:
+        con.executemany(
+            'INSERT INTO expense (amount, category, date, comment) '
+            'VALUES (?, 1, ?, ?)',
+            ((i % 1000, (TODAY - datetime.timedelta(days=i % DAYS)).isoformat(), '')
+             for i in range(N)))
+        con.execute('CREATE INDEX expense_date_amount_idx ON expense (date, amount)')
+        rollup.install(con)
+
+
+def like(con: sqlite3.Connection) -> None:
+    """ Старые запросы с ведущим шаблоном """
+    for pattern in ('%Y-%m-%d', '%Y-%m-__', '%Y-__-__'):
+        con.execute(
+            "SELECT SUM(amount) FROM expense WHERE date LIKE '%' || ? || '%'",
+            (TODAY.strftime(pattern), )).fetchone()
+
+
+def raw_ranges(con: sqlite3.Connection) -> None:
+    """ Запросы по индексу сырых расходов """
+    for start, end in totals.period_bounds(TODAY).values():
+        con.execute('SELECT SUM(amount) FROM expense WHERE date >= ? AND date < ?',
+                    (start, end)).fetchone()
+
+
+def from_rollup(con: sqlite3.Connection) -> None:
+    """ Один запрос к агрегатной таблице """
+    totals.sum_by_periods(con, TODAY)
+
+
+def main() -> None:
+    with temp_db() as db_file:
+        fill(db_file)
+        con = sqlite3.connect(db_file)
+        for name, func in (('LIKE, 3 queries', like),
+                           ('raw range, 4 queries', raw_ranges),
+                           ('rollup, 1 query', from_rollup)):
+            report(f'{name}, {N} rows',
+                   timed(lambda: [func(con) for _ in range(REPEAT)]) / REPEAT)
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Общие функции для бенчмарков
+"""
+
+import contextlib
+import os
+import sqlite3
+import tempfile
+import time
+import typing
+
+
+SCHEMA = (
+    "CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, parent INTEGER)",
+    "CREATE TABLE expense (id INTEGER PRIMARY KEY, amount INTEGER, "
+    "category INTEGER, expense_date TEXT, date TEXT, comment TEXT, "
+    "FOREIGN KEY (category) REFERENCES category (id) "
+    "ON DELETE CASCADE ON UPDATE CASCADE)",
+    "INSERT INTO category (name) VALUES ('Uncategorized')",
+)
+
+
+@contextlib.contextmanager
+def temp_db() -> typing.Iterator[str]:
+    """ Создать временную базу данных со схемой приложения """
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, 'bench.db')
+        con = sqlite3.connect(db_file)
+        for statement in SCHEMA:
+            con.execute(statement)
+        con.commit()
+        con.close()
+        yield db_file
+
+
+def timed(func: typing.Callable[[], typing.Any]) -> float:
+    """ Время выполнения функции в секундах """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def report(name: str, seconds: float, ops: int | None = None) -> None:
+    """ Напечатать строку результата """
+    line = f'{name:<40} {seconds * 1000:10.1f} ms'
+    if ops:
+        line += f' {ops / seconds:12.0f} ops/s'
+    print(line)
@@ -1,15 +1,19 @@
+"""
+Описан класс бюджета
+"""
+
 import dataclasses
+import decimal
 
 
 @dataclasses.dataclass(slots=True)
 class Budget:
     """
     Бюджет
-    amount - сумма
-    category - id категории расходов
+    amount - сумма, хранится в базе в копейках
     tern - срок использования
     pk - id записи в базе данных
     """
-    amount: int
+    amount: decimal.Decimal | None
     tern: str = 'month'
     pk: int = 0
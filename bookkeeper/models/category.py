@@ -20,7 +20,9 @@ class Category():
     pk: int = 0
 
     def get_parent(
-        self, repo: abstract_repository.AbstractRepository['Category']
+        self,
+        repo: abstract_repository.AbstractRepository['Category'],
+        tree: 'CategoryTree | None' = None
     ) -> 'Category | None':
         """
         Получить родительскую категорию в виде объекта Category
@@ -29,6 +31,7 @@ class Category():
         Parameters
         ----------
         repo - репозиторий для получения объектов
+        tree - индекс дерева категорий, если задан, репозиторий не используется
 
         Returns
         -------
@@ -36,10 +39,14 @@ class Category():
         """
         if self.parent is None:
             return None
+        if tree is not None:
+            return tree.get(self.parent)
         return repo.get(self.parent)
 
     def get_all_parents(
-        self, repo: abstract_repository.AbstractRepository['Category']
+        self,
+        repo: abstract_repository.AbstractRepository['Category'],
+        tree: 'CategoryTree | None' = None
     ) -> typing.Iterator['Category']:
         """
         Получить все категории верхнего уровня в иерархии.
@@ -47,11 +54,15 @@ class Category():
         Parameters
         ----------
         repo - репозиторий для получения объектов
+        tree - индекс дерева категорий, если задан, репозиторий не используется
 
         Yields
         -------
         Объекты Category от родителя и выше до категории верхнего уровня
         """
+        if tree is not None:
+            yield from tree.ancestors(self.pk)
+            return
         parent = self.get_parent(repo)
         if parent is None:
             return
@@ -59,7 +70,9 @@ class Category():
         yield from parent.get_all_parents(repo)
 
     def get_subcategories(
-        self, repo: abstract_repository.AbstractRepository['Category']
+        self,
+        repo: abstract_repository.AbstractRepository['Category'],
+        tree: 'CategoryTree | None' = None
     ) -> typing.Iterator['Category']:
         """
         Получить все подкатегории из иерархии, т.е. непосредственные
@@ -68,23 +81,15 @@ class Category():
         Parameters
         ----------
         repo - репозиторий для получения объектов
+        tree - индекс дерева категорий, если не задан, строится по репозиторию
 
         Yields
         -------
         Объекты Category, являющиеся подкатегориями разного уровня ниже данной.
         """
-
-        def get_children(graph: dict[int | None, list['Category']],
-                         root: int) -> typing.Iterator['Category']:
-            """ dfs in graph from root """
-            for x in graph[root]:
-                yield x
-                yield from get_children(graph, x.pk)
-
-        subcats = collections.defaultdict(list)
-        for cat in repo.get_all():
-            subcats[cat.parent].append(cat)
-        return get_children(subcats, self.pk)
+        if tree is None:
+            tree = CategoryTree.from_repo(repo)
+        return tree.descendants(self.pk)
 
     @classmethod
     def create_from_tree(
@@ -112,16 +117,203 @@ class Category():
         Список созданных объектов Category
         """
         created: dict[str, Category] = {}
+        levels: list[list[tuple[Category, str | None]]] = []
+        depth: dict[str | None, int] = {None: -1}
         for child, parent in tree:
-            cat = cls(child,
-                      created[parent].pk if parent is not None else None)
-            repo.add(cat)
+            depth[child] = depth[parent] + 1
+            if depth[child] == len(levels):
+                levels.append([])
+            cat = cls(child)
+            levels[depth[child]].append((cat, parent))
             created[child] = cat
+        # родители уровня уже сохранены, так что уровень добавляется пачкой
+        for level in levels:
+            for cat, parent in level:
+                cat.parent = created[parent].pk if parent is not None else None
+            repo.add_many(cat for cat, _ in level)
         return list(created.values())
 
     def get_all_children(
-        self, repo: abstract_repository.AbstractRepository['Category']
+        self,
+        repo: abstract_repository.AbstractRepository['Category'],
+        tree: 'CategoryTree | None' = None
     ) -> typing.Iterator['Category']:
+        """
+        Получить непосредственные подкатегории данной категории
+
+        Parameters
+        ----------
+        repo - репозиторий для получения объектов
+        tree - индекс дерева категорий, если задан, репозиторий не используется
+        """
+        if tree is not None:
+            yield from tree.children(self.pk)
+            return
         for cate in repo.get_all():
             if cate.parent == self.pk:
                 yield cate
+
+
+class CategoryTree:
+    """
+    Индекс дерева категорий в оперативной памяти.
+    Строится один раз по списку категорий и хранит словарь id -> категория,
+    списки непосредственных подкатегорий для каждого родителя, а также
+    заранее вычисленные глубину и путь от корня для каждой категории,
+    а также словарь название -> id категорий с этим названием в порядке
+    их появления для поиска категории по названию.
+    При изменении категорий индекс обновляется методами add, update и remove.
+    Категории, родителя которых нет в индексе, считаются категориями
+    верхнего уровня.
+    """
+
+    def __init__(self, categories: typing.Iterable[Category] = ()) -> None:
+        self._nodes: dict[int, Category] = {}
+        self._parents: dict[int, int | None] = {}
+        self._children: dict[int | None, list[Category]] = \
+            collections.defaultdict(list)
+        self._paths: dict[int, tuple[int, ...]] = {}
+        # словари id используются как упорядоченные множества
+        self._names: dict[str, dict[int, None]] = {}
+        for cat in categories:
+            self._nodes[cat.pk] = cat
+            self._name(cat)
+            self._parents[cat.pk] = cat.parent
+            self._children[cat.parent].append(cat)
+        for cat in self._nodes.values():
+            if cat.parent not in self._nodes:
+                self._index_paths(cat, ())
+
+    @classmethod
+    def from_repo(
+        cls, repo: abstract_repository.AbstractRepository[Category]
+    ) -> 'CategoryTree':
+        """ Построить индекс по всем категориям репозитория """
+        return cls(repo.get_all())
+
+    def _path_below(self, parent: int | None) -> tuple[int, ...]:
+        """ Путь от корня для подкатегории категории parent """
+        if parent not in self._nodes:
+            return ()
+        return self._paths[parent] + (parent, )
+
+    def _index_paths(self, root: Category, path: tuple[int, ...]) -> None:
+        """ Вычислить пути от корня для поддерева root """
+        stack = [(root, path)]
+        while stack:
+            cat, path = stack.pop()
+            self._paths[cat.pk] = path
+            child_path = path + (cat.pk, )
+            stack.extend((child, child_path)
+                         for child in self._children.get(cat.pk, ()))
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, pk: object) -> bool:
+        return pk in self._nodes
+
+    def __iter__(self) -> typing.Iterator[Category]:
+        return iter(self._nodes.values())
+
+    def get(self, pk: int) -> Category | None:
+        """ Получить категорию по id """
+        return self._nodes.get(pk)
+
+    def find(self, name: str) -> Category | None:
+        """
+        Получить категорию по названию. Если категорий с таким названием
+        несколько, возвращается добавленная первой.
+        """
+        pks = self._names.get(name)
+        return None if not pks else self._nodes[next(iter(pks))]
+
+    def _name(self, cat: Category) -> None:
+        """ Добавить категорию в словарь названий """
+        self._names.setdefault(cat.name, {})[cat.pk] = None
+
+    def _unname(self, cat: Category) -> None:
+        """ Удалить категорию из словаря названий """
+        pks = self._names.get(cat.name)
+        if pks is None:
+            return
+        pks.pop(cat.pk, None)
+        if not pks:
+            del self._names[cat.name]
+
+    def parent(self, pk: int) -> Category | None:
+        """ Родительская категория или None для категории верхнего уровня """
+        parent = self._parents[pk]
+        return None if parent is None else self._nodes.get(parent)
+
+    def children(self, pk: int | None) -> list[Category]:
+        """
+        Непосредственные подкатегории категории pk,
+        для pk = None - категории верхнего уровня
+        """
+        if pk is None:
+            return self.roots()
+        return list(self._children.get(pk, ()))
+
+    def roots(self) -> list[Category]:
+        """ Категории верхнего уровня """
+        return [cat for cat in self._nodes.values() if not self._paths[cat.pk]]
+
+    def path(self, pk: int) -> tuple[int, ...]:
+        """ id предков от категории верхнего уровня до родителя """
+        return self._paths[pk]
+
+    def depth(self, pk: int) -> int:
+        """ Глубина категории, у категорий верхнего уровня 0 """
+        return len(self._paths[pk])
+
+    def ancestors(self, pk: int) -> typing.Iterator[Category]:
+        """ Предки категории от родителя до категории верхнего уровня """
+        for parent in reversed(self._paths[pk]):
+            yield self._nodes[parent]
+
+    def descendants(self, pk: int) -> typing.Iterator[Category]:
+        """ Все подкатегории категории в порядке обхода в глубину """
+        for child in self._children.get(pk, ()):
+            yield child
+            yield from self.descendants(child.pk)
+
+    def add(self, cat: Category) -> None:
+        """ Добавить в индекс новую категорию """
+        self._nodes[cat.pk] = cat
+        self._name(cat)
+        self._parents[cat.pk] = cat.parent
+        self._children[cat.parent].append(cat)
+        self._index_paths(cat, self._path_below(cat.parent))
+
+    def update(self, cat: Category) -> None:
+        """
+        Обновить категорию в индексе. Если категория перенесена к другому
+        родителю, пути её поддерева пересчитываются.
+        """
+        old_parent = self._parents[cat.pk]
+        siblings = self._children[old_parent]
+        index = next(i for i, c in enumerate(siblings) if c.pk == cat.pk)
+        old = self._nodes[cat.pk]
+        self._nodes[cat.pk] = cat
+        if old.name != cat.name:
+            self._unname(old)
+            self._name(cat)
+        if old_parent == cat.parent:
+            siblings[index] = cat
+            return
+        del siblings[index]
+        self._parents[cat.pk] = cat.parent
+        self._children[cat.parent].append(cat)
+        self._index_paths(cat, self._path_below(cat.parent))
+
+    def remove(self, pk: int) -> None:
+        """ Удалить из индекса категорию вместе со всеми подкатегориями """
+        siblings = self._children[self._parents[pk]]
+        siblings[:] = [c for c in siblings if c.pk != pk]
+        for sub in [self._nodes[pk], *self.descendants(pk)]:
+            self._unname(sub)
+            del self._nodes[sub.pk]
+            del self._parents[sub.pk]
+            del self._paths[sub.pk]
+            self._children.pop(sub.pk, None)
@@ -4,24 +4,25 @@
 
 import dataclasses
 import datetime
+import decimal
 
 
 @dataclasses.dataclass(slots=True)
 class Expense:
     """
     Расходная операция.
-    amount - сумма
+    amount - сумма, хранится в базе в копейках
     category - id категории расходов
     expense_date - дата расхода
     added_date - дата добавления в бд
     comment - комментарий
     pk - id записи в базе данных
     """
-    amount: int
+    amount: decimal.Decimal
     category: int
     expense_date: datetime.datetime = dataclasses.field(
         default_factory=datetime.datetime.now)
     date: str = dataclasses.field(
-        default=datetime.datetime.now().strftime('%Y-%m-%d'))
+        default_factory=lambda: datetime.date.today().isoformat())
     comment: str = ''
     pk: int = 0
@@ -0,0 +1,68 @@
+import concurrent.futures
+import typing
+
+from PySide6 import QtCore
+
+
+class DBExecutor(QtCore.QObject):
+    """
+    Runs database calls in one worker thread.
+    Calls are executed one by one in order of submitting, so writes and
+    following reads never overlap. Results, errors and progress are
+    delivered to callbacks in the thread of executor (GUI thread).
+    """
+    #future, result callback and error callback
+    _done = QtCore.Signal(object, object, object)
+    #done and total steps of running call
+    progress = QtCore.Signal(int, int)
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='db')
+        #signal from worker thread is queued to thread of executor
+        self._done.connect(self._deliver)
+
+    def submit(
+        self,
+        func: typing.Callable[..., typing.Any],
+        *args: typing.Any,
+        on_result: typing.Callable[[typing.Any], None] | None = None,
+        on_error: typing.Callable[[BaseException], None] | None = None
+    ) -> concurrent.futures.Future[typing.Any]:
+        """
+        Run func(*args) in worker thread, callbacks get result or exception
+        """
+        future = self._pool.submit(func, *args)
+        future.add_done_callback(
+            lambda f: self._done.emit(f, on_result, on_error))
+        return future
+
+    def report(self, done: int, total: int) -> None:
+        """
+        Report progress of running call, may be called from worker thread
+        """
+        self.progress.emit(done, total)
+
+    @QtCore.Slot(object, object, object)
+    def _deliver(
+        self,
+        future: concurrent.futures.Future[typing.Any],
+        on_result: typing.Callable[[typing.Any], None] | None,
+        on_error: typing.Callable[[BaseException], None] | None
+    ) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is None:
+                raise error
+            on_error(error)
+        elif on_result is not None:
+            on_result(future.result())
+
+    def shutdown(self) -> None:
+        """
+        Wait for submitted calls and stop worker thread
+        """
+        self._pool.shutdown(wait=True)
@@ -1,209 +1,489 @@
 import re
-import sqlite3
+import typing
 import inspect
+import decimal
 import datetime
 
 from PySide6 import QtWidgets
 from PySide6 import QtCore
+from PySide6 import QtGui
 
 from bookkeeper.models import expense
 from bookkeeper.models import category
+from bookkeeper.models import budget
+from bookkeeper.repository import budgets
+from bookkeeper.repository import cached_repository
+from bookkeeper.repository import codecs
+from bookkeeper.repository import connection
 from bookkeeper.repository import sqlite_repository
+from bookkeeper.repository import totals
+from bookkeeper.presenter import db_executor
+from bookkeeper.view import changes
 from bookkeeper.view import mainwindow
 from bookkeeper.view import errordialog
 
+#converters from table text to expense field values
+EXPENSE_CONVERTERS = dict(inspect.get_annotations(expense.Expense, eval_str=True),
+                          amount=codecs.parse_money)
+DATE_FORMAT = re.compile(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$')
+#rows written between progress reports of save
+SAVE_CHUNK = 1000
+#periods of budget table rows
+BUDGET_ROWS = ('day', 'month', 'year')
+BUDGET_SPENT_COLUMN = 1
+BUDGET_LIMIT_COLUMN = 2
+
 
 class Presenter:
     """
     presenter
     """
     def __init__(self, db_file: str) -> None:
+        #both repositories work through one connection per thread
+        self.connection_manager = connection.ConnectionManager(db_file)
         self.expense_repo = sqlite_repository.SQLiteRepository[
-            expense.Expense](db_file, expense.Expense)
-        self.category_repo = sqlite_repository.SQLiteRepository[
-            category.Category](db_file, category.Category)
-        self.main_window = mainwindow.MainWindow(self.expense_repo,
-                                                 self.category_repo)
+            expense.Expense](db_file, expense.Expense,
+                             self.connection_manager)
+        #categories are read again and again, all writes go through cache
+        self.category_repo = cached_repository.CachedRepository[
+            category.Category](sqlite_repository.SQLiteRepository[
+                category.Category](db_file, category.Category,
+                                   self.connection_manager))
+        self.budget_repo = sqlite_repository.SQLiteRepository[
+            budget.Budget](db_file, budget.Budget, self.connection_manager)
         self.dialog = errordialog.Dialog()
+        #loads, saves and sums run in worker thread, gui never waits for db
+        self.executor = db_executor.DBExecutor()
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.shutdown)
+        #schema is migrated when worker opens its connection
+        self.executor.submit(category.CategoryTree.from_repo,
+                             self.category_repo,
+                             on_result=self.show_main_window,
+                             on_error=self.show_error)
+
+    @QtCore.Slot()
+    def shutdown(self) -> None:
+        """
+        Finish submitted database calls, then close connections
+        """
+        #worker may still use its connection until it stops
+        self.executor.shutdown()
+        self.connection_manager.close()
+
+    def show_main_window(self, category_tree: category.CategoryTree) -> None:
+        self.main_window = mainwindow.MainWindow(self.expense_repo,
+                                                 self.category_repo,
+                                                 category_tree)
         self.main_window.ui.button_save_expense.clicked.connect(
             self.handle_expense_table_saving)
         self.main_window.ui.button_save_category.clicked.connect(
             self.handle_category_tree_saving)
         self.main_window.ui.combo_box_chose_category.currentIndexChanged.connect(
             self.display_sum_amount)
+        self.main_window.ui.table_widget_budget.cellChanged.connect(
+            self.handle_budget_editing)
+        self.executor.progress.connect(self.display_progress)
         #diplay right away sum all amount by row in expense table
         self.display_sum_amount(0)
-        #set sum amout for now
-        self.main_window.ui.table_widget_budget.setItem(
-            0, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('day'))))
-        self.main_window.ui.table_widget_budget.setItem(
-            1, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('month'))))
-        self.main_window.ui.table_widget_budget.setItem(
-            2, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('year'))))
+        #counters are empty and budgets are not editable
+        #until they are read from database
+        self.budget_checker = budgets.BudgetChecker()
+        self.main_window.ui.table_widget_budget.setEnabled(False)
+        self.display_budget()
 
         self.main_window.show()
 
-    def get_sum_amount_by(self, time: str) -> int:
-        conn = sqlite3.connect(self.expense_repo.db_file)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-        if time == 'day':
-            cursor.execute(
-                "SELECT SUM(amount) FROM expense WHERE date LIKE '%' || ? || '%'",
-                (datetime.datetime.now().strftime('%Y-%m-%d'), ))
-        if time == 'month':
-            cursor.execute(
-                "SELECT SUM(amount) FROM expense WHERE date LIKE '%' || ? || '%'",
-                (datetime.datetime.now().strftime('%Y-%m-__'), ))
-        if time == 'year':
-            cursor.execute(
-                "SELECT SUM(amount) FROM expense WHERE date LIKE '%' || ? || '%'",
-                (datetime.datetime.now().strftime('%Y-__-__'), ))
-        row = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return row[0] if row[0] is not None else 0
+    def show_error(self, error: BaseException | str) -> None:
+        self.dialog.label.setText("")
+        self.dialog.label.setText(str(error))
+        self.dialog.exec()
 
-    def display_sum_amount(self, index: int) -> None:
-        category = self.main_window.ui.combo_box_chose_category.currentText()
-        if not category:
+    @QtCore.Slot(int, int)
+    def display_progress(self, done: int, total: int) -> None:
+        self.main_window.statusBar().showMessage(f'Saving {done}/{total}')
+
+    def display_budget(self) -> None:
+        """
+        Reconcile budget counters with database and show them
+        """
+        self.executor.submit(self.load_budget_checker,
+                             on_result=self.show_budget_checker,
+                             on_error=self.show_error)
+
+    def load_budget_checker(self) -> budgets.BudgetChecker:
+        """
+        Budgets and sums of current periods, runs in worker
+        """
+        day = datetime.date.today()
+        checker = budgets.BudgetChecker.from_repo(self.budget_repo, day)
+        sums = totals.sum_by_periods(self.connection_manager.connection(), day)
+        #sums are stored in minor units
+        checker.reconcile(day, {period: codecs.decode_money(amount)
+                                for period, amount in sums.items()})
+        return checker
+
+    def show_budget_checker(self, checker: budgets.BudgetChecker) -> None:
+        self.budget_checker = checker
+        self.main_window.ui.table_widget_budget.setEnabled(True)
+        self.show_budget()
+
+    def show_budget(self) -> None:
+        table = self.main_window.ui.table_widget_budget
+        exceeded = self.budget_checker.exceeded()
+        #cells are filled by program, not edited by user
+        table.blockSignals(True)
+        for row, period in enumerate(BUDGET_ROWS):
+            spent = QtWidgets.QTableWidgetItem(
+                str(self.budget_checker.spent[period]))
+            spent.setFlags(spent.flags() & ~QtCore.Qt.ItemIsEditable)
+            if period in exceeded:
+                spent.setBackground(QtGui.QColor('red'))
+            table.setItem(row, BUDGET_SPENT_COLUMN, spent)
+            limit = self.budget_checker.limit(period)
+            table.setItem(row, BUDGET_LIMIT_COLUMN, QtWidgets.QTableWidgetItem(
+                '' if limit is None else str(limit)))
+        table.blockSignals(False)
+        if exceeded:
+            self.main_window.statusBar().showMessage(
+                f'Budget exceeded: {", ".join(exceeded)}')
+
+    def count_spending(
+        self, spending: list[tuple[decimal.Decimal | None, str | None]]
+    ) -> None:
+        """
+        Add saved amounts to budget counters without querying database
+        """
+        if self.budget_checker.day != datetime.date.today():
+            #counters of new day are read from database
+            self.display_budget()
+            return
+        for amount, date in spending:
+            self.budget_checker.add(amount, date)
+        self.show_budget()
+
+    @QtCore.Slot(int, int)
+    def handle_budget_editing(self, row: int, column: int) -> None:
+        if column != BUDGET_LIMIT_COLUMN:
             return
-        conn = sqlite3.connect(self.expense_repo.db_file)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-        if category == 'All':
-            cursor.execute("SELECT SUM(amount) FROM expense")
+        period = BUDGET_ROWS[row]
+        text = self.main_window.ui.table_widget_budget.item(row, column).text()
+        try:
+            amount = codecs.parse_money(text) if text.strip() else None
+        except ValueError:
+            self.show_error(f'Illegal budget {text}')
+            self.show_budget()
+            return
+        current = self.budget_checker.budgets.get(period)
+        if current is None:
+            current = budget.Budget(amount, period)
+            self.budget_checker.set_budget(current)
         else:
-            category_id = self.category_repo.get_all({'name': category})[0].pk
-            cursor.execute(
-                "SELECT SUM(amount) FROM expense WHERE category = ?",
-                (category_id, ))
-        row = cursor.fetchone()
-        sum_result = row[0] if row[0] is not None else 0
-        self.main_window.ui.lineEdit.setText(str(sum_result))
-        cursor.close()
-        conn.close()
+            #object is shared with pending write, it gets primary key there
+            current.amount = amount
+        self.executor.submit(self.write_budget, current,
+                             on_error=self.show_error)
+        self.show_budget()
+
+    def write_budget(self, new_budget: budget.Budget) -> None:
+        """
+        Save budget of period, runs in worker
+        """
+        if new_budget.pk:
+            self.budget_repo.update(new_budget)
+        else:
+            self.budget_repo.add(new_budget)
+
+    def display_sum_amount(self, index: int) -> None:
+        category_name = \
+            self.main_window.ui.combo_box_chose_category.currentText()
+        if not category_name:
+            return
+        #sum of category includes all its subcategories,
+        #category renamed or deleted meanwhile falls back to 'All'
+        cat = None
+        if category_name != 'All':
+            cat = self.main_window.category_tree.find(category_name)
+        category_id = None if cat is None else cat.pk
+        self.executor.submit(self.sum_amount,
+                             category_id,
+                             on_result=self.main_window.ui.lineEdit.setText,
+                             on_error=self.show_error)
+
+    def sum_amount(self, category_id: int | None) -> str:
+        con = self.connection_manager.connection()
+        #sums are stored in minor units
+        if category_id is None:
+            return str(codecs.decode_money(totals.sum_by_category(con)))
+        return str(codecs.decode_money(totals.subtree_sum(con, category_id)))
 
     @QtCore.Slot()
     def handle_expense_table_saving(self) -> None:
-        #check if all change illegal
+        split = self._split_changes(
+            self.main_window.expense_table_changes.batch())
+        if split is None:
+            return
+        new_rows, updates, deleted_pks = split
+
+        def on_saved(result: tuple[list[int],
+                                   list[tuple[decimal.Decimal | None,
+                                              str | None]]]) -> None:
+            self.finish_expense_saving(list(new_rows), *result)
+
+        #table is locked until worker saves changes
+        self.set_expense_editing_enabled(False)
+        self.executor.submit(
+            self.write_expense_changes,
+            new_rows,
+            updates,
+            deleted_pks,
+            on_result=on_saved,
+            on_error=self.fail_expense_saving)
+
+    def _split_changes(
+        self, expense_changes: list[changes.Change]
+    ) -> tuple[dict[int, dict[str, typing.Any]],
+               dict[str, list[tuple[int, typing.Any]]],
+               list[int]] | None:
+        """
+        Check all changes once and group them for writing: values of new rows,
+        updated values by columns and primary keys of deleted rows.
+        Shows error and returns None if some value is illegal.
+        """
+        #new rows are addressed by negative keys until they get primary key
+        new_rows: dict[int, dict[str, typing.Any]] = {}
+        updates: dict[str, list[tuple[int, typing.Any]]] = {}
+        deleted_pks: list[int] = []
         try:
-            for change in self.main_window.expense_table_changes:
-                if change.operator == 'update':
-                    if change.new_value == '':
-                        continue
-                    if change.col == 'category':
-                        value = self.category_repo.get_all(
-                            {'name': change.new_value})[0].pk
-                    elif change.col == 'date':
-                        if not re.match(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$',
-                                        change.new_value):
-                            self.dialog.label.setText("")
-                            self.dialog.label.setText(
-                                'Date format illegal')
-                            self.dialog.exec()
-                            return
-                    else:
-                        value = inspect.get_annotations(
-                            expense.Expense)[change.col](change.new_value)
+            for change in expense_changes:
+                if change.operator == 'delete':
+                    deleted_pks.append(change.row)
                     continue
+                if change.col == 'date' and change.operator == 'update' \
+                        and change.new_value != '' \
+                        and not DATE_FORMAT.match(change.new_value):
+                    self.show_error('Date format illegal')
+                    return None
+                value = self._convert_change(change)
+                if change.operator == 'add':
+                    new_rows[change.row] = {change.col: value}
+                elif change.row in new_rows:
+                    new_rows[change.row][change.col] = value
+                else:
+                    updates.setdefault(change.col, []).append(
+                        (change.row, value))
 
         except ValueError:
-            self.dialog.label.setText("")
-            self.dialog.label.setText(
+            self.show_error(
                 f'Illegal value in ROW {change.row} and COLUMN {change.col}')
-            self.dialog.exec()
-            return
+            return None
         except IndexError:
-            self.dialog.label.setText("")
-            self.dialog.label.setText(f'Category {change.new_value} not found')
-            self.dialog.exec()
-            return
+            self.show_error(f'Category {change.new_value} not found')
+            return None
+        return new_rows, updates, deleted_pks
 
-        #perform changes in database
-        for change in self.main_window.expense_table_changes:
-            if change.operator == 'update':
-                if change.new_value == '':
-                    self.expense_repo.update_item(change.row, change.col, None)
-                else:
-                    if change.col == 'category':
-                        value = self.category_repo.get_all(
-                            {'name': change.new_value})[0].pk
-                    else:
-                        value = inspect.get_annotations(
-                            expense.Expense)[change.col](change.new_value)
-                    self.expense_repo.update_item(change.row, change.col,
-                                                  value)
-            if change.operator == 'add':
-                last_row_id = self.expense_repo.add_empty()
-                self.expense_repo.update_item(last_row_id, change.col,
-                                              change.new_value)
-            if change.operator == 'delete':
-                self.expense_repo.delete(change.row)
+    def _convert_change(self, change: changes.Change) -> typing.Any:
+        """
+        Field value from new text of changed cell,
+        raises ValueError or IndexError if text is illegal
+        """
+        if change.new_value == '':
+            return None
+        if change.col == 'category':
+            cat = self.main_window.category_tree.find(change.new_value)
+            if cat is None:
+                raise IndexError(change.new_value)
+            return cat.pk
+        return EXPENSE_CONVERTERS[change.col](change.new_value)
 
-        #diplay sum all amount by row in expense table
-        self.main_window.ui.table_widget_budget.setItem(
-            0, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('day'))))
-        self.main_window.ui.table_widget_budget.setItem(
-            1, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('month'))))
-        self.main_window.ui.table_widget_budget.setItem(
-            2, 1,
-            QtWidgets.QTableWidgetItem(str(self.get_sum_amount_by('year'))))
+    def write_expense_changes(self, new_rows: dict[int, dict[str, typing.Any]],
+                              updates: dict[str, list[tuple[int, typing.Any]]],
+                              deleted_pks: list[int]
+                              ) -> tuple[list[int],
+                                         list[tuple[decimal.Decimal | None,
+                                                    str | None]]]:
+        """
+        Write grouped expense changes in one transaction, runs in worker.
+        Returns primary keys of new rows and changes of spending by days,
+        (negative amount, date) for amounts removed from day.
+        """
+        new_expenses = [
+            expense.Expense(values.get('amount'),
+                            values.get('category', 1),
+                            None,
+                            values.get('date'),
+                            values.get('comment'))
+            for values in new_rows.values()
+        ]
+        total = len(new_expenses) + sum(map(len, updates.values())) + \
+            len(deleted_pks)
+        done = 0
+        new_pks: list[int] = []
+        #perform changes in database in one transaction,
+        #nothing is saved if any statement fails
+        with self.expense_repo.session():
+            #old values are read before they are changed
+            spending = self.spending_changes(new_expenses, updates,
+                                             deleted_pks)
+            for i in range(0, len(new_expenses), SAVE_CHUNK):
+                add_chunk = new_expenses[i:i + SAVE_CHUNK]
+                new_pks.extend(self.expense_repo.add_many(add_chunk))
+                done += len(add_chunk)
+                self.executor.report(done, total)
+            for col, pairs in updates.items():
+                for i in range(0, len(pairs), SAVE_CHUNK):
+                    update_chunk = pairs[i:i + SAVE_CHUNK]
+                    self.expense_repo.update_items(col, update_chunk)
+                    done += len(update_chunk)
+                    self.executor.report(done, total)
+            self.expense_repo.delete_many(deleted_pks)
+            self.executor.report(total, total)
+        return new_pks, spending
 
+    def spending_changes(
+        self, new_expenses: list[expense.Expense],
+        updates: dict[str, list[tuple[int, typing.Any]]],
+        deleted_pks: list[int]
+    ) -> list[tuple[decimal.Decimal | None, str | None]]:
+        """
+        Amounts added to and removed from days by changes,
+        only changed rows are read
+        """
+        spending = [(exp.amount, exp.date) for exp in new_expenses]
+        changed: dict[int, dict[str, typing.Any]] = {}
+        for col in ('amount', 'date'):
+            for pk, value in updates.get(col, ()):
+                changed.setdefault(pk, {})[col] = value
+        deleted = set(deleted_pks)
+        old = self.expense_repo.get_many(changed.keys() | deleted)
+        for pk, exp in old.items():
+            if exp.amount is not None:
+                spending.append((-exp.amount, exp.date))
+            if pk not in deleted:
+                values = changed[pk]
+                spending.append((values.get('amount', exp.amount),
+                                 values.get('date', exp.date)))
+        return spending
+
+    def finish_expense_saving(
+        self, keys: list[int], new_pks: list[int],
+        spending: list[tuple[decimal.Decimal | None, str | None]]
+    ) -> None:
+        for key, pk in zip(keys, new_pks):
+            self.main_window.set_expense_row_pk(key, pk)
+        #saved values are read back from repository
+        self.main_window.expense_model.refresh()
         #clear cache
-        self.main_window.expense_table_changes = []
+        self.main_window.expense_table_changes.clear()
+        self.set_expense_editing_enabled(True)
+        self.main_window.statusBar().showMessage('Saved', 3000)
+
+        #diplay sum all amount by row in expense table
+        self.count_spending(spending)
+        self.display_sum_amount(0)
+
+    def fail_expense_saving(self, error: BaseException) -> None:
+        #changes stay in journal and can be saved again
+        self.set_expense_editing_enabled(True)
+        self.main_window.statusBar().clearMessage()
+        self.show_error(f'Changes are not saved: {error}')
+
+    def set_expense_editing_enabled(self, enabled: bool) -> None:
+        ui = self.main_window.ui
+        for widget in (ui.table_view_expense, ui.button_save_expense,
+                       ui.button_add_expense, ui.button_delete_expense):
+            widget.setEnabled(enabled)
 
     @QtCore.Slot()
     def handle_category_tree_saving(self) -> None:
+        category_changes = self.main_window.category_tree_changes.batch()
         #check if all change illegal
-        for change in self.main_window.category_tree_changes:
-            if change.operator == 'update':
-                all_tree_item_text = [
-                    item.text(0)
-                    for item in self.main_window.all_chilren_tree()
-                ]
-                try:
-                    all_tree_item_text.remove(change.new_value)
-                except ValueError:
-                    continue
-                if change.new_value in all_tree_item_text:
-                    self.dialog.label.setText("")
-                    self.dialog.label.setText('Category already exists')
-                    self.dialog.exec()
-                    return
-
-        #perform changes in database
-        for change in self.main_window.category_tree_changes:
-            if change.operator == 'update':
-                rowid = self.category_repo.get_all({'name':
-                                                    change.old_value})[0].pk
-                self.category_repo.update_item(rowid, 'name', change.new_value)
-                #update right away category in expense table
-                for i in range(
-                        self.main_window.ui.table_widget_expense.rowCount()):
-                    item = self.main_window.ui.table_widget_expense.item(i, 2)
-                    if item and item.text() == change.old_value:
-                        item.setText(change.new_value)
-            if change.operator == 'add':
-                last_row_id = self.category_repo.add_empty()
-                if change.old_value is not None:
-                    parent_id = self.category_repo.get_all(
-                        {'name': change.old_value})[0].pk
-                else:
-                    parent_id = None
-                self.category_repo.update_item(last_row_id, 'parent',
-                                               parent_id)
-                self.category_repo.update_item(last_row_id, 'name',
-                                               change.new_value)
-            if change.operator == 'delete':
-                rowid = self.category_repo.get_all({'name':
-                                                    change.old_value})[0].pk
-                self.category_repo.delete(rowid)
+        name_counts = self.main_window.category_name_counts
+        for change in category_changes:
+            if change.operator == 'update' \
+                    and name_counts[change.new_value] > 1:
+                self.show_error('Category already exists')
+                return
+
+        #tree is locked until worker saves changes
+        self.set_category_editing_enabled(False)
+        self.executor.submit(self.write_category_changes,
+                             category_changes,
+                             on_result=self.finish_category_saving,
+                             on_error=self.fail_category_saving)
+
+    def write_category_changes(
+        self, category_changes: list[changes.Change]
+    ) -> list[tuple[str, category.Category]]:
+        """
+        Write category changes in one transaction, runs in worker.
+        Returns changes for category tree, it is updated in gui thread.
+        """
+        tree = self.main_window.category_tree
+        #names changed by this save, None for deleted names
+        names: dict[str, int | None] = {}
+
+        def find(name: str) -> int:
+            if name in names:
+                pk = names[name]
+            else:
+                cat = tree.find(name)
+                pk = None if cat is None else cat.pk
+            if pk is None:
+                raise KeyError(f'Category {name} not found')
+            return pk
+
+        tree_changes: list[tuple[str, category.Category]] = []
+        with self.category_repo.session():
+            for i, change in enumerate(category_changes):
+                if change.operator == 'update':
+                    rowid = find(change.old_value)
+                    self.category_repo.update_item(rowid, 'name', change.new_value)
+                    names[change.old_value] = None
+                    names[change.new_value] = rowid
+                    tree_changes.append(
+                        ('update', category.Category(change.new_value,
+                                                     pk=rowid)))
+                if change.operator == 'add':
+                    if change.old_value is not None:
+                        parent_id = find(change.old_value)
+                    else:
+                        parent_id = None
+                    new_category = category.Category(change.new_value,
+                                                     parent_id)
+                    self.category_repo.add(new_category)
+                    names[change.new_value] = new_category.pk
+                    tree_changes.append(('add', new_category))
+                if change.operator == 'delete':
+                    rowid = find(change.old_value)
+                    self.category_repo.delete(rowid)
+                    names[change.old_value] = None
+                    tree_changes.append(
+                        ('delete', category.Category(change.old_value,
+                                                     pk=rowid)))
+                self.executor.report(i + 1, len(category_changes))
+        return tree_changes
+
+    def finish_category_saving(
+            self, tree_changes: list[tuple[str, category.Category]]) -> None:
+        #categories are found by name in tree, it is updated with database
+        tree = self.main_window.category_tree
+        renamed: list[int] = []
+        deleted = False
+        for operator, cat in tree_changes:
+            if operator == 'update':
+                tree.update(category.Category(cat.name,
+                                              tree.get(cat.pk).parent,
+                                              cat.pk))
+                renamed.append(cat.pk)
+            if operator == 'add':
+                tree.add(cat)
+            if operator == 'delete':
+                tree.remove(cat.pk)
+                deleted = True
+
+        #update right away category in expense table,
+        #only rows of renamed categories are repainted
+        self.main_window.expense_model.refresh_categories(renamed)
 
         #change also categories in combo box
         self.main_window.ui.combo_box_chose_category.clear()
@@ -213,4 +493,23 @@ class Presenter:
                 tree_widget_item.text(0))
 
         #clear cache
-        self.main_window.category_tree_changes = []
+        self.main_window.category_tree_changes.clear()
+        self.set_category_editing_enabled(True)
+        self.main_window.statusBar().showMessage('Saved', 3000)
+        #expenses of deleted categories are deleted by database,
+        #budget counters are read again
+        if deleted:
+            self.display_budget()
+
+    def fail_category_saving(self, error: BaseException) -> None:
+        #changes stay in journal and can be saved again
+        self.set_category_editing_enabled(True)
+        self.main_window.statusBar().clearMessage()
+        self.show_error(f'Changes are not saved: {error}')
+
+    def set_category_editing_enabled(self, enabled: bool) -> None:
+        ui = self.main_window.ui
+        for widget in (ui.tree_widget_category, ui.button_save_category,
+                       ui.button_add_category, ui.button_add_child_category,
+                       ui.button_delete_category):
+            widget.setEnabled(enabled)
@@ -30,6 +30,14 @@ class AbstractRepository(abc.ABC, typing.Generic[T]):
     get_all
     update
     delete
+    Методы с реализацией по умолчанию:
+    get_many
+    select
+    iter_all
+    page
+    add_many
+    update_many
+    delete_many
     """
 
     @abc.abstractmethod
@@ -39,22 +47,98 @@ class AbstractRepository(abc.ABC, typing.Generic[T]):
         также записать id в атрибут pk.
         """
 
+    def add_many(self, objs: typing.Iterable[T]) -> list[int]:
+        """
+        Добавить несколько объектов в репозиторий, вернуть список id
+        в том же порядке, также записать id в атрибут pk каждого объекта.
+        Реализация по умолчанию вызывает add для каждого объекта.
+        """
+        return [self.add(obj) for obj in objs]
+
     @abc.abstractmethod
     def get(self, pk: int) -> T | None:
         """ Получить объект по id """
 
+    def get_many(self, pks: typing.Iterable[int]) -> dict[int, T]:
+        """
+        Получить несколько объектов по id одним запросом.
+        Вернуть словарь {id: объект}, отсутствующие id пропускаются.
+        Реализация по умолчанию вызывает get для каждого id.
+        """
+        result = {}
+        for pk in pks:
+            obj = self.get(pk)
+            if obj is not None:
+                result[pk] = obj
+        return result
+
     @abc.abstractmethod
-    def get_all(self, where: dict[str, typing.Any] | None = None) -> list[T]:
+    def get_all(self, where: dict[str, typing.Any] | None = None,
+                order_by: typing.Sequence[str] | None = None,
+                limit: int | None = None,
+                offset: int | None = None) -> list[T]:
         """
         Получить все записи по некоторому условию
         where - условие в виде словаря {'название_поля': значение}
         если условие не задано (по умолчанию), вернуть все записи
+        Значением может быть пара (оператор, операнд), правила условий
+        и порядка order_by описаны в модуле query
+        limit, offset - ограничение количества записей и сдвиг
         """
 
+    def select(self, columns: typing.Sequence[str],
+               where: dict[str, typing.Any] | None = None,
+               order_by: typing.Sequence[str] | None = None,
+               limit: int | None = None,
+               offset: int | None = None) -> list[tuple[typing.Any, ...]]:
+        """
+        Получить значения только указанных полей записей в виде кортежей.
+        Параметры выборки те же, что у get_all.
+        Реализация по умолчанию вызывает get_all.
+        """
+        return [tuple(getattr(obj, column) for column in columns)
+                for obj in self.get_all(where, order_by, limit, offset)]
+
+    def iter_all(self, where: dict[str, typing.Any] | None = None,
+                 batch_size: int = 1000) -> typing.Iterator[T]:
+        """
+        Перебрать записи по условию where, не загружая их все в память.
+        batch_size - сколько записей читать из хранилища за раз.
+        Реализация по умолчанию перебирает результат get_all.
+        """
+        yield from self.get_all(where)
+
+    def page(self, after_pk: int = 0, n: int = 100,
+             where: dict[str, typing.Any] | None = None) -> list[T]:
+        """
+        Получить до n записей с id больше after_pk в порядке возрастания id
+        (постраничная выборка по ключу). Следующая страница начинается
+        после pk последней записи текущей.
+        """
+        condition = dict(where or {})
+        condition['pk'] = ('>', after_pk)
+        return self.get_all(condition, order_by=('pk', ), limit=n)
+
     @abc.abstractmethod
     def update(self, obj: T) -> None:
         """ Обновить данные об объекте. Объект должен содержать поле pk. """
 
+    def update_many(self, objs: typing.Iterable[T]) -> None:
+        """
+        Обновить данные о нескольких объектах.
+        Реализация по умолчанию вызывает update для каждого объекта.
+        """
+        for obj in objs:
+            self.update(obj)
+
     @abc.abstractmethod
     def delete(self, pk: int) -> None:
         """ Удалить запись """
+
+    def delete_many(self, pks: typing.Iterable[int]) -> None:
+        """
+        Удалить несколько записей.
+        Реализация по умолчанию вызывает delete для каждого id.
+        """
+        for pk in pks:
+            self.delete(pk)
@@ -0,0 +1,260 @@
+"""
+Модуль описывает анализ расходов на массивах NumPy
+
+Расходы загружаются за один проход в три столбца: сумма в копейках,
+id категории и номер дня от 1970-01-01. Расходы без суммы или категории
+учитываются с нулем, как в агрегатной таблице expense_rollup, поэтому
+суммы совпадают с суммами модуля totals. Расходы без даты учитываются
+в суммах по категориям, но не попадают ни в один период.
+Суммы считаются в целых числах без округления.
+
+Требует NumPy: pip install pybookkeeper[analytics]
+"""
+
+import dataclasses
+import datetime
+import sqlite3
+import typing
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError('analytics requires numpy, '
+                      'install it with pip install pybookkeeper[analytics]'
+                      ) from error
+
+from bookkeeper.models import expense
+from bookkeeper.repository import abstract_repository
+from bookkeeper.repository import codecs
+
+#номер дня для расходов без даты
+NO_DAY = np.iinfo(np.int64).min
+PERIODS = ('day', 'week', 'month', 'year')
+
+_ROW = np.dtype([('amount', np.int64), ('category', np.int64),
+                 ('day', np.int64)])
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+#юлианский день полуночи 1970-01-01
+_EPOCH_JULIAN = 2440587.5
+#1970-01-01 - четверг, сдвиг до понедельника
+_WEEK_SHIFT = 3
+
+
+@dataclasses.dataclass(slots=True)
+class ExpenseColumns:
+    """
+    Расходы по столбцам.
+    amount - суммы в копейках
+    category - id категорий, 0 - без категории
+    day - номера дней от 1970-01-01, NO_DAY - без даты
+    """
+    amount: np.ndarray
+    category: np.ndarray
+    day: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @classmethod
+    def _from_rows(cls, rows: np.ndarray) -> 'ExpenseColumns':
+        return cls(np.ascontiguousarray(rows['amount']),
+                   np.ascontiguousarray(rows['category']),
+                   np.ascontiguousarray(rows['day']))
+
+    def dated(self) -> 'ExpenseColumns':
+        """ Только расходы с датой """
+        mask = self.day != NO_DAY
+        return ExpenseColumns(self.amount[mask], self.category[mask],
+                              self.day[mask])
+
+
+def from_connection(con: sqlite3.Connection,
+                    batch_size: int = 65_536) -> ExpenseColumns:
+    """
+    Загрузить все расходы из базы за один проход курсора,
+    строки переводятся в массив пачками по batch_size.
+    Даты переводятся в номера дней запросом, строки не разбираются в Python.
+    """
+    cursor = con.execute(
+        'SELECT COALESCE(amount, 0), COALESCE(category, 0), '
+        f'COALESCE(CAST(julianday(date) - {_EPOCH_JULIAN} AS INTEGER), ?) '
+        'FROM expense', (int(NO_DAY), ))
+    batches = [np.empty((0, 3), dtype=np.int64)]
+    try:
+        while rows := cursor.fetchmany(batch_size):
+            batches.append(np.array(rows, dtype=np.int64))
+    finally:
+        cursor.close()
+    table = np.concatenate(batches)
+    return ExpenseColumns(*(np.ascontiguousarray(table[:, i]) for i in range(3)))
+
+
+def _day(date: str | None) -> int:
+    if not date:
+        return int(NO_DAY)
+    return datetime.date.fromisoformat(date).toordinal() - _EPOCH
+
+
+def from_repository(
+    repo: abstract_repository.AbstractRepository[expense.Expense],
+    where: dict[str, typing.Any] | None = None,
+    batch_size: int = 10_000
+) -> ExpenseColumns:
+    """
+    Загрузить расходы по условию where из любого репозитория,
+    перебирая их страницами по batch_size записей
+    """
+    rows = ((codecs.encode_money(exp.amount) or 0, exp.category or 0,
+             _day(exp.date))
+            for exp in repo.iter_all(where, batch_size))
+    return ExpenseColumns._from_rows(np.fromiter(rows, dtype=_ROW))
+
+
+def _group_sum(keys: np.ndarray,
+               values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ Суммы values по одинаковым keys, ключи по возрастанию """
+    if not len(keys):
+        return keys, values
+    low, high = keys.min(), keys.max()
+    if high - low <= len(keys):
+        #плотные ключи (дни, категории) складываются без сортировки
+        sums = np.zeros(high - low + 1, dtype=values.dtype)
+        np.add.at(sums, keys - low, values)
+        present = np.flatnonzero(np.bincount(keys - low))
+        return present + low, sums[present]
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(values[order], starts)
+
+
+def sums_by_category(columns: ExpenseColumns) -> dict[int, int]:
+    """ Суммы расходов всех категорий в виде словаря {id: сумма} """
+    keys, sums = _group_sum(columns.category, columns.amount)
+    return dict(zip(keys.tolist(), sums.tolist()))
+
+
+def period_starts(days: np.ndarray, period: str) -> np.ndarray:
+    """
+    Номера первых дней периодов, в которые попадают дни.
+    Неделя начинается с понедельника.
+    """
+    if period == 'day':
+        return days
+    if period == 'week':
+        return days - (days + _WEEK_SHIFT) % 7
+    if period in ('month', 'year'):
+        unit = 'M' if period == 'month' else 'Y'
+        return days.astype('datetime64[D]').astype(f'datetime64[{unit}]') \
+            .astype('datetime64[D]').astype(np.int64)
+    raise ValueError(f'unknown period {period!r}')
+
+
+def _iso(days: np.ndarray) -> list[str]:
+    return np.datetime_as_string(days.astype('datetime64[D]')).tolist()
+
+
+def sums_by_period(columns: ExpenseColumns, period: str) -> dict[str, int]:
+    """
+    Суммы расходов по периодам.
+
+    Parameters
+    ----------
+    columns - расходы
+    period - 'day', 'week', 'month' или 'year'
+
+    Returns
+    -------
+    Словарь {первый день периода YYYY-MM-DD: сумма} по возрастанию дат
+    """
+    dated = columns.dated()
+    keys, sums = _group_sum(period_starts(dated.day, period), dated.amount)
+    return dict(zip(_iso(keys), sums.tolist()))
+
+
+def sum_by_periods(columns: ExpenseColumns,
+                   day: datetime.date) -> dict[str, int]:
+    """
+    Суммы расходов за день, неделю, месяц и год, в которые попадает day,
+    как totals.sum_by_periods
+    """
+    dated = columns.dated()
+    today = np.array([day.toordinal() - _EPOCH])
+    return {
+        period: int(dated.amount[period_starts(dated.day, period) ==
+                                 period_starts(today, period)[0]].sum())
+        for period in PERIODS
+    }
+
+
+def _series(columns: ExpenseColumns,
+            unit: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Суммы по всем дням (unit 'D') или месяцам (unit 'M') от первого
+    до последнего расхода, периоды без расходов входят с нулевой суммой
+    """
+    dated = columns.dated()
+    keys = dated.day.astype('datetime64[D]').astype(f'datetime64[{unit}]') \
+        .astype(np.int64)
+    keys, group = _group_sum(keys, dated.amount)
+    if not len(keys):
+        return np.array([], dtype='datetime64[D]'), group
+    sums = np.zeros(keys[-1] - keys[0] + 1, dtype=np.int64)
+    sums[keys - keys[0]] = group
+    periods = np.arange(keys[0], keys[-1] + 1).astype(f'datetime64[{unit}]')
+    return periods.astype('datetime64[D]'), sums
+
+
+def daily_sums(columns: ExpenseColumns) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Суммы по дням от первого до последнего расхода.
+
+    Returns
+    -------
+    Массив дней (datetime64[D]) и массив сумм, дни без расходов - с нулем
+    """
+    return _series(columns, 'D')
+
+
+def rolling_mean(columns: ExpenseColumns,
+                 window: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Скользящее среднее расходов в день за window последних дней.
+    В первые дни, пока окно не заполнено, среднее считается
+    по прошедшим дням.
+
+    Returns
+    -------
+    Массив дней (datetime64[D]) и массив средних в копейках
+    """
+    if window < 1:
+        raise ValueError('window must be positive')
+    days, sums = daily_sums(columns)
+    totals = np.concatenate(([0], np.cumsum(sums)))
+    counts = np.minimum(np.arange(1, len(sums) + 1), window)
+    ends = np.arange(1, len(sums) + 1)
+    return days, (totals[ends] - totals[ends - counts]) / counts
+
+
+def percentiles(columns: ExpenseColumns,
+                q: typing.Sequence[float] = (50, 90, 99)) -> dict[float, float]:
+    """
+    Процентили сумм отдельных расходов в копейках,
+    q - процентили от 0 до 100
+    """
+    if not len(columns):
+        return {p: float('nan') for p in q}
+    return dict(zip(q, np.percentile(columns.amount, q).tolist()))
+
+
+def month_deltas(columns: ExpenseColumns) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Изменение суммы расходов месяца по сравнению с предыдущим месяцем.
+
+    Returns
+    -------
+    Массив первых дней месяцев (datetime64[D]), начиная со второго месяца
+    с расходами, и массив изменений сумм в копейках
+    """
+    months, sums = _series(columns, 'M')
+    return months[1:], np.diff(sums)
@@ -0,0 +1,271 @@
+"""
+Модуль описывает асинхронные репозитории для использования в asyncio
+
+Асинхронный репозиторий повторяет интерфейс AbstractRepository, но все
+методы являются корутинами, а перебор записей выполняется асинхронным
+итератором.
+"""
+
+import abc
+import asyncio
+import concurrent.futures
+import functools
+import typing
+
+from bookkeeper.repository.abstract_repository import T
+from bookkeeper.repository import connection
+from bookkeeper.repository import memory_repository
+from bookkeeper.repository import sqlite_repository
+
+
+class AsyncAbstractRepository(abc.ABC, typing.Generic[T]):
+    """
+    Абстрактный асинхронный репозиторий.
+    Абстрактные методы:
+    add
+    get
+    get_all
+    update
+    delete
+    Методы с реализацией по умолчанию:
+    get_many
+    iter_all
+    page
+    add_many
+    update_many
+    delete_many
+    """
+
+    @abc.abstractmethod
+    async def add(self, obj: T) -> int:
+        """
+        Добавить объект в репозиторий, вернуть id объекта,
+        также записать id в атрибут pk.
+        """
+
+    async def add_many(self, objs: typing.Iterable[T]) -> list[int]:
+        """
+        Добавить несколько объектов, вернуть список id в том же порядке.
+        Реализация по умолчанию вызывает add для каждого объекта.
+        """
+        return [await self.add(obj) for obj in objs]
+
+    @abc.abstractmethod
+    async def get(self, pk: int) -> T | None:
+        """ Получить объект по id """
+
+    async def get_many(self, pks: typing.Iterable[int]) -> dict[int, T]:
+        """
+        Получить несколько объектов по id, отсутствующие id пропускаются.
+        Реализация по умолчанию вызывает get для каждого id.
+        """
+        result = {}
+        for pk in pks:
+            obj = await self.get(pk)
+            if obj is not None:
+                result[pk] = obj
+        return result
+
+    @abc.abstractmethod
+    async def get_all(self, where: dict[str, typing.Any] | None = None,
+                      order_by: typing.Sequence[str] | None = None,
+                      limit: int | None = None,
+                      offset: int | None = None) -> list[T]:
+        """
+        Получить все записи по некоторому условию,
+        параметры те же, что у AbstractRepository.get_all
+        """
+
+    async def page(self, after_pk: int = 0, n: int = 100,
+                   where: dict[str, typing.Any] | None = None) -> list[T]:
+        """
+        Получить до n записей с id больше after_pk в порядке возрастания id
+        """
+        condition = dict(where or {})
+        condition['pk'] = ('>', after_pk)
+        return await self.get_all(condition, order_by=('pk', ), limit=n)
+
+    async def iter_all(self, where: dict[str, typing.Any] | None = None,
+                       batch_size: int = 1000) -> typing.AsyncIterator[T]:
+        """
+        Перебрать записи по условию where страницами по batch_size записей,
+        не загружая их все в память.
+        """
+        after_pk = 0
+        while True:
+            batch = await self.page(after_pk, batch_size, where)
+            for obj in batch:
+                yield obj
+            if len(batch) < batch_size:
+                return
+            after_pk = batch[-1].pk
+
+    @abc.abstractmethod
+    async def update(self, obj: T) -> None:
+        """ Обновить данные об объекте. Объект должен содержать поле pk. """
+
+    async def update_many(self, objs: typing.Iterable[T]) -> None:
+        """
+        Обновить данные о нескольких объектах.
+        Реализация по умолчанию вызывает update для каждого объекта.
+        """
+        for obj in objs:
+            await self.update(obj)
+
+    @abc.abstractmethod
+    async def delete(self, pk: int) -> None:
+        """ Удалить запись """
+
+    async def delete_many(self, pks: typing.Iterable[int]) -> None:
+        """
+        Удалить несколько записей.
+        Реализация по умолчанию вызывает delete для каждого id.
+        """
+        for pk in pks:
+            await self.delete(pk)
+
+
+class AsyncMemoryRepository(AsyncAbstractRepository[T]):
+    """
+    Асинхронный репозиторий в оперативной памяти.
+    Операции выполняются сразу в потоке цикла событий, поэтому
+    каждая из них атомарна относительно других задач.
+    Параметры индексов те же, что у MemoryRepository.
+    """
+
+    def __init__(self, index_on: typing.Iterable[str] = (),
+                 range_index_on: typing.Iterable[str] = ()) -> None:
+        self._repo = memory_repository.MemoryRepository[T](
+            index_on, range_index_on)
+
+    async def add(self, obj: T) -> int:
+        return self._repo.add(obj)
+
+    async def add_many(self, objs: typing.Iterable[T]) -> list[int]:
+        return self._repo.add_many(objs)
+
+    async def get(self, pk: int) -> T | None:
+        return self._repo.get(pk)
+
+    async def get_many(self, pks: typing.Iterable[int]) -> dict[int, T]:
+        return self._repo.get_many(pks)
+
+    async def get_all(self, where: dict[str, typing.Any] | None = None,
+                      order_by: typing.Sequence[str] | None = None,
+                      limit: int | None = None,
+                      offset: int | None = None) -> list[T]:
+        return self._repo.get_all(where, order_by, limit, offset)
+
+    async def update(self, obj: T) -> None:
+        self._repo.update(obj)
+
+    async def update_many(self, objs: typing.Iterable[T]) -> None:
+        self._repo.update_many(objs)
+
+    async def delete(self, pk: int) -> None:
+        self._repo.delete(pk)
+
+    async def delete_many(self, pks: typing.Iterable[int]) -> None:
+        self._repo.delete_many(pks)
+
+
+class AsyncSQLiteRepository(AsyncAbstractRepository[T]):
+    """
+    Асинхронный репозиторий на базе SQLite.
+    Запросы выполняются синхронным SQLiteRepository в потоках:
+    все изменения выполняются по очереди в одном потоке записи на одном
+    соединении, чтение - в пуле потоков чтения, у каждого потока своё
+    соединение. База работает в режиме WAL, в котором чтение
+    не блокируется записью: созданный репозиторием менеджер соединений
+    использует профиль TUNED, переданный менеджер должен использовать
+    профиль с журналом WAL (TUNED, DURABLE), иначе вызывается ValueError.
+    Репозитории одной базы должны использовать общие менеджер соединений
+    и пулы потоков (connection_manager, writer, readers). Созданные
+    репозиторием пулы и менеджер соединений закрываются методом close.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        cls: type,
+        connection_manager: connection.ConnectionManager | None = None,
+        writer: concurrent.futures.ThreadPoolExecutor | None = None,
+        readers: concurrent.futures.ThreadPoolExecutor | None = None,
+        max_readers: int = 4
+    ) -> None:
+        if connection_manager is None:
+            self._owns_manager = True
+            connection_manager = connection.ConnectionManager(
+                db_file, connection.TUNED)
+        elif connection_manager.profile.journal_mode.upper() != 'WAL':
+            raise ValueError(
+                'connection_manager must use a WAL profile, got journal_mode '
+                f'{connection_manager.profile.journal_mode!r}')
+        else:
+            self._owns_manager = False
+        self.connection_manager = connection_manager
+        self._repo = sqlite_repository.SQLiteRepository[T](
+            db_file, cls, connection_manager)
+        self._owned: list[concurrent.futures.ThreadPoolExecutor] = []
+        if writer is None:
+            writer = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='sqlite-writer')
+            self._owned.append(writer)
+        if readers is None:
+            readers = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_readers, thread_name_prefix='sqlite-reader')
+            self._owned.append(readers)
+        self.writer = writer
+        self.readers = readers
+
+    async def _run(self, executor: concurrent.futures.Executor,
+                   func: typing.Callable[..., typing.Any],
+                   *args: typing.Any) -> typing.Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(func, *args))
+
+    async def add(self, obj: T) -> int:
+        return typing.cast(int, await self._run(self.writer, self._repo.add, obj))
+
+    async def add_many(self, objs: typing.Iterable[T]) -> list[int]:
+        return typing.cast(list[int], await self._run(
+            self.writer, self._repo.add_many, list(objs)))
+
+    async def get(self, pk: int) -> T | None:
+        return typing.cast(T | None, await self._run(
+            self.readers, self._repo.get, pk))
+
+    async def get_many(self, pks: typing.Iterable[int]) -> dict[int, T]:
+        return typing.cast(dict[int, T], await self._run(
+            self.readers, self._repo.get_many, list(pks)))
+
+    async def get_all(self, where: dict[str, typing.Any] | None = None,
+                      order_by: typing.Sequence[str] | None = None,
+                      limit: int | None = None,
+                      offset: int | None = None) -> list[T]:
+        return typing.cast(list[T], await self._run(
+            self.readers, self._repo.get_all, where, order_by, limit, offset))
+
+    async def update(self, obj: T) -> None:
+        await self._run(self.writer, self._repo.update, obj)
+
+    async def update_many(self, objs: typing.Iterable[T]) -> None:
+        await self._run(self.writer, self._repo.update_many, list(objs))
+
+    async def delete(self, pk: int) -> None:
+        await self._run(self.writer, self._repo.delete, pk)
+
+    async def delete_many(self, pks: typing.Iterable[int]) -> None:
+        await self._run(self.writer, self._repo.delete_many, list(pks))
+
+    async def close(self) -> None:
+        """
+        Дождаться запросов и закрыть созданные репозиторием пулы потоков
+        и соединения
+        """
+        for executor in self._owned:
+            await asyncio.get_running_loop().run_in_executor(
+                None, executor.shutdown)
+        self._owned.clear()
+        if self._owns_manager:
+            self.connection_manager.close()
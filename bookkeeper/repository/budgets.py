@@ -0,0 +1,82 @@
+"""
+Модуль описывает проверку превышения бюджетов
+
+Расходы текущих периодов считаются в памяти, границы периодов
+задаются так же, как в модуле totals, а начальные суммы берутся
+из его запросов.
+"""
+
+import datetime
+import decimal
+import typing
+
+from bookkeeper.models import budget
+from bookkeeper.repository import abstract_repository
+from bookkeeper.repository import totals
+
+
+class BudgetChecker:
+    """
+    Проверка бюджетов по счетчикам расходов текущих периодов.
+    Счетчики хранят суммы расходов за текущие день, неделю, месяц и год
+    и меняются при каждой записи расхода за O(1), без запросов к базе.
+    Счетчики сверяются с базой методом reconcile при запуске и после
+    изменений, которые проходят мимо счетчиков (например, каскадного
+    удаления расходов вместе с категорией), а также при смене дня.
+    """
+
+    def __init__(self, budgets: typing.Iterable[budget.Budget] = (),
+                 day: datetime.date | None = None) -> None:
+        self.budgets: dict[str, budget.Budget] = {}
+        for item in budgets:
+            self.budgets[item.tern] = item
+        self.reconcile(day or datetime.date.today(), {})
+
+    @classmethod
+    def from_repo(
+        cls, repo: abstract_repository.AbstractRepository[budget.Budget],
+        day: datetime.date | None = None
+    ) -> 'BudgetChecker':
+        """ Проверка по всем бюджетам репозитория, счетчики пустые """
+        return cls(repo.get_all(), day)
+
+    def reconcile(self, day: datetime.date,
+                  sums: typing.Mapping[str, decimal.Decimal]) -> None:
+        """
+        Начать счет периодов, в которые попадает day, с сумм расходов
+        из базы (например, totals.sum_by_periods)
+        """
+        self.day = day
+        self._bounds = totals.period_bounds(day)
+        self.spent = {period: decimal.Decimal(sums.get(period, 0))
+                      for period in self._bounds}
+
+    def limit(self, period: str) -> decimal.Decimal | None:
+        """ Сумма бюджета на период, None - бюджета нет """
+        item = self.budgets.get(period)
+        return None if item is None else item.amount
+
+    def set_budget(self, new_budget: budget.Budget) -> None:
+        """ Добавить или заменить бюджет на период new_budget.tern """
+        self.budgets[new_budget.tern] = new_budget
+
+    def add(self, amount: decimal.Decimal | None, date: str | None) -> None:
+        """
+        Учесть расход суммы amount в день date (YYYY-MM-DD),
+        отрицательная сумма отменяет расход
+        """
+        if amount is None or not date:
+            return
+        for period, (start, end) in self._bounds.items():
+            if start <= date < end:
+                self.spent[period] += amount
+
+    def remove(self, amount: decimal.Decimal | None, date: str | None) -> None:
+        """ Отменить расход суммы amount в день date """
+        if amount is not None:
+            self.add(-amount, date)
+
+    def exceeded(self) -> list[str]:
+        """ Периоды, расходы которых превысили бюджет """
+        return [period for period, spent in self.spent.items()
+                if (limit := self.limit(period)) is not None and spent > limit]
@@ -0,0 +1,265 @@
+"""
+Модуль описывает кеширующий репозиторий
+
+CachedRepository оборачивает любой репозиторий и запоминает результаты
+get по id и get_all по условию выборки. Записи кеша вытесняются в порядке
+LRU при превышении maxsize и устаревают через ttl секунд. Изменения,
+которые проходят через кеширующий репозиторий, сбрасывают только
+затронутые записи кеша: объект по его id и выборки, в которые объект
+входил или начинает входить. Изменения в обход кеширующего репозитория
+(другим репозиторием или напрямую в базе) становятся видны после
+истечения ttl или вызова clear.
+"""
+
+import collections
+import contextlib
+import dataclasses
+import threading
+import time
+import typing
+
+from bookkeeper.repository import abstract_repository
+from bookkeeper.repository.abstract_repository import T
+from bookkeeper.repository import query
+
+_MISSING = object()
+
+
+@dataclasses.dataclass(slots=True)
+class CacheStats:
+    """
+    Счетчики кеша.
+    hits - запросы, выполненные из кеша
+    misses - запросы, переданные внутреннему репозиторию
+    evictions - записи, вытесненные из-за ограничения размера
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class _LRU:
+    """ Словарь с вытеснением в порядке LRU и сроком жизни записей """
+
+    def __init__(self, maxsize: int, ttl: float | None,
+                 stats: CacheStats) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = stats
+        # ключ -> (время устаревания, значение)
+        self.entries: collections.OrderedDict[
+            typing.Hashable, tuple[float, typing.Any]] = collections.OrderedDict()
+
+    def get(self, key: typing.Hashable) -> typing.Any:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.entries.pop(key, None)
+            self.stats.misses += 1
+            return _MISSING
+        self.entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = float('inf') if self.ttl is None else time.monotonic() + self.ttl
+        self.entries[key] = (expires, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+def _freeze(value: typing.Any) -> typing.Hashable:
+    """ Операнд условия в хешируемом виде """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return typing.cast(typing.Hashable, value)
+
+
+def _query_key(where: dict[str, typing.Any] | None,
+               order_by: typing.Sequence[str] | None,
+               limit: int | None,
+               offset: int | None) -> typing.Hashable | None:
+    """
+    Ключ выборки: одинаковые условия, записанные по-разному (порядок полей,
+    значение или пара ('=', значение), список или кортеж), дают один ключ.
+    None, если операнды нельзя сделать ключом.
+    """
+    conditions = []
+    for field, condition in (where or {}).items():
+        op, operand = query.split(condition)
+        conditions.append((field, op, _freeze(operand)))
+    key = (tuple(sorted(conditions, key=lambda c: c[0])),
+           tuple(order_by or ()), limit, offset)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class CachedRepository(abstract_repository.AbstractRepository[T]):
+    """
+    Кеширующий репозиторий поверх репозитория inner.
+    maxsize - наибольшее число объектов по id и наибольшее число выборок
+    в кеше, ttl - срок жизни записи кеша в секундах, None - бессрочно.
+    Объекты из кеша общие для всех, кто их получил, как в MemoryRepository.
+    Счетчики попаданий, промахов и вытеснений хранятся в атрибуте stats.
+    """
+
+    def __init__(self, inner: abstract_repository.AbstractRepository[T],
+                 maxsize: int = 1024, ttl: float | None = None) -> None:
+        self.inner = inner
+        self.stats = CacheStats()
+        self._objects = _LRU(maxsize, ttl, self.stats)
+        self._queries = _LRU(maxsize, ttl, self.stats)
+        self._lock = threading.RLock()
+        # номер сброса, результат чтения не запоминается, если во время
+        # чтения из внутреннего репозитория кеш сбрасывался
+        self._generation = 0
+
+    def clear(self) -> None:
+        """ Сбросить весь кеш """
+        with self._lock:
+            self._generation += 1
+            self._objects.entries.clear()
+            self._queries.entries.clear()
+
+    def _invalidate(self, pk: int, obj: typing.Any = _MISSING) -> None:
+        """
+        Сбросить объект pk и выборки, которые его содержат или могут
+        содержать объект obj (новое состояние объекта). Если новое
+        состояние неизвестно, сбрасываются все выборки.
+        """
+        with self._lock:
+            self._generation += 1
+            self._objects.entries.pop(pk, None)
+            stale = [
+                key for key, (_, result) in self._queries.entries.items()
+                if obj is _MISSING or result[3] or pk in result[1]
+                or query.matches(obj, result[0])
+            ]
+            for key in stale:
+                del self._queries.entries[key]
+
+    def add(self, obj: T) -> int:
+        pk = self.inner.add(obj)
+        self._invalidate(pk, obj)
+        return pk
+
+    def add_many(self, objs: typing.Iterable[T]) -> list[int]:
+        objs = list(objs)
+        pks = self.inner.add_many(objs)
+        for pk, obj in zip(pks, objs):
+            self._invalidate(pk, obj)
+        return pks
+
+    def get(self, pk: int) -> T | None:
+        with self._lock:
+            obj = self._objects.get(pk)
+            generation = self._generation
+        if obj is not _MISSING:
+            return typing.cast(T | None, obj)
+        obj = self.inner.get(pk)
+        with self._lock:
+            if generation == self._generation:
+                self._objects.put(pk, obj)
+        return obj
+
+    def get_many(self, pks: typing.Iterable[int]) -> dict[int, T]:
+        result: dict[int, T] = {}
+        missing = []
+        with self._lock:
+            for pk in set(pks):
+                obj = self._objects.get(pk)
+                if obj is _MISSING:
+                    missing.append(pk)
+                elif obj is not None:
+                    result[pk] = obj
+            generation = self._generation
+        if missing:
+            found = self.inner.get_many(missing)
+            with self._lock:
+                if generation == self._generation:
+                    for pk in missing:
+                        self._objects.put(pk, found.get(pk))
+            result.update(found)
+        return result
+
+    def get_all(self, where: dict[str, typing.Any] | None = None,
+                order_by: typing.Sequence[str] | None = None,
+                limit: int | None = None,
+                offset: int | None = None) -> list[T]:
+        key = _query_key(where, order_by, limit, offset)
+        if key is None:
+            return self.inner.get_all(where, order_by, limit, offset)
+        with self._lock:
+            cached = self._queries.get(key)
+            generation = self._generation
+        if cached is not _MISSING:
+            return list(cached[2])
+        objs = self.inner.get_all(where, order_by, limit, offset)
+        with self._lock:
+            if generation == self._generation:
+                # условие, id и объекты результата; выборку со сдвигом
+                # меняет изменение любой записи перед ней
+                self._queries.put(key, (dict(where or {}),
+                                        frozenset(obj.pk for obj in objs),
+                                        tuple(objs), bool(offset)))
+        return objs
+
+    def select(self, columns: typing.Sequence[str],
+               where: dict[str, typing.Any] | None = None,
+               order_by: typing.Sequence[str] | None = None,
+               limit: int | None = None,
+               offset: int | None = None) -> list[tuple[typing.Any, ...]]:
+        return self.inner.select(columns, where, order_by, limit, offset)
+
+    def iter_all(self, where: dict[str, typing.Any] | None = None,
+                 batch_size: int = 1000) -> typing.Iterator[T]:
+        return self.inner.iter_all(where, batch_size)
+
+    def page(self, after_pk: int = 0, n: int = 100,
+             where: dict[str, typing.Any] | None = None) -> list[T]:
+        return self.inner.page(after_pk, n, where)
+
+    def update(self, obj: T) -> None:
+        self.inner.update(obj)
+        self._invalidate(obj.pk, obj)
+
+    def update_many(self, objs: typing.Iterable[T]) -> None:
+        objs = list(objs)
+        self.inner.update_many(objs)
+        for obj in objs:
+            self._invalidate(obj.pk, obj)
+
+    def update_item(self, row: int, col: str, value: typing.Any) -> None:
+        """ Изменить одно поле записи, если внутренний репозиторий это умеет """
+        typing.cast(typing.Any, self.inner).update_item(row, col, value)
+        self._invalidate(row)
+
+    def delete(self, pk: int) -> None:
+        self.delete_many([pk])
+
+    def delete_many(self, pks: typing.Iterable[int]) -> None:
+        # удаление может затронуть другие записи (подкатегории удаляются
+        # вместе с категорией), поэтому кеш сбрасывается целиком
+        self.inner.delete_many(pks)
+        self.clear()
+
+    @contextlib.contextmanager
+    def session(self) -> typing.Iterator[typing.Any]:
+        """
+        Сессия внутреннего репозитория. Если транзакция откатывается,
+        кеш сбрасывается, так как мог запомнить несохраненные данные.
+        """
+        try:
+            with typing.cast(typing.Any, self.inner).session() as con:
+                yield con
+        except BaseException:
+            self.clear()
+            raise
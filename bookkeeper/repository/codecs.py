@@ -0,0 +1,126 @@
+"""
+Модуль описывает преобразование значений полей моделей в значения SQLite
+
+Кодек поля задается типом из аннотации модели:
+- datetime.datetime хранится строкой ISO 8601 вида YYYY-MM-DD HH:MM:SS[.ffffff],
+  такие строки сравниваются и сортируются как сами даты;
+- decimal.Decimal (денежные суммы) хранится целым числом младших единиц
+  валюты (копеек), поэтому суммы и сравнения считаются в SQLite без
+  ошибок округления.
+Пустое значение (None) хранится как NULL. Остальные типы хранятся
+без преобразования.
+"""
+
+import datetime
+import decimal
+import typing
+
+#младших единиц валюты в одной старшей
+MINOR_UNITS = 100
+#младшая единица, точность сумм
+_CENT = decimal.Decimal('0.01')
+
+
+class Codec(typing.NamedTuple):
+    """
+    Кодек поля.
+    encode - значение поля в значение SQLite
+    decode - значение SQLite в значение поля
+    decode_column - столбец значений SQLite в значения поля
+    """
+    encode: typing.Callable[[typing.Any], typing.Any]
+    decode: typing.Callable[[typing.Any], typing.Any]
+    decode_column: typing.Callable[[typing.Sequence[typing.Any]],
+                                   typing.Iterable[typing.Any]]
+
+
+def encode_datetime(value: datetime.datetime | None) -> str | None:
+    """ Дата и время в строку ISO 8601 """
+    if value is None:
+        return None
+    return value.isoformat(' ')
+
+
+def decode_datetime(value: str | None) -> datetime.datetime | None:
+    """ Строка ISO 8601 в дату и время """
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value)
+
+
+def decode_datetime_column(
+    values: typing.Sequence[str | None]
+) -> typing.Iterable[datetime.datetime | None]:
+    """ Столбец строк ISO 8601 в даты и время """
+    if None in values:
+        return map(decode_datetime, values)
+    return map(datetime.datetime.fromisoformat,
+               typing.cast(typing.Sequence[str], values))
+
+
+def encode_money(value: decimal.Decimal | int | str | None) -> int | None:
+    """
+    Сумма в целое число младших единиц,
+    доли младшей единицы округляются до четного
+    """
+    if value is None:
+        return None
+    return int((decimal.Decimal(value) * MINOR_UNITS).to_integral_value(
+        decimal.ROUND_HALF_EVEN))
+
+
+def decode_money(value: int | None) -> decimal.Decimal | None:
+    """ Целое число младших единиц в сумму с двумя знаками после запятой """
+    if value is None:
+        return None
+    return decimal.Decimal(value) * _CENT
+
+
+def decode_money_column(
+    values: typing.Sequence[int | None]
+) -> typing.Iterable[decimal.Decimal | None]:
+    """
+    Столбец целых чисел младших единиц в суммы, столбец без NULL
+    переводится без вызова функции Python на каждое значение
+    """
+    if None in values:
+        return map(decode_money, values)
+    return map(_CENT.__mul__, map(decimal.Decimal,
+                                  typing.cast(typing.Sequence[int], values)))
+
+
+def parse_money(text: str) -> decimal.Decimal:
+    """
+    Разобрать сумму, введенную пользователем, например '12', '12.5', '12,50'.
+    Вызывает ValueError, если текст не является суммой
+    или содержит доли младшей единицы.
+    """
+    try:
+        value = decimal.Decimal(text.strip().replace(',', '.'))
+        rounded = value.quantize(_CENT)
+    except decimal.InvalidOperation:
+        raise ValueError(f'illegal amount {text!r}') from None
+    #NaN is not equal to itself
+    if rounded != value:
+        raise ValueError(f'illegal amount {text!r}')
+    return rounded
+
+
+DATETIME = Codec(encode_datetime, decode_datetime, decode_datetime_column)
+MONEY = Codec(encode_money, decode_money, decode_money_column)
+
+CODECS: dict[type, Codec] = {
+    datetime.datetime: DATETIME,
+    decimal.Decimal: MONEY,
+}
+
+
+def for_type(annotation: typing.Any) -> Codec | None:
+    """
+    Кодек для типа из аннотации поля, для типа вида X | None - кодек X.
+    None, если значения хранятся без преобразования.
+    """
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if len(args) == 1:
+        annotation = args[0]
+    return CODECS.get(annotation)
@@ -0,0 +1,172 @@
+"""
+Модуль описывает менеджер соединений с базой данных SQLite
+
+Менеджер держит одно долгоживущее соединение на поток и позволяет
+объединять несколько операций репозиториев в одну транзакцию (сессию).
+Каждое соединение при открытии настраивается профилем ConnectionProfile.
+"""
+
+import contextlib
+import dataclasses
+import sqlite3
+import threading
+import typing
+
+from bookkeeper.repository import migrations
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionProfile:
+    """
+    Настройки соединения SQLite, применяются один раз при открытии.
+    journal_mode - режим журнала (WAL - чтение не блокируется записью,
+    commit не требует синхронизации основного файла базы)
+    synchronous - когда выполняется fsync (NORMAL в режиме WAL теряет
+    при сбое питания только последние транзакции, но не портит базу)
+    cache_size - размер кеша страниц, отрицательное значение в КиБ
+    mmap_size - сколько байт файла читать через отображение в память
+    temp_store - где хранить временные таблицы и индексы
+    busy_timeout - сколько мс ждать снятия блокировки другим соединением
+    checkpoint_every - через сколько фиксаций переносить журнал WAL
+    в файл базы (wal_checkpoint), 0 - только автоматически
+    optimize_on_close - выполнить PRAGMA optimize при закрытии соединений
+    """
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    cache_size: int = -64_000
+    mmap_size: int = 256 * 2 ** 20
+    temp_store: str = 'MEMORY'
+    busy_timeout: int = 5000
+    checkpoint_every: int = 1000
+    optimize_on_close: bool = True
+
+    def __post_init__(self) -> None:
+        # значения подставляются в текст PRAGMA, поэтому проверяются
+        choices = {
+            'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY',
+                             'WAL', 'OFF'),
+            'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+            'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+        }
+        for name, allowed in choices.items():
+            if getattr(self, name).upper() not in allowed:
+                raise ValueError(f'{name} must be one of {allowed}')
+        for name in ('cache_size', 'mmap_size', 'busy_timeout',
+                     'checkpoint_every'):
+            if not isinstance(getattr(self, name), int):
+                raise ValueError(f'{name} must be int')
+
+    def apply(self, con: sqlite3.Connection) -> None:
+        """ Настроить соединение """
+        con.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        con.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        con.execute(f'PRAGMA synchronous = {self.synchronous}')
+        con.execute(f'PRAGMA cache_size = {self.cache_size}')
+        con.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+        con.execute(f'PRAGMA temp_store = {self.temp_store}')
+        con.execute("PRAGMA foreign_keys = ON")
+
+
+# настройки SQLite по умолчанию: журнал отката и fsync на каждую фиксацию
+LEGACY = ConnectionProfile(journal_mode='DELETE', synchronous='FULL',
+                           cache_size=-2000, mmap_size=0, temp_store='DEFAULT',
+                           checkpoint_every=0, optimize_on_close=False)
+# журнал WAL с отложенной синхронизацией, профиль по умолчанию
+TUNED = ConnectionProfile()
+# журнал WAL с fsync на каждую фиксацию
+DURABLE = ConnectionProfile(synchronous='FULL')
+
+PROFILES = {'legacy': LEGACY, 'tuned': TUNED, 'durable': DURABLE}
+
+
+class ConnectionManager:
+    """
+    Менеджер соединений с файлом базы данных.
+    Соединение открывается при первом обращении из потока и переиспользуется
+    всеми репозиториями, которым передан этот менеджер.
+    profile - настройки соединений
+    migrate - при первом соединении привести схему базы к текущей версии
+    """
+
+    def __init__(self, db_file: str,
+                 profile: ConnectionProfile = TUNED,
+                 migrate: bool = True) -> None:
+        self.db_file = db_file
+        self.profile = profile
+        self._migrate = migrate
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._commits = 0
+
+    def connection(self) -> sqlite3.Connection:
+        """ Получить соединение текущего потока, открыв его при необходимости """
+        con: sqlite3.Connection | None = getattr(self._local, 'connection', None)
+        if con is None:
+            con = sqlite3.connect(self.db_file, check_same_thread=False,
+                                  timeout=self.profile.busy_timeout / 1000)
+            self.profile.apply(con)
+            if self._migrate:
+                # миграции выполняются под блокировкой записи базы,
+                # поэтому повторный запуск из другого потока безопасен
+                migrations.migrate(con)
+                self._migrate = False
+            self._local.connection = con
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(con)
+        return con
+
+    def in_session(self) -> bool:
+        """ Выполняется ли текущий поток внутри сессии """
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextlib.contextmanager
+    def session(self) -> typing.Iterator[sqlite3.Connection]:
+        """
+        Единица работы: все операции внутри блока выполняются в одной
+        транзакции и фиксируются одним commit при выходе из внешнего блока.
+        При исключении транзакция откатывается.
+        Сессии могут быть вложенными.
+        """
+        con = self.connection()
+        self._local.depth += 1
+        try:
+            yield con
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                con.rollback()
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._commit(con)
+
+    def commit(self) -> None:
+        """ Зафиксировать изменения, если поток не находится внутри сессии """
+        if not self.in_session():
+            self._commit(self.connection())
+
+    def _commit(self, con: sqlite3.Connection) -> None:
+        """ Зафиксировать транзакцию, периодически переносить журнал WAL """
+        con.commit()
+        every = self.profile.checkpoint_every
+        if not every or self.profile.journal_mode.upper() != 'WAL':
+            return
+        with self._lock:
+            self._commits += 1
+            checkpoint = self._commits % every == 0
+        if checkpoint:
+            con.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+
+    def close(self) -> None:
+        """ Закрыть соединения всех потоков """
+        with self._lock:
+            for con in self._connections:
+                if self.profile.optimize_on_close:
+                    # обновить статистику для планировщика запросов
+                    with contextlib.suppress(sqlite3.Error):
+                        con.execute('PRAGMA optimize')
+                con.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -2,20 +2,67 @@
 Модуль описывает репозиторий, работающий в оперативной памяти
 """
 
+import bisect
 import itertools
 import typing
 
 from bookkeeper.repository import abstract_repository
+from bookkeeper.repository import query
+
+_MISSING = object()
 
 
 class MemoryRepository(abstract_repository.AbstractRepository[abstract_repository.T]):
     """
     Репозиторий, работающий в оперативной памяти. Хранит данные в словаре.
+
+    Для ускорения выборок можно объявить вторичные индексы:
+    index_on - поля с хеш-индексом, фильтр get_all по равенству
+    таким полям выполняется без перебора всех объектов;
+    range_index_on - поля с упорядоченным индексом для выборки
+    диапазона значений методом get_range.
+    Индексы поддерживаются при добавлении, обновлении и удалении объектов.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, index_on: typing.Iterable[str] = (),
+                 range_index_on: typing.Iterable[str] = ()) -> None:
         self._container: dict[int, abstract_repository.T] = {}
         self._counter = itertools.count(1)
+        self._indexes: dict[str, dict[typing.Any, set[int]]] = {
+            attr: {} for attr in index_on}
+        self._range_indexes: dict[str, list[tuple[typing.Any, int]]] = {
+            attr: [] for attr in range_index_on}
+        # значения индексируемых полей на момент индексации,
+        # объект мог быть изменен до вызова update
+        self._indexed: dict[int, dict[str, typing.Any]] = {}
+
+    def _index(self, pk: int, obj: abstract_repository.T) -> None:
+        if not self._indexes and not self._range_indexes:
+            return
+        values = {}
+        for attr, index in self._indexes.items():
+            value = getattr(obj, attr, _MISSING)
+            if value is not _MISSING:
+                index.setdefault(value, set()).add(pk)
+                values[attr] = value
+        for attr, sorted_index in self._range_indexes.items():
+            value = getattr(obj, attr, None)
+            if value is not None:
+                bisect.insort(sorted_index, (value, pk))
+                values[attr] = value
+        self._indexed[pk] = values
+
+    def _unindex(self, pk: int) -> None:
+        values = self._indexed.pop(pk, {})
+        for attr, value in values.items():
+            if attr in self._indexes:
+                pks = self._indexes[attr][value]
+                pks.discard(pk)
+                if not pks:
+                    del self._indexes[attr][value]
+            if attr in self._range_indexes:
+                sorted_index = self._range_indexes[attr]
+                del sorted_index[bisect.bisect_left(sorted_index, (value, pk))]
 
     def add(self, obj: abstract_repository.T) -> int:
         if getattr(obj, 'pk', None) != 0:
@@ -23,21 +70,94 @@ class MemoryRepository(abstract_repository.AbstractRepository[abstract_repositor
         pk = next(self._counter)
         self._container[pk] = obj
         obj.pk = pk
+        self._index(pk, obj)
         return pk
 
+    def add_many(self, objs: typing.Iterable[abstract_repository.T]) -> list[int]:
+        objs = list(objs)
+        for obj in objs:
+            if getattr(obj, 'pk', None) != 0:
+                raise ValueError(f'trying to add object {obj} with filled `pk` attribute')
+        pks = list(itertools.islice(self._counter, len(objs)))
+        for pk, obj in zip(pks, objs):
+            self._container[pk] = obj
+            obj.pk = pk
+            self._index(pk, obj)
+        return pks
+
     def get(self, pk: int) -> abstract_repository.T | None:
         return self._container.get(pk)
 
-    def get_all(self, where: dict[str, typing.Any] | None = None) -> list[abstract_repository.T]:
-        if where is None:
-            return list(self._container.values())
-        return [obj for obj in self._container.values()
-                if all(getattr(obj, attr) == value for attr, value in where.items())]
+    def get_many(self, pks: typing.Iterable[int]) -> dict[int, abstract_repository.T]:
+        return {pk: self._container[pk] for pk in pks if pk in self._container}
+
+    def get_all(self, where: dict[str, typing.Any] | None = None,
+                order_by: typing.Sequence[str] | None = None,
+                limit: int | None = None,
+                offset: int | None = None) -> list[abstract_repository.T]:
+        objs: typing.Iterable[abstract_repository.T] = self._container.values()
+        if where:
+            # условия равенства по индексированным полям сужают перебор
+            indexed = {attr: operand for attr, (op, operand) in
+                       ((attr, query.split(cond)) for attr, cond in where.items())
+                       if attr in self._indexes and op == '=' and operand is not None}
+            if indexed:
+                candidates = [self._indexes[attr].get(value, set())
+                              for attr, value in indexed.items()]
+                pks = set.intersection(*sorted(candidates, key=len))
+                objs = (self._container[pk] for pk in sorted(pks))
+                where = {attr: cond for attr, cond in where.items()
+                         if attr not in indexed}
+        if not where and not order_by and limit is None and offset is None:
+            return list(objs)
+        return query.apply(objs, where, order_by, limit, offset)
+
+    def get_range(self, attr: str, start: typing.Any = None,
+                  end: typing.Any = None) -> list[abstract_repository.T]:
+        """
+        Получить объекты, у которых значение поля attr лежит
+        в полуинтервале [start, end). None означает отсутствие границы.
+        Объекты с пустым значением поля не возвращаются.
+        Без индекса по полю выполняется перебор всех объектов.
+        """
+        if attr not in self._range_indexes:
+            return sorted(
+                (obj for obj in self._container.values()
+                 if getattr(obj, attr) is not None
+                 and (start is None or getattr(obj, attr) >= start)
+                 and (end is None or getattr(obj, attr) < end)),
+                key=lambda obj: getattr(obj, attr))
+        sorted_index = self._range_indexes[attr]
+        lo = 0 if start is None else bisect.bisect_left(sorted_index, (start, ))
+        hi = len(sorted_index) if end is None else \
+            bisect.bisect_left(sorted_index, (end, ))
+        return [self._container[pk] for _, pk in sorted_index[lo:hi]]
 
     def update(self, obj: abstract_repository.T) -> None:
         if obj.pk == 0:
             raise ValueError('attempt to update object with unknown primary key')
+        self._unindex(obj.pk)
         self._container[obj.pk] = obj
+        self._index(obj.pk, obj)
+
+    def update_many(self, objs: typing.Iterable[abstract_repository.T]) -> None:
+        objs = list(objs)
+        if any(obj.pk == 0 for obj in objs):
+            raise ValueError('attempt to update object with unknown primary key')
+        for obj in objs:
+            self._unindex(obj.pk)
+            self._container[obj.pk] = obj
+            self._index(obj.pk, obj)
 
     def delete(self, pk: int) -> None:
         self._container.pop(pk)
+        self._unindex(pk)
+
+    def delete_many(self, pks: typing.Iterable[int]) -> None:
+        pks = list(pks)
+        missing = [pk for pk in pks if pk not in self._container]
+        if missing:
+            raise KeyError(missing[0])
+        for pk in pks:
+            if self._container.pop(pk, None) is not None:
+                self._unindex(pk)
@@ -0,0 +1,183 @@
+"""
+Модуль описывает схему базы данных и её миграции
+
+Версия схемы хранится в PRAGMA user_version. Миграция с номером i
+переводит базу из версии i в версию i + 1, при открытии базы выполняются
+все миграции, которых ещё не было. Каждая миграция выполняется в своей
+транзакции вместе с записью новой версии, поэтому прерванное обновление
+продолжается с той же миграции при следующем открытии.
+
+Создать или обновить базу из командной строки:
+python -m bookkeeper.repository.migrations book.db
+"""
+
+import argparse
+import sqlite3
+import typing
+
+from bookkeeper.repository import codecs
+from bookkeeper.repository import rollup
+
+CATEGORY_TABLE = (
+    "CREATE TABLE {name} (id INTEGER PRIMARY KEY, name TEXT, parent INTEGER)")
+EXPENSE_TABLE = (
+    "CREATE TABLE {name} (id INTEGER PRIMARY KEY, amount INTEGER, "
+    "category INTEGER, expense_date TEXT, date TEXT, comment TEXT, "
+    "FOREIGN KEY (category) REFERENCES category (id) "
+    "ON DELETE CASCADE ON UPDATE CASCADE)")
+
+
+def _table_sql(con: sqlite3.Connection, table: str) -> str | None:
+    row = con.execute("SELECT sql FROM sqlite_master WHERE type = 'table' "
+                      "AND name = ?", (table, )).fetchone()
+    return None if row is None else row[0]
+
+
+def create_tables(con: sqlite3.Connection) -> None:
+    """ Таблицы категорий и расходов, категория по умолчанию """
+    if _table_sql(con, 'category') is None:
+        con.execute(CATEGORY_TABLE.format(name='category'))
+        con.execute("INSERT INTO category (name) VALUES ('Uncategorized')")
+    if _table_sql(con, 'expense') is None:
+        con.execute(EXPENSE_TABLE.format(name='expense'))
+
+
+def fix_column_types(con: sqlite3.Connection) -> None:
+    """
+    Пересоздать таблицы, созданные с опечаткой INTERGER в типе столбцов.
+    Данные и id сохраняются, индексы и триггеры таблиц создаются
+    следующими миграциями.
+    """
+    for table, create in (('category', CATEGORY_TABLE),
+                          ('expense', EXPENSE_TABLE)):
+        sql = _table_sql(con, table)
+        if sql is None or 'INTERGER' not in sql.upper():
+            continue
+        con.execute(create.format(name=f'{table}_new'))
+        con.execute(f'INSERT INTO {table}_new SELECT * FROM {table}')
+        con.execute(f'DROP TABLE {table}')
+        con.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+
+
+def create_indexes(con: sqlite3.Connection) -> None:
+    """
+    Индексы для запросов приложения:
+    расходы по категории (каскадное удаление, суммы по категории),
+    расходы по дате, подкатегории по родителю, категории по названию
+    """
+    con.execute("CREATE INDEX IF NOT EXISTS expense_category_idx "
+                "ON expense (category)")
+    con.execute("CREATE INDEX IF NOT EXISTS expense_date_amount_idx "
+                "ON expense (date, amount)")
+    con.execute("CREATE INDEX IF NOT EXISTS category_parent_idx "
+                "ON category (parent)")
+    con.execute("CREATE INDEX IF NOT EXISTS category_name_idx "
+                "ON category (name)")
+
+
+def create_budget(con: sqlite3.Connection) -> None:
+    """ Таблица бюджетов """
+    con.execute("CREATE TABLE IF NOT EXISTS budget "
+                "(id INTEGER PRIMARY KEY, amount INTEGER, tern TEXT)")
+
+
+def install_rollup(con: sqlite3.Connection) -> None:
+    """ Агрегатная таблица расходов и её триггеры """
+    for statement in rollup.SCHEMA:
+        con.execute(statement)
+    con.execute("DELETE FROM expense_rollup")
+    rollup.fill(con)
+
+
+def store_minor_units(con: sqlite3.Connection) -> None:
+    """
+    Суммы расходов и бюджетов хранятся в копейках (см. модуль codecs),
+    дробные суммы (REAL) округляются до целых копеек. Агрегатная таблица
+    заполняется заново по новым суммам расходов, поэтому её триггер
+    на время пересчета удаляется.
+    Если сумма не число, миграция прерывается с sqlite3.IntegrityError,
+    в сообщении указываются id таких записей.
+    """
+    for table in ('expense', 'budget'):
+        bad = [pk for pk, in con.execute(
+            f"SELECT id FROM {table} "
+            "WHERE typeof(amount) NOT IN ('integer', 'real', 'null')")]
+        if bad:
+            raise sqlite3.IntegrityError(
+                f'non-numeric amount in table {table}, id {bad}')
+    con.execute("DROP TRIGGER IF EXISTS expense_rollup_update")
+    for table in ('expense', 'budget'):
+        con.execute(f"UPDATE {table} SET amount = "
+                    f"CAST(ROUND(amount * {codecs.MINOR_UNITS}) AS INTEGER)")
+    # суммы округленных расходов, а не округленные суммы
+    con.execute("DELETE FROM expense_rollup")
+    rollup.fill(con)
+    for statement in rollup.SCHEMA:
+        con.execute(statement)
+
+
+MIGRATIONS: tuple[typing.Callable[[sqlite3.Connection], None], ...] = (
+    create_tables,
+    fix_column_types,
+    create_indexes,
+    create_budget,
+    install_rollup,
+    store_minor_units,
+)
+
+VERSION = len(MIGRATIONS)
+
+
+def version(con: sqlite3.Connection) -> int:
+    """ Версия схемы базы """
+    return typing.cast(int, con.execute('PRAGMA user_version').fetchone()[0])
+
+
+def migrate(con: sqlite3.Connection) -> int:
+    """
+    Выполнить недостающие миграции, вернуть новую версию схемы.
+    На время миграций проверка внешних ключей отключается, чтобы таблицы
+    можно было пересоздать, после миграций ссылки проверяются.
+    """
+    if version(con) >= VERSION:
+        return version(con)
+    foreign_keys = con.execute('PRAGMA foreign_keys').fetchone()[0]
+    con.execute('PRAGMA foreign_keys = OFF')
+    try:
+        while True:
+            # блокировка записи, другой процесс дождется и увидит новую версию
+            con.execute('BEGIN IMMEDIATE')
+            try:
+                current = version(con)
+                if current >= VERSION:
+                    con.rollback()
+                    break
+                MIGRATIONS[current](con)
+                broken = con.execute('PRAGMA foreign_key_check').fetchone()
+                if broken is not None:
+                    raise sqlite3.IntegrityError(
+                        f'foreign key violation in table {broken[0]}')
+                con.execute(f'PRAGMA user_version = {current + 1}')
+                con.commit()
+            except BaseException:
+                con.rollback()
+                raise
+    finally:
+        con.execute(f'PRAGMA foreign_keys = {foreign_keys}')
+    return version(con)
+
+
+def main() -> None:
+    """ Команда создания и обновления базы """
+    parser = argparse.ArgumentParser(description='Create or upgrade database')
+    parser.add_argument('db_file', help='path to database file')
+    args = parser.parse_args()
+    con = sqlite3.connect(args.db_file)
+    try:
+        print(f'schema version {migrate(con)}')
+    finally:
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Модуль описывает фильтры выборки из репозитория
+
+Условие where задается словарем {'название_поля': условие}, все условия
+объединяются через AND. Условие может быть:
+- значением - проверка на равенство, None означает IS NULL;
+- парой (оператор, операнд), где оператор один из
+  '=', '!=', '<', '<=', '>', '>=', 'IN', 'NOT IN', 'LIKE', 'BETWEEN'.
+  Для 'IN' и 'NOT IN' операнд - последовательность значений (пустой
+  список: IN ложно, NOT IN истинно для всех записей, в том числе с NULL),
+  для 'BETWEEN' - пара (нижняя, верхняя) с включенными границами,
+  для 'LIKE' - шаблон с символами % и _ без учета регистра ASCII.
+
+Порядок задается последовательностью названий полей, префикс '-'
+означает сортировку по убыванию. Пустые значения (NULL) при сортировке
+по возрастанию идут первыми, как в SQLite.
+
+Один и тот же набор правил компилируется в параметризованный SQL-запрос
+(compile_select) и применяется к объектам в памяти (apply), чтобы
+SQLiteRepository и MemoryRepository возвращали одинаковые результаты.
+"""
+
+import functools
+import operator
+import re
+import typing
+
+Where = dict[str, typing.Any]
+
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'IN', 'NOT IN', 'LIKE', 'BETWEEN')
+
+_COMPARISONS: dict[str, typing.Callable[[typing.Any, typing.Any], bool]] = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def split(condition: typing.Any) -> tuple[str, typing.Any]:
+    """ Разобрать условие на оператор и операнд """
+    if isinstance(condition, tuple) and len(condition) == 2 \
+            and isinstance(condition[0], str) and condition[0].upper() in OPERATORS:
+        return condition[0].upper(), condition[1]
+    return '=', condition
+
+
+def _arity(op: str, operand: typing.Any) -> int:
+    if op in ('IN', 'NOT IN'):
+        return len(operand)
+    if op == 'BETWEEN':
+        return 2
+    if op in ('=', '!=') and operand is None:
+        return 0
+    return 1
+
+
+def _params(op: str, operand: typing.Any) -> tuple[typing.Any, ...]:
+    if op in ('IN', 'NOT IN', 'BETWEEN'):
+        return tuple(operand)
+    if op in ('=', '!=') and operand is None:
+        return ()
+    return (operand, )
+
+
+def _clause(column: str, op: str, arity: int) -> str:
+    if op in ('IN', 'NOT IN') and arity == 0:
+        #empty list: nothing is in it, everything (even NULL) is not
+        return '0' if op == 'IN' else '1'
+    if arity == 0:
+        return f'{column} IS {"NOT " if op == "!=" else ""}NULL'
+    if op in ('IN', 'NOT IN'):
+        return f'{column} {op} ({", ".join("?" * arity)})'
+    if op == 'BETWEEN':
+        return f'{column} BETWEEN ? AND ?'
+    return f'{column} {op} ?'
+
+
+@functools.lru_cache(maxsize=256)
+def _select_sql(table: str, columns: tuple[str, ...],
+                conditions: tuple[tuple[str, str, int], ...],
+                order_by: tuple[str, ...], limit: bool, offset: bool) -> str:
+    """ Текст запроса для формы выборки, кешируется """
+    sql = f'SELECT {", ".join(columns)} FROM {table}'
+    clauses = [_clause(column, op, arity) for column, op, arity in conditions]
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    if order_by:
+        sql += ' ORDER BY ' + ', '.join(
+            f'{field[1:]} DESC' if field.startswith('-') else field
+            for field in order_by)
+    if limit:
+        sql += ' LIMIT ?'
+    elif offset:
+        sql += ' LIMIT -1'
+    if offset:
+        sql += ' OFFSET ?'
+    return sql
+
+
+def compile_select(
+    table: str,
+    columns: typing.Sequence[str],
+    where: Where | None = None,
+    order_by: typing.Sequence[str] | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    column_names: typing.Mapping[str, str] | None = None,
+) -> tuple[str, list[typing.Any]]:
+    """
+    Скомпилировать выборку в параметризованный SQL-запрос.
+
+    Parameters
+    ----------
+    table - таблица
+    columns - названия полей для выборки
+    where - условие выборки
+    order_by - порядок
+    limit, offset - ограничение количества строк и сдвиг
+    column_names - переименование полей в столбцы таблицы, например {'pk': 'id'}
+
+    Returns
+    -------
+    Текст запроса и список параметров
+    """
+    names = column_names or {}
+    conditions = []
+    params: list[typing.Any] = []
+    for field, condition in (where or {}).items():
+        op, operand = split(condition)
+        conditions.append((names.get(field, field), op, _arity(op, operand)))
+        params.extend(_params(op, operand))
+    order = tuple(
+        ('-' if field.startswith('-') else '') + names.get(field.lstrip('-'),
+                                                           field.lstrip('-'))
+        for field in order_by or ())
+    sql = _select_sql(table, tuple(names.get(c, c) for c in columns),
+                      tuple(conditions), order, limit is not None,
+                      offset is not None)
+    if limit is not None:
+        params.append(limit)
+    if offset is not None:
+        params.append(offset)
+    return sql, params
+
+
+def fields(where: Where | None, order_by: typing.Sequence[str] | None = None
+           ) -> set[str]:
+    """ Названия полей, которые используются в условии и порядке """
+    return set(where or ()) | {field.lstrip('-') for field in order_by or ()}
+
+
+@functools.lru_cache(maxsize=256)
+def _like_regex(pattern: str) -> re.Pattern[str]:
+    regex = ''.join('.*' if ch == '%' else '.' if ch == '_' else re.escape(ch)
+                    for ch in pattern)
+    return re.compile(regex, re.IGNORECASE | re.ASCII | re.DOTALL)
+
+
+def _check(value: typing.Any, op: str, operand: typing.Any) -> bool:
+    if op in ('=', '!=') and operand is None:
+        return (value is None) == (op == '=')
+    if op in ('IN', 'NOT IN') and not operand:
+        return op == 'NOT IN'
+    if value is None:
+        return False
+    if op == 'IN':
+        return value in operand
+    if op == 'NOT IN':
+        return value not in operand
+    if op == 'BETWEEN':
+        return bool(operand[0] <= value <= operand[1])
+    if op == 'LIKE':
+        return _like_regex(operand).fullmatch(str(value)) is not None
+    return bool(_COMPARISONS[op](value, operand))
+
+
+def matches(obj: typing.Any, where: Where | None) -> bool:
+    """ Удовлетворяет ли объект условию where """
+    for field, condition in (where or {}).items():
+        op, operand = split(condition)
+        if not _check(getattr(obj, field), op, operand):
+            return False
+    return True
+
+
+def _sort_key(value: typing.Any) -> tuple[bool, typing.Any]:
+    return (False, 0) if value is None else (True, value)
+
+
+def _field_sort_key(
+        name: str) -> typing.Callable[[typing.Any], tuple[bool, typing.Any]]:
+    getter = operator.attrgetter(name)
+
+    def key(obj: typing.Any) -> tuple[bool, typing.Any]:
+        return _sort_key(getter(obj))
+    return key
+
+
+def apply(
+    objs: typing.Iterable[typing.Any],
+    where: Where | None = None,
+    order_by: typing.Sequence[str] | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+) -> list[typing.Any]:
+    """ Применить условие, порядок и ограничения к объектам в памяти """
+    result = [obj for obj in objs if matches(obj, where)]
+    for field in reversed(order_by or ()):
+        result.sort(key=_field_sort_key(field.lstrip('-')),
+                    reverse=field.startswith('-'))
+    start = offset or 0
+    end = None if limit is None or limit < 0 else start + limit
+    return result[start:end]
@@ -0,0 +1,89 @@
+"""
+Модуль описывает агрегатную таблицу расходов expense_rollup
+
+Таблица хранит сумму и количество расходов для каждой пары
+(категория, день) и поддерживается триггерами на таблице expense,
+поэтому обновляется в той же транзакции, что и сами расходы.
+Расходы без категории или даты учитываются с категорией 0 и пустой датой.
+
+Перестроить таблицу из сырых расходов:
+python -m bookkeeper.repository.rollup book.db
+"""
+
+import argparse
+import sqlite3
+
+_OLD_KEY = "category = COALESCE(OLD.category, 0) AND date = COALESCE(OLD.date, '')"
+
+_ADD_NEW = (
+    "INSERT INTO expense_rollup (category, date, amount, count) "
+    "VALUES (COALESCE(NEW.category, 0), COALESCE(NEW.date, ''), "
+    "COALESCE(NEW.amount, 0), 1) "
+    "ON CONFLICT (category, date) DO UPDATE SET "
+    "amount = amount + excluded.amount, count = count + 1;")
+
+_REMOVE_OLD = (
+    "UPDATE expense_rollup SET amount = amount - COALESCE(OLD.amount, 0), "
+    f"count = count - 1 WHERE {_OLD_KEY}; "
+    f"DELETE FROM expense_rollup WHERE {_OLD_KEY} AND count = 0;")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS expense_rollup ("
+    "category INTEGER NOT NULL, date TEXT NOT NULL, "
+    "amount INTEGER NOT NULL, count INTEGER NOT NULL, "
+    "PRIMARY KEY (category, date)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS expense_rollup_date_idx "
+    "ON expense_rollup (date, amount)",
+    "CREATE TRIGGER IF NOT EXISTS expense_rollup_insert AFTER INSERT ON expense "
+    f"BEGIN {_ADD_NEW} END",
+    "CREATE TRIGGER IF NOT EXISTS expense_rollup_delete AFTER DELETE ON expense "
+    f"BEGIN {_REMOVE_OLD} END",
+    "CREATE TRIGGER IF NOT EXISTS expense_rollup_update "
+    "AFTER UPDATE OF amount, category, date ON expense "
+    f"BEGIN {_REMOVE_OLD} {_ADD_NEW} END",
+)
+
+
+def install(con: sqlite3.Connection) -> None:
+    """
+    Создать агрегатную таблицу и триггеры, если их нет.
+    Новая таблица сразу заполняется по существующим расходам.
+    """
+    exists = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+        "AND name = 'expense_rollup'").fetchone()
+    with con:
+        for statement in SCHEMA:
+            con.execute(statement)
+        if exists is None:
+            fill(con)
+
+
+def rebuild(con: sqlite3.Connection) -> None:
+    """ Пересчитать агрегатную таблицу по сырым расходам """
+    with con:
+        con.execute("DELETE FROM expense_rollup")
+        fill(con)
+
+
+def fill(con: sqlite3.Connection) -> None:
+    """ Заполнить пустую агрегатную таблицу по сырым расходам """
+    con.execute(
+        "INSERT INTO expense_rollup (category, date, amount, count) "
+        "SELECT COALESCE(category, 0), COALESCE(date, ''), "
+        "COALESCE(SUM(amount), 0), COUNT(*) FROM expense GROUP BY 1, 2")
+
+
+def main() -> None:
+    """ Команда перестроения агрегатной таблицы """
+    parser = argparse.ArgumentParser(description='Rebuild expense_rollup table')
+    parser.add_argument('db_file', help='path to database file')
+    args = parser.parse_args()
+    con = sqlite3.connect(args.db_file)
+    install(con)
+    rebuild(con)
+    con.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,157 +1,357 @@
+import collections
+import contextlib
+import dataclasses
+import functools
 import inspect
+import itertools
+import operator
 import sqlite3
 import typing
 from bookkeeper.repository import abstract_repository
+from bookkeeper.repository import codecs
+from bookkeeper.repository import connection
+from bookkeeper.repository import query
 from bookkeeper.models import category
 from bookkeeper.models import expense
 
+#stay below SQLITE_MAX_VARIABLE_NUMBER of old sqlite builds
+MAX_VARIABLES = 500
+
+
+@dataclasses.dataclass(frozen=True)
+class Mapper:
+    """
+    SQL text and row conversion of one model, compiled once.
+    Columns are selected in the order of model annotations with id in place
+    of pk, so a row is unpacked straight into the model constructor.
+    Fields with codecs (dates, money) are encoded on write and decoded
+    column by column for all objects of a batch on read.
+    """
+    data_type: type
+    table_name: str
+    fields: tuple[str, ...]
+    #model attributes in annotation order, including pk
+    attributes: tuple[str, ...]
+    insert_sql: str
+    update_sql: str
+    select_sql: str
+    get_sql: str
+    values: typing.Callable[[typing.Any], tuple[typing.Any, ...]]
+    field_codecs: dict[str, codecs.Codec]
+    #row positions and names of fields with codecs, their column decoders
+    decoders: tuple[tuple[int, str, typing.Callable[
+        [typing.Sequence[typing.Any]], typing.Iterable[typing.Any]]], ...]
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def for_model(cls, data_type: type) -> 'Mapper':
+        table_name = data_type.__name__.lower()
+        annotations = inspect.get_annotations(data_type, eval_str=True)
+        attributes = tuple(annotations)
+        fields = tuple(name for name in attributes if name != 'pk')
+        field_codecs = {name: codec for name in fields
+                        if (codec := codecs.for_type(annotations[name]))}
+        columns = ', '.join('id' if name == 'pk' else name
+                            for name in attributes)
+        select_sql = f'SELECT {columns} FROM {table_name}'
+        getter = operator.attrgetter(*fields)
+        #attrgetter of one field returns value, not tuple
+        values = getter if len(fields) > 1 else lambda obj: (getter(obj), )
+        if field_codecs:
+            values = cls._encoding(values, tuple(
+                field_codecs[name].encode if name in field_codecs else None
+                for name in fields))
+        return cls(
+            data_type=data_type,
+            table_name=table_name,
+            fields=fields,
+            attributes=attributes,
+            insert_sql=f'INSERT INTO {table_name} ({", ".join(fields)}) '
+                       f'VALUES ({", ".join("?" * len(fields))})',
+            update_sql=f'UPDATE {table_name} SET '
+                       f'{", ".join(f"{name} = ?" for name in fields)} '
+                       f'WHERE id = ?',
+            select_sql=select_sql,
+            get_sql=f'{select_sql} WHERE id = ?',
+            values=values,
+            field_codecs=field_codecs,
+            decoders=tuple((attributes.index(name), name, codec.decode_column)
+                           for name, codec in field_codecs.items()))
+
+    @staticmethod
+    def _encoding(
+        values: typing.Callable[[typing.Any], tuple[typing.Any, ...]],
+        encoders: tuple[typing.Callable[[typing.Any], typing.Any] | None, ...]
+    ) -> typing.Callable[[typing.Any], tuple[typing.Any, ...]]:
+        def encoded(obj: typing.Any) -> tuple[typing.Any, ...]:
+            return tuple(value if encode is None else encode(value)
+                         for encode, value in zip(encoders, values(obj)))
+        return encoded
+
+    def encode(self, field: str, value: typing.Any) -> typing.Any:
+        """
+        Value of field as stored in table
+        """
+        codec = self.field_codecs.get(field)
+        return value if codec is None else codec.encode(value)
+
+    def encode_where(self, where: query.Where | None) -> query.Where | None:
+        """
+        Condition with operands of coded fields encoded as stored in table
+        """
+        if not where or not self.field_codecs.keys() & where.keys():
+            return where
+        encoded = {}
+        for field, condition in where.items():
+            codec = self.field_codecs.get(field)
+            op, operand = query.split(condition)
+            if codec is None or op == 'LIKE':
+                encoded[field] = condition
+            elif op in ('IN', 'NOT IN', 'BETWEEN'):
+                encoded[field] = (op, tuple(map(codec.encode, operand)))
+            else:
+                encoded[field] = (op, codec.encode(operand))
+        return encoded
+
+    def decode(self, columns: typing.Sequence[str],
+               rows: list[tuple[typing.Any, ...]]) -> list[tuple[typing.Any, ...]]:
+        """
+        Decode selected columns of rows, column by column
+        """
+        decoders = [(i, self.field_codecs[name].decode_column)
+                    for i, name in enumerate(columns) if name in self.field_codecs]
+        if not decoders or not rows:
+            return rows
+        values: list[typing.Any] = list(zip(*rows))
+        for i, decode_column in decoders:
+            values[i] = decode_column(values[i])
+        return list(zip(*values))
+
+    def hydrate(
+            self, rows: list[tuple[typing.Any, ...]]) -> list[typing.Any]:
+        objs = list(itertools.starmap(self.data_type, rows))
+        #objects are built from raw rows, coded fields are replaced
+        #column by column, columns of NULL are kept as they are
+        for i, name, decode_column in self.decoders:
+            values = list(map(operator.itemgetter(i), rows))
+            if values.count(None) == len(values):
+                continue
+            collections.deque(map(setattr, objs, itertools.repeat(name),
+                                  decode_column(values)), maxlen=0)
+        return objs
+
 
 class SQLiteRepository(
         abstract_repository.AbstractRepository[abstract_repository.T]):
 
-    def __init__(self, db_file: str, cls: type) -> None:
+    def __init__(
+        self,
+        db_file: str,
+        cls: type,
+        connection_manager: connection.ConnectionManager | None = None
+    ) -> None:
         self.db_file = db_file
         self.data_type = cls
-        self.table_name = self.data_type.__name__.lower()
+        self.mapper = Mapper.for_model(cls)
+        self.table_name = self.mapper.table_name
         self.fields = inspect.get_annotations(self.data_type, eval_str=True)
         self.fields.pop('pk')
+        #repositories on the same database should share one manager
+        if connection_manager is None:
+            connection_manager = connection.ConnectionManager(db_file)
+        self.connection_manager = connection_manager
+
+    def create_index(self, *columns: str) -> None:
+        """
+        Create index on columns of repository table if it does not exist,
+        raise ValueError if a column is not a field of the model
+        """
+        #only model fields may reach SQL text
+        if not columns:
+            raise ValueError('index needs at least one column')
+        unknown = set(columns) - set(self.fields)
+        if unknown:
+            raise ValueError(f'unknown fields {sorted(unknown)} '
+                             f'for {self.data_type.__name__}')
+        name = '_'.join((self.table_name, ) + columns + ('idx', ))
+        self._connection().execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON {self.table_name} ({", ".join(columns)})')
+        self.connection_manager.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        return self.connection_manager.connection()
+
+    def session(self) -> contextlib.AbstractContextManager[sqlite3.Connection]:
+        """
+        Unit of work: operations inside the block share one transaction
+        """
+        return self.connection_manager.session()
 
     def add(self, obj: abstract_repository.T) -> int:
-        names = ', '.join(self.fields.keys())
-        p = ', '.join("?" * len(self.fields))
-        values = [getattr(obj, x) for x in self.fields]
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            cursor.execute(
-                f'INSERT INTO {self.table_name} ({names}) VALUES({p})', values)
-            con.commit()
-            obj.pk = cursor.lastrowid
-            cursor.close()
+        cursor = self._connection().execute(self.mapper.insert_sql,
+                                            self.mapper.values(obj))
+        self.connection_manager.commit()
+        obj.pk = cursor.lastrowid
+        cursor.close()
         return obj.pk
 
+    def add_many(self, objs: typing.Iterable[abstract_repository.T]) -> list[int]:
+        objs = list(objs)
+        if not objs:
+            return []
+        with self.session() as con:
+            con.executemany(self.mapper.insert_sql,
+                            map(self.mapper.values, objs))
+            #the write lock is held, so rowids of the batch are consecutive
+            last = con.execute('SELECT last_insert_rowid()').fetchone()[0]
+        pks = list(range(last - len(objs) + 1, last + 1))
+        for pk, obj in zip(pks, objs):
+            obj.pk = pk
+        return pks
+
     def add_empty(self) -> int:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            if self.data_type == expense.Expense:
-                cursor.execute(f"INSERT INTO {self.table_name} (category) VALUES (1)")
-            else:
-                cursor.execute(f"INSERT INTO {self.table_name} DEFAULT VALUES")
-            con.commit()
-            cursor.close()
+        if self.data_type == expense.Expense:
+            cursor = self._connection().execute(
+                f"INSERT INTO {self.table_name} (category) VALUES (1)")
+        else:
+            cursor = self._connection().execute(
+                f"INSERT INTO {self.table_name} DEFAULT VALUES")
+        self.connection_manager.commit()
+        cursor.close()
         return cursor.lastrowid
 
     def update(self, obj: abstract_repository.T) -> None:
-        names = ' = ?, '.join(self.fields.keys()) + ' = ?'
-        values = [getattr(obj, x) for x in self.fields]
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            cursor.execute(
-                f'UPDATE {self.table_name} SET {names} WHERE id = {obj.pk}',
-                values)
-            con.commit()
-            cursor.close()
+        self._connection().execute(self.mapper.update_sql,
+                                   self.mapper.values(obj) + (obj.pk, ))
+        self.connection_manager.commit()
+
+    def update_many(self, objs: typing.Iterable[abstract_repository.T]) -> None:
+        values = self.mapper.values
+        with self.session() as con:
+            con.executemany(self.mapper.update_sql,
+                            (values(obj) + (obj.pk, ) for obj in objs))
 
     def update_item(self, row: int, col: str, value: typing.Any) -> None:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            cursor.execute(
+        self._connection().execute(
+            f'UPDATE {self.table_name} SET {col} = ? WHERE id = ?',
+            (self.mapper.encode(col, value), row))
+        self.connection_manager.commit()
+
+    def update_items(self, col: str,
+                     pairs: typing.Iterable[tuple[int, typing.Any]]) -> None:
+        """
+        Set column to value for every (pk, value) pair with one statement
+        """
+        if col not in self.fields:
+            raise ValueError(f'unknown field {col!r}')
+        encode = self.mapper.encode
+        with self.session() as con:
+            con.executemany(
                 f'UPDATE {self.table_name} SET {col} = ? WHERE id = ?',
-                (value, row))
-            con.commit()
-            cursor.close()
+                ((encode(col, value), pk) for pk, value in pairs))
 
     def get(self, pk: int) -> abstract_repository.T | None:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            cursor.execute(f'SELECT * FROM {self.table_name} LIMIT 1 OFFSET ?',
-                           (pk - 1, ))
-            res = self.data_type(*cursor.fetchone()[1:])
-            res.pk = pk
-            cursor.close()
+        cursor = self._connection().execute(self.mapper.get_sql, (pk, ))
+        row = cursor.fetchone()
+        cursor.close()
+        if row is None:
+            return None
+        return typing.cast(abstract_repository.T, self.mapper.hydrate([row])[0])
+
+    def get_many(
+            self,
+            pks: typing.Iterable[int]) -> dict[int, abstract_repository.T]:
+        pks = list(set(pks))
+        res = {}
+        cursor = self._connection().cursor()
+        for start in range(0, len(pks), MAX_VARIABLES):
+            chunk = pks[start:start + MAX_VARIABLES]
+            p = ', '.join("?" * len(chunk))
+            cursor.execute(f'{self.mapper.select_sql} WHERE id IN ({p})',
+                           chunk)
+            for obj in self.mapper.hydrate(cursor.fetchall()):
+                res[obj.pk] = obj
+        cursor.close()
         return res
 
+    def _compile(
+        self,
+        columns: typing.Sequence[str],
+        where: dict[str, typing.Any] | None,
+        order_by: typing.Sequence[str] | None,
+        limit: int | None,
+        offset: int | None
+    ) -> tuple[str, list[typing.Any]]:
+        #only model fields may reach SQL text
+        unknown = (query.fields(where, order_by) | set(columns)) \
+            - set(self.fields) - {'pk', '*'}
+        if unknown:
+            raise ValueError(f'unknown fields {sorted(unknown)} '
+                             f'for {self.data_type.__name__}')
+        return query.compile_select(self.table_name, columns,
+                                    self.mapper.encode_where(where), order_by,
+                                    limit, offset, {'pk': 'id'})
+
     def get_all(
         self,
-        where: dict[str, typing.Any] | None = None
+        where: dict[str, typing.Any] | None = None,
+        order_by: typing.Sequence[str] | None = None,
+        limit: int | None = None,
+        offset: int | None = None
     ) -> list[abstract_repository.T]:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            if where is None:
-                cursor.execute(f'SELECT * FROM {self.table_name}')
-                res = [
-                    self.data_type(*(list(data[1:]) + [data[0]]))
-                    for data in cursor.fetchall()
-                ]
-            elif next(iter(where.values())) is None:
-                cursor.execute(
-                    f'SELECT * FROM {self.table_name} WHERE {next(iter(where.keys()))} IS NULL'
-                )
-                res = [
-                    self.data_type(*(list(data[1:]) + [data[0]]))
-                    for data in cursor.fetchall()
-                ]
-            else:
-                cursor.execute(
-                    f'SELECT * FROM {self.table_name} WHERE {next(iter(where.keys()))} = ?',
-                    (next(iter(where.values())), ))
-                res = [
-                    self.data_type(*(list(data[1:]) + [data[0]]))
-                    for data in cursor.fetchall()
-                ]
+        sql, params = self._compile(self.mapper.attributes, where, order_by,
+                                    limit, offset)
+        cursor = self._connection().execute(sql, params)
+        res = self.mapper.hydrate(cursor.fetchall())
+        cursor.close()
+        return res
+
+    def iter_all(
+        self,
+        where: dict[str, typing.Any] | None = None,
+        batch_size: int = 1000
+    ) -> typing.Iterator[abstract_repository.T]:
+        sql, params = self._compile(self.mapper.attributes, where, None, None,
+                                    None)
+        cursor = self._connection().execute(sql, params)
+        try:
+            while rows := cursor.fetchmany(batch_size):
+                yield from self.mapper.hydrate(rows)
+        finally:
             cursor.close()
+
+    def select(
+        self,
+        columns: typing.Sequence[str],
+        where: dict[str, typing.Any] | None = None,
+        order_by: typing.Sequence[str] | None = None,
+        limit: int | None = None,
+        offset: int | None = None
+    ) -> list[tuple[typing.Any, ...]]:
+        sql, params = self._compile(columns, where, order_by, limit, offset)
+        cursor = self._connection().execute(sql, params)
+        res = self.mapper.decode(columns, cursor.fetchall())
+        cursor.close()
         return res
 
     def delete(self, pk: int) -> None:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
+        self.delete_many([pk])
+
+    def delete_many(self, pks: typing.Iterable[int]) -> None:
+        #primary keys are stable, rows are removed without renumbering
+        if self.data_type == category.Category:
             #deleting category we need delete all subcatogories
-            if self.data_type == category.Category:
-                values = tuple([pk] + [
-                    cate.pk for cate in category.Category(
-                        'name', pk=pk).get_subcategories(self)
-                ])
-                condition = 'id IN (' + ', '.join("?" * len(values)) + ')'
-                cursor.execute(
-                    f"DELETE FROM {self.table_name} WHERE {condition}", values)
-                con.commit()
-                #update rowid
-                counts = {}
-                cursor.execute(f"SELECT id FROM {self.table_name}")
-                rowids = cursor.fetchall()
-                for row in rowids:
-                    count = sum(1 for value in values if value < row[0])
-                    counts[row[0]] = count
-                for rowid in counts.keys():
-                    cursor.execute(
-                        f'UPDATE {self.table_name} set id = id - ? WHERE id = ?',
-                        (counts[rowid], rowid))
-                    con.commit()
-                    cursor.execute(
-                        f'UPDATE {self.table_name} set parent = parent - ? WHERE parent = ?',
-                        (counts[rowid], rowid))
-                    con.commit()
-            else:
-                cursor.execute(
-                    f'DELETE FROM {self.table_name} WHERE id = ?', (pk, ))
-                con.commit()
-                #update rowid
-                cursor.execute(
-                    f'UPDATE {self.table_name} set id = id - 1 WHERE id > ?',
-                    (pk, ))
-                con.commit()
-            cursor.close()
+            query = (f'DELETE FROM {self.table_name} WHERE id IN ('
+                     f'WITH RECURSIVE subtree(id) AS (VALUES(?) UNION ALL '
+                     f'SELECT {self.table_name}.id FROM {self.table_name} '
+                     f'JOIN subtree ON {self.table_name}.parent = subtree.id) '
+                     f'SELECT id FROM subtree)')
+        else:
+            query = f'DELETE FROM {self.table_name} WHERE id = ?'
+        with self.session() as con:
+            con.executemany(query, ((pk, ) for pk in pks))
 
     def del_all(self) -> None:
-        with sqlite3.connect(self.db_file) as con:
-            con.execute("PRAGMA foreign_keys = ON")
-            cursor = con.cursor()
-            cursor.execute(f"DELETE FROM {self.table_name}")
-            con.commit()
-            cursor.close()
+        self._connection().execute(f"DELETE FROM {self.table_name}")
+        self.connection_manager.commit()
@@ -0,0 +1,144 @@
+"""
+Модуль описывает запросы сумм расходов за период и по категориям
+
+Суммы читаются из агрегатной таблицы expense_rollup (см. модуль rollup),
+а не из сырых расходов. Суммы по поддеревьям категорий считаются
+рекурсивным запросом по category(parent), поэтому не требуют загрузки
+дерева категорий в память. Даты хранятся строками вида YYYY-MM-DD, поэтому их
+можно сравнивать как строки, а периоды задаются полуинтервалами
+[начало, конец), которые используют индекс по expense_rollup(date).
+Суммы возвращаются в копейках, как хранятся в базе (см. модуль codecs).
+"""
+
+import datetime
+import sqlite3
+
+
+def period_bounds(day: datetime.date) -> dict[str, tuple[str, str]]:
+    """
+    Границы дня, недели, месяца и года, в которые попадает day.
+    Неделя начинается с понедельника.
+
+    Parameters
+    ----------
+    day - дата внутри периодов
+
+    Returns
+    -------
+    Словарь {'day' | 'week' | 'month' | 'year': (начало, конец)},
+    конец не включается
+    """
+    month_start = day.replace(day=1)
+    if day.month == 12:
+        month_end = datetime.date(day.year + 1, 1, 1)
+    else:
+        month_end = datetime.date(day.year, day.month + 1, 1)
+    week_start = day - datetime.timedelta(days=day.weekday())
+    bounds = {
+        'day': (day, day + datetime.timedelta(days=1)),
+        'week': (week_start, week_start + datetime.timedelta(days=7)),
+        'month': (month_start, month_end),
+        'year': (datetime.date(day.year, 1, 1), datetime.date(day.year + 1, 1, 1)),
+    }
+    return {name: (start.isoformat(), end.isoformat())
+            for name, (start, end) in bounds.items()}
+
+
+def sum_by_periods(con: sqlite3.Connection,
+                   day: datetime.date) -> dict[str, int]:
+    """
+    Суммы расходов за день, неделю, месяц и год одним запросом.
+
+    Parameters
+    ----------
+    con - соединение с базой данных
+    day - дата, для которой считаются суммы
+
+    Returns
+    -------
+    Словарь {'day' | 'week' | 'month' | 'year': сумма}
+    """
+    bounds = period_bounds(day)
+    periods = ('day', 'week', 'month')
+    columns = ', '.join(
+        'COALESCE(SUM(CASE WHEN date >= ? AND date < ? THEN amount END), 0)'
+        for _ in periods)
+    row = con.execute(
+        f'SELECT {columns}, COALESCE(SUM(amount), 0) '
+        'FROM expense_rollup WHERE date >= ? AND date < ?',
+        sum((bounds[period] for period in periods + ('year', )), ())).fetchone()
+    return dict(zip(periods + ('year', ), row))
+
+
+def sum_by_category(con: sqlite3.Connection,
+                    category: int | None = None) -> int:
+    """
+    Сумма расходов по категории или по всем категориям.
+
+    Parameters
+    ----------
+    con - соединение с базой данных
+    category - id категории, None - все расходы
+
+    Returns
+    -------
+    Сумма расходов
+    """
+    if category is None:
+        row = con.execute(
+            'SELECT COALESCE(SUM(amount), 0) FROM expense_rollup').fetchone()
+    else:
+        row = con.execute(
+            'SELECT COALESCE(SUM(amount), 0) FROM expense_rollup '
+            'WHERE category = ?', (category, )).fetchone()
+    return row[0]
+
+
+def sums_by_category(con: sqlite3.Connection) -> dict[int, int]:
+    """ Суммы расходов всех категорий в виде словаря {id: сумма} """
+    return dict(con.execute(
+        'SELECT category, SUM(amount) FROM expense_rollup GROUP BY category'))
+
+
+_SUBTREE = (
+    'WITH RECURSIVE subtree(id) AS (VALUES(?) UNION ALL '
+    'SELECT category.id FROM category '
+    'JOIN subtree ON category.parent = subtree.id) ')
+
+
+def subtree_sum(con: sqlite3.Connection, category: int) -> int:
+    """
+    Сумма расходов категории вместе со всеми её подкатегориями.
+
+    Parameters
+    ----------
+    con - соединение с базой данных
+    category - id категории
+
+    Returns
+    -------
+    Сумма расходов
+    """
+    row = con.execute(
+        _SUBTREE + 'SELECT COALESCE(SUM(amount), 0) FROM expense_rollup '
+        'WHERE category IN subtree', (category, )).fetchone()
+    return row[0]
+
+
+def subtree_sums(con: sqlite3.Connection) -> dict[int, int]:
+    """
+    Суммы расходов по поддеревьям всех категорий одним запросом.
+
+    Returns
+    -------
+    Словарь {id категории: сумма расходов категории и её подкатегорий}
+    """
+    return dict(con.execute(
+        'WITH RECURSIVE '
+        'sums(category, amount) AS (SELECT category, SUM(amount) '
+        'FROM expense_rollup GROUP BY category), '
+        'tree(ancestor, id) AS (SELECT id, id FROM category UNION ALL '
+        'SELECT tree.ancestor, category.id FROM category '
+        'JOIN tree ON category.parent = tree.id) '
+        'SELECT tree.ancestor, COALESCE(SUM(sums.amount), 0) FROM tree '
+        'LEFT JOIN sums ON sums.category = tree.id GROUP BY tree.ancestor'))
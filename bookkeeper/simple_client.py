@@ -4,10 +4,11 @@
 
 from bookkeeper.models.category import Category
 from bookkeeper.models.expense import Expense
+from bookkeeper.repository import codecs
 from bookkeeper.repository.memory_repository import MemoryRepository
 from bookkeeper.utils import read_tree
 
-cat_repo = MemoryRepository[Category]()
+cat_repo = MemoryRepository[Category](index_on=('name', 'parent'))
 exp_repo = MemoryRepository[Expense]()
 
 cats = '''
@@ -36,10 +37,10 @@ while True:
     elif cmd[0].isdecimal():
         amount, name = cmd.split(maxsplit=1)
         try:
-            cat = cat_repo.get_all({'name': name})[0]
-        except IndexError:
-            print(f'категория {name} не найдена')
+            exp = Expense(codecs.parse_money(amount),
+                          cat_repo.get_all({'name': name})[0].pk)
+        except (IndexError, ValueError):
+            print(f'неверная сумма {amount} или категория {name} не найдена')
             continue
-        exp = Expense(int(amount), cat.pk)
         exp_repo.add(exp)
         print(exp)
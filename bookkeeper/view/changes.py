@@ -0,0 +1,96 @@
+import dataclasses
+import typing
+
+
+@dataclasses.dataclass(slots=True)
+class Change:
+    """
+    Object to save change in table
+    """
+    operator: str
+    row: int | None = None
+    col: str | None = None
+    new_value: str | None = None
+    old_value: str | None = None
+    change_on_item: typing.Any = None
+
+
+class ChangeJournal:
+    """
+    Pending changes of table or tree which are not saved yet.
+    Changes are recorded for target (primary key of row or tree item) and
+    coalesced in O(1): repeated updates of one cell keep only newest value,
+    deleting target drops its pending updates, deleting target added in
+    this journal drops all its changes.
+    """
+
+    def __init__(self) -> None:
+        #changes in order of recording, keyed by operator, target and column
+        self._changes: dict[tuple[typing.Any, ...], Change] = {}
+        #keys of changes for every target
+        self._targets: dict[typing.Hashable, list[tuple[typing.Any, ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def __iter__(self) -> typing.Iterator[Change]:
+        return iter(self._changes.values())
+
+    def _record(self, key: tuple[typing.Any, ...], target: typing.Hashable,
+                change: Change) -> None:
+        self._changes[key] = change
+        self._targets.setdefault(target, []).append(key)
+
+    def add(self, target: typing.Hashable, change: Change) -> None:
+        """
+        Record adding of new target
+        """
+        self._record(('add', target), target, change)
+
+    def update(self, target: typing.Hashable, change: Change) -> None:
+        """
+        Record update of target column, newest value replaces pending one
+        """
+        key = ('update', target, change.col)
+        pending = self._changes.get(key)
+        if pending is not None:
+            pending.new_value = change.new_value
+            return
+        self._record(key, target, change)
+
+    def delete(self, target: typing.Hashable, change: Change) -> None:
+        """
+        Record deleting of target. Pending changes of target are dropped,
+        target added in this journal is forgotten at all.
+        """
+        added = ('add', target) in self._changes
+        for key in self._targets.pop(target, ()):
+            pending = self._changes.pop(key)
+            #delete must find target by value saved in storage
+            if pending.operator == 'update' and pending.old_value is not None:
+                change.old_value = pending.old_value
+        if not added:
+            self._record(('delete', target), target, change)
+
+    def discard(self, target: typing.Hashable) -> None:
+        """
+        Forget all pending changes of target
+        """
+        for key in self._targets.pop(target, ()):
+            del self._changes[key]
+
+    def is_added(self, target: typing.Hashable) -> bool:
+        """
+        Whether target was added in this journal
+        """
+        return ('add', target) in self._changes
+
+    def batch(self) -> list[Change]:
+        """
+        Compacted changes in order to apply
+        """
+        return list(self._changes.values())
+
+    def clear(self) -> None:
+        self._changes.clear()
+        self._targets.clear()
@@ -0,0 +1,257 @@
+import bisect
+import collections
+import typing
+
+from PySide6 import QtCore
+
+from bookkeeper.models import expense
+from bookkeeper.repository import abstract_repository
+
+
+class ExpenseTableModel(QtCore.QAbstractTableModel):
+    """
+    Lazy table model of expenses.
+    Rows are fetched from repository by pages of primary keys when view
+    scrolls (canFetchMore/fetchMore). Only primary keys of fetched rows are
+    kept for all rows, expense objects are kept for recently viewed pages
+    and evicted in LRU order. Unsaved rows have negative keys and are shown
+    after all fetched rows.
+    """
+    COLUMNS = ('date', 'amount', 'category', 'comment')
+    HEADERS = ('Date', 'Amount', 'Category', 'Comment')
+
+    #key of row, column name and new text of edited cell
+    cell_edited = QtCore.Signal(object, str, str)
+
+    def __init__(self,
+                 repo: abstract_repository.AbstractRepository[expense.Expense],
+                 category_name: typing.Callable[[int], str],
+                 page_size: int = 200,
+                 cached_pages: int = 20,
+                 parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.repo = repo
+        self.category_name = category_name
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        #primary keys of fetched rows in table order
+        self._keys: list[int] = []
+        #keys of unsaved rows
+        self._new_keys: list[int] = []
+        #first primary key of every fetched page, ascending
+        self._page_starts: list[int] = []
+        self._pages: collections.OrderedDict[int, dict[int, expense.Expense]] = \
+            collections.OrderedDict()
+        #saved new rows with primary keys after fetched pages
+        self._tail: dict[int, expense.Expense | None] = {}
+        self._last_pk = 0
+        self._exhausted = False
+        #text of edited but not saved cells
+        self._edits: dict[tuple[int, str], str] = {}
+        #primary keys of loaded expenses by category
+        self._category_rows: dict[int, set[int]] = {}
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._keys) + len(self._new_keys)
+
+    def columnCount(self,
+                    parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation,
+                   role: int = QtCore.Qt.DisplayRole) -> typing.Any:
+        if role == QtCore.Qt.DisplayRole \
+                and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        return super().flags(index) | QtCore.Qt.ItemIsEditable
+
+    def canFetchMore(
+            self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self,
+                  parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+        page = self.repo.page(self._last_pk, self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+        self._page_starts.append(page[0].pk)
+        self._store_page(len(self._page_starts) - 1,
+                         {exp.pk: exp for exp in page})
+        self._last_pk = page[-1].pk
+        #rows saved in this session are already shown at the end
+        saved = set(self._new_keys)
+        pks = [exp.pk for exp in page if exp.pk not in saved]
+        if not pks:
+            return
+        first = len(self._keys)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(pks) - 1)
+        self._keys.extend(pks)
+        self.endInsertRows()
+
+    def _store_page(self, number: int, page: dict[int, expense.Expense]) -> None:
+        self._pages[number] = page
+        self._pages.move_to_end(number)
+        for exp in page.values():
+            self._category_rows.setdefault(exp.category, set()).add(exp.pk)
+        while len(self._pages) > self.cached_pages:
+            _, evicted = self._pages.popitem(last=False)
+            for exp in evicted.values():
+                self._category_rows.get(exp.category, set()).discard(exp.pk)
+
+    def _expense(self, pk: int) -> expense.Expense | None:
+        """
+        Expense with primary key from page cache, page is refetched if evicted
+        """
+        if pk > self._last_pk:
+            #row added in this session and not fetched by pages
+            if pk not in self._tail:
+                exp = self.repo.get(pk)
+                self._tail[pk] = exp
+                if exp is not None:
+                    self._category_rows.setdefault(exp.category,
+                                                   set()).add(pk)
+            return self._tail[pk]
+        number = bisect.bisect_right(self._page_starts, pk) - 1
+        page = self._pages.get(number)
+        if page is None:
+            if number + 1 < len(self._page_starts):
+                last = self._page_starts[number + 1] - 1
+            else:
+                last = self._last_pk
+            page = {
+                exp.pk: exp
+                for exp in self.repo.get_all(
+                    {'pk': ('BETWEEN', (self._page_starts[number], last))})
+            }
+            self._store_page(number, page)
+        else:
+            self._pages.move_to_end(number)
+        return page.get(pk)
+
+    def key(self, row: int) -> int:
+        """
+        Primary key of expense in row, negative for unsaved rows
+        """
+        if row < len(self._keys):
+            return self._keys[row]
+        return self._new_keys[row - len(self._keys)]
+
+    def row(self, pk: int) -> int | None:
+        """
+        Row of expense with primary key, None if row is not shown
+        """
+        row = bisect.bisect_left(self._keys, pk)
+        if row < len(self._keys) and self._keys[row] == pk:
+            return row
+        if pk in self._new_keys:
+            return len(self._keys) + self._new_keys.index(pk)
+        return None
+
+    def data(self, index: QtCore.QModelIndex,
+             role: int = QtCore.Qt.DisplayRole) -> typing.Any:
+        if not index.isValid():
+            return None
+        key = self.key(index.row())
+        if role == QtCore.Qt.UserRole:
+            return key
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return None
+        column = self.COLUMNS[index.column()]
+        if (key, column) in self._edits:
+            return self._edits[(key, column)]
+        if key < 0:
+            return ''
+        exp = self._expense(key)
+        if exp is None:
+            return ''
+        value = getattr(exp, column)
+        if value is None:
+            return ''
+        if column == 'category':
+            return self.category_name(value)
+        return str(value)
+
+    def setData(self, index: QtCore.QModelIndex, value: typing.Any,
+                role: int = QtCore.Qt.EditRole) -> bool:
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        key = self.key(index.row())
+        column = self.COLUMNS[index.column()]
+        self._edits[(key, column)] = str(value)
+        self.dataChanged.emit(index, index, [role])
+        self.cell_edited.emit(key, column, str(value))
+        return True
+
+    def insert_new_row(self, key: int, values: dict[str, str]) -> None:
+        """
+        Append unsaved row with negative key and initial cell texts
+        """
+        row = self.rowCount()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._new_keys.append(key)
+        for column, text in values.items():
+            self._edits[(key, column)] = text
+        self.endInsertRows()
+
+    def removeRows(self, row: int, count: int,
+                   parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        if parent.isValid() or row < 0 or row + count > self.rowCount():
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for _ in range(count):
+            key = self.key(row)
+            if row < len(self._keys):
+                del self._keys[row]
+            else:
+                del self._new_keys[row - len(self._keys)]
+            for column in self.COLUMNS:
+                self._edits.pop((key, column), None)
+        self.endRemoveRows()
+        return True
+
+    def set_key(self, key: int, pk: int) -> None:
+        """
+        Replace temporary key of saved row by its primary key
+        """
+        self._new_keys[self._new_keys.index(key)] = pk
+        for column in self.COLUMNS:
+            if (key, column) in self._edits:
+                self._edits[(pk, column)] = self._edits.pop((key, column))
+
+    def refresh(self) -> None:
+        """
+        Forget edited texts and cached pages after changes were saved
+        """
+        self._edits.clear()
+        self._pages.clear()
+        self._tail.clear()
+        self._category_rows.clear()
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    def refresh_categories(self, categories: typing.Iterable[int]) -> None:
+        """
+        Repaint category cells of loaded rows with given categories,
+        for example after categories were renamed. Rows which are not
+        loaded take new names when they are fetched.
+        """
+        col = self.COLUMNS.index('category')
+        for category in categories:
+            for pk in self._category_rows.get(category, ()):
+                row = self.row(pk)
+                if row is not None:
+                    index = self.index(row, col)
+                    self.dataChanged.emit(index, index)
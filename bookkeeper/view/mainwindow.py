@@ -1,5 +1,6 @@
-import dataclasses
+import collections
 import datetime
+import itertools
 
 from PySide6 import QtWidgets
 from PySide6 import QtCore
@@ -8,81 +9,58 @@ from PySide6 import QtGui
 from bookkeeper.models import expense
 from bookkeeper.models import category
 from bookkeeper.repository import abstract_repository
+from bookkeeper.view import changes
+from bookkeeper.view import expense_model
 from bookkeeper.view import ui_mainwindow
 
 
-@dataclasses.dataclass(slots=True)
-class Change:
-    """
-    Object to save change in table
-    """
-    operator: str
-    row: int | None = None
-    col: str | None = None
-    new_value: str | None = None
-    old_value: str | None = None
-    change_on_item: QtWidgets.QTreeWidgetItem | None = None
-
-
 class MainWindow(QtWidgets.QMainWindow):
 
     def __init__(
         self,
         esp_repo: abstract_repository.AbstractRepository[expense.Expense],
-        cate_repo: abstract_repository.AbstractRepository[category.Category]
+        cate_repo: abstract_repository.AbstractRepository[category.Category],
+        category_tree: category.CategoryTree | None = None
     ) -> None:
         super(MainWindow, self).__init__()
         self.ui = ui_mainwindow.Ui_MainWindow()
         self.ui.setupUi(self)
-        self.ui.table_widget_expense.setColumnWidth(0, 200)
-        self.ui.table_widget_expense.setColumnWidth(1, 80)
-        self.ui.table_widget_expense.setColumnWidth(2, 80)
-        self.ui.table_widget_expense.setColumnWidth(3, 305)
+        #all categories are loaded by one query, expense rows take
+        #category names from this tree
+        if category_tree is None:
+            category_tree = category.CategoryTree.from_repo(cate_repo)
+        self.category_tree = category_tree
+        #expense rows are fetched from repository while scrolling
+        self.expense_model = expense_model.ExpenseTableModel(
+            esp_repo, self.category_name, parent=self)
+        self.ui.table_view_expense.setModel(self.expense_model)
+        self.ui.table_view_expense.setColumnWidth(0, 200)
+        self.ui.table_view_expense.setColumnWidth(1, 80)
+        self.ui.table_view_expense.setColumnWidth(2, 80)
+        self.ui.table_view_expense.setColumnWidth(3, 305)
 
         self.ui.table_widget_budget.setColumnWidth(0, 80)
         self.ui.table_widget_budget.setColumnWidth(1, 293)
         self.ui.table_widget_budget.setColumnWidth(2, 293)
 
-        #cache to save expense table changes
-        self.expense_table_changes: list[Change] = []
-        #cache to save category changes
-        self.category_tree_changes: list[Change] = []
+        #journal of expense table changes, rows are targets
+        self.expense_table_changes = changes.ChangeJournal()
+        #journal of category changes, tree items are targets
+        self.category_tree_changes = changes.ChangeJournal()
         #cache to save pre-last category tree item text
         self.old_text_cache: dict[QtWidgets.QTreeWidgetItem, str] = {}
-
-        #write data to table
-        data = esp_repo.get_all()
-        self.ui.table_widget_expense.setRowCount(len(data))
-        for i, espense in enumerate(data):
-            for j in range(self.ui.table_widget_expense.columnCount()):
-                attr_name = self.ui.table_widget_expense.horizontalHeaderItem(
-                    j).text().lower()
-                item = getattr(espense, attr_name)
-                if item is None:
-                    item = ''
-                else:
-                    if attr_name == 'category':
-                        item = cate_repo.get(getattr(espense, attr_name)).name
-                self.ui.table_widget_expense.setItem(
-                    i, j, QtWidgets.QTableWidgetItem(str(item)))
+        #how many tree items have each name, to check duplicates
+        self.category_name_counts: collections.Counter[str] = \
+            collections.Counter()
+        #rows are addressed by primary key, unsaved rows get negative keys
+        self.new_expense_keys = itertools.count(-1, -1)
 
         #write data to tree
-        tree_widgets: list[QtWidgets.QTreeWidgetItem] = []
-        data_tree = cate_repo.get_all()
-        for _ in data_tree:
-            tree_widgets.append(QtWidgets.QTreeWidgetItem())
-        for i, row in enumerate(data_tree):
-            tree_widgets[i].addChildren([
-                tree_widgets[cat.pk - 1]
-                for cat in row.get_all_children(cate_repo)
-            ])
-            tree_widgets[i].setText(0, row.name)
-            tree_widgets[i].setFlags(tree_widgets[i].flags()
-                                     | QtCore.Qt.ItemIsEditable)
-            self.old_text_cache[tree_widgets[i]] = tree_widgets[i].text(0)
-
         self.ui.tree_widget_category.setColumnCount(1)
-        self.ui.tree_widget_category.addTopLevelItems(tree_widgets)
+        self.ui.tree_widget_category.addTopLevelItems([
+            self.create_tree_item(cat)
+            for cat in self.category_tree.roots()
+        ])
 
         self.ui.combo_box_chose_category.addItem('All')
         for tree_widget_item in self.all_chilren_tree():
@@ -111,7 +89,7 @@ class MainWindow(QtWidgets.QMainWindow):
         icon = QtGui.QIcon(pixmap)
         self.ui.button_add_child_category.setIcon(icon)
 
-        self.ui.table_widget_expense.itemChanged.connect(
+        self.expense_model.cell_edited.connect(
             self.handle_expense_table_updating)
         self.ui.button_add_expense.clicked.connect(
             self.handle_expense_table_adding_row)
@@ -127,42 +105,59 @@ class MainWindow(QtWidgets.QMainWindow):
         self.ui.button_delete_category.clicked.connect(
             self.handle_category_tree_deleting)
 
-    @QtCore.Slot(QtWidgets.QTableWidgetItem)
-    def handle_expense_table_updating(
-            self, item: QtWidgets.QTableWidgetItem) -> None:
-        row = item.row() + 1
-        col = item.column()
-        value = item.text()
-        column_name = self.ui.table_widget_expense.horizontalHeaderItem(
-            col).text().lower()
-        #we only save newest change for one item
-        for c in self.expense_table_changes:
-            if c.operator == 'update' and c.change_on_item is item:
-                c.new_value = value
-                return
-        self.expense_table_changes.append(
-            Change('update', row, column_name, value, change_on_item=item))
+    def category_name(self, pk: int) -> str:
+        """
+        Name of category by primary key
+        """
+        cat = self.category_tree.get(pk)
+        return '' if cat is None else cat.name
+
+    def set_expense_row_pk(self, key: int, pk: int) -> None:
+        """
+        Replace temporary key of saved new row by its primary key
+        """
+        self.expense_model.set_key(key, pk)
+
+    def create_tree_item(
+            self, cat: category.Category) -> QtWidgets.QTreeWidgetItem:
+        """
+        Create tree widget item for category with all its subcategories
+        """
+        tree_widget = QtWidgets.QTreeWidgetItem([cat.name])
+        tree_widget.setData(0, QtCore.Qt.UserRole, cat.pk)
+        tree_widget.setFlags(tree_widget.flags() | QtCore.Qt.ItemIsEditable)
+        self.old_text_cache[tree_widget] = tree_widget.text(0)
+        self.category_name_counts[cat.name] += 1
+        tree_widget.addChildren([
+            self.create_tree_item(child)
+            for child in self.category_tree.children(cat.pk)
+        ])
+        return tree_widget
+
+    @QtCore.Slot(object, str, str)
+    def handle_expense_table_updating(self, row: int, column_name: str,
+                                      value: str) -> None:
+        #journal only keeps newest change for one item
+        self.expense_table_changes.update(
+            row, changes.Change('update', row, column_name, value))
 
     @QtCore.Slot()
     def handle_expense_table_adding_row(self) -> None:
-        current_row_count = self.ui.table_widget_expense.rowCount()
-        self.ui.table_widget_expense.insertRow(current_row_count)
         #auto write for new row current date
-        self.ui.table_widget_expense.setItem(
-            self.ui.table_widget_expense.rowCount() - 1, 0,
-            QtWidgets.QTableWidgetItem(
-                datetime.datetime.now().strftime('%Y-%m-%d')))
-        self.expense_table_changes.append(
-            Change('add',
-                   col='date',
-                   new_value=datetime.datetime.now().strftime('%Y-%m-%d')))
+        key = next(self.new_expense_keys)
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        self.expense_model.insert_new_row(key, {'date': today})
+        self.expense_table_changes.add(
+            key, changes.Change('add', key, col='date', new_value=today))
 
     @QtCore.Slot()
     def handle_expense_table_deleting_row(self) -> None:
-        selected_row = self.ui.table_widget_expense.currentRow()
-        if selected_row >= 0:
-            self.ui.table_widget_expense.removeRow(selected_row)
-        self.expense_table_changes.append(Change('delete', selected_row + 1))
+        selected_row = self.ui.table_view_expense.currentIndex().row()
+        if selected_row < 0:
+            return
+        pk = self.expense_model.key(selected_row)
+        self.expense_model.removeRow(selected_row)
+        self.expense_table_changes.delete(pk, changes.Change('delete', pk))
 
     @QtCore.Slot(QtWidgets.QTreeWidgetItem, int)
     def handle_category_tree_updating(self, item: QtWidgets.QTreeWidgetItem,
@@ -172,13 +167,13 @@ class MainWindow(QtWidgets.QMainWindow):
                 item, '')  # Get the old text from cache
             new_text = item.text(column)  # Get the new text after the change
             self.old_text_cache[item] = new_text
-        #we only save newest change for one item
-        for c in self.category_tree_changes:
-            if c.operator == 'update' and c.change_on_item is item:
-                c.new_value = new_text
-                return
-        self.category_tree_changes.append(
-            Change('update', new_value=new_text, old_value=old_text, change_on_item=item))
+            self.category_name_counts[old_text] -= 1
+            self.category_name_counts[new_text] += 1
+        #journal only keeps newest change for one item
+        self.category_tree_changes.update(
+            item,
+            changes.Change('update', new_value=new_text, old_value=old_text,
+                           change_on_item=item))
 
     def get_child_items(
         self, parent_item: QtWidgets.QTreeWidgetItem
@@ -216,22 +211,28 @@ class MainWindow(QtWidgets.QMainWindow):
         new_item = QtWidgets.QTreeWidgetItem([item_text])
         new_item.setFlags(new_item.flags() | QtCore.Qt.ItemIsEditable)
         self.old_text_cache[new_item] = new_item.text(0)
+        self.category_name_counts[item_text] += 1
         if selected_item is None:
             self.ui.tree_widget_category.addTopLevelItem(new_item)
-            self.category_tree_changes.append(
-                Change('add', new_value=new_item.text(0), old_value=None))
+            self.category_tree_changes.add(
+                new_item,
+                changes.Change('add', new_value=new_item.text(0),
+                               old_value=None))
         else:
             parent = selected_item.parent()
             if parent is None:
                 self.ui.tree_widget_category.addTopLevelItem(new_item)
-                self.category_tree_changes.append(
-                    Change('add', new_value=new_item.text(0), old_value=None))
+                self.category_tree_changes.add(
+                    new_item,
+                    changes.Change('add', new_value=new_item.text(0),
+                                   old_value=None))
             else:
                 parent.addChild(new_item)
-                self.category_tree_changes.append(
-                    Change('add',
-                            new_value=new_item.text(0),
-                            old_value=parent.text(0)))
+                self.category_tree_changes.add(
+                    new_item,
+                    changes.Change('add',
+                                   new_value=new_item.text(0),
+                                   old_value=parent.text(0)))
 
     @QtCore.Slot()
     def handle_category_tree_adding_child(self) -> None:
@@ -252,22 +253,31 @@ class MainWindow(QtWidgets.QMainWindow):
         new_item = QtWidgets.QTreeWidgetItem([item_text])
         new_item.setFlags(new_item.flags() | QtCore.Qt.ItemIsEditable)
         self.old_text_cache[new_item] = new_item.text(0)
+        self.category_name_counts[item_text] += 1
         selected_item.addChild(new_item)
-        self.category_tree_changes.append(
-            Change('add',
-                   new_value=new_item.text(0),
-                   old_value=selected_item.text(0)))
+        self.category_tree_changes.add(
+            new_item,
+            changes.Change('add',
+                           new_value=new_item.text(0),
+                           old_value=selected_item.text(0)))
 
     @QtCore.Slot()
     def handle_category_tree_deleting(self) -> None:
         selected_item = self.ui.tree_widget_category.currentItem()
-        if selected_item is not None:
-            parent = selected_item.parent()
-            if parent is None:
-                index = self.ui.tree_widget_category.indexOfTopLevelItem(
-                    selected_item)
-                self.ui.tree_widget_category.takeTopLevelItem(index)
-            else:
-                parent.removeChild(selected_item)
-        self.category_tree_changes.append(
-            Change('delete', old_value=selected_item.text(0)))
+        if selected_item is None:
+            return
+        #subcategories are deleted with category
+        for child_item in self.get_child_items(selected_item):
+            self.category_tree_changes.discard(child_item)
+            self.category_name_counts[child_item.text(0)] -= 1
+        self.category_name_counts[selected_item.text(0)] -= 1
+        self.category_tree_changes.delete(
+            selected_item,
+            changes.Change('delete', old_value=selected_item.text(0)))
+        parent = selected_item.parent()
+        if parent is None:
+            index = self.ui.tree_widget_category.indexOfTopLevelItem(
+                selected_item)
+            self.ui.tree_widget_category.takeTopLevelItem(index)
+        else:
+            parent.removeChild(selected_item)
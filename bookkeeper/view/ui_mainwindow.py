@@ -17,9 +17,9 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor, QFont,
                            QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QComboBox, QHeaderView, QLabel,
                                QLineEdit, QMainWindow, QMenuBar, QPushButton,
-                               QSizePolicy, QStatusBar, QTableWidget,
-                               QTableWidgetItem, QTreeWidget, QTreeWidgetItem,
-                               QVBoxLayout, QWidget)
+                               QSizePolicy, QStatusBar, QTableView,
+                               QTableWidget, QTableWidgetItem, QTreeWidget,
+                               QTreeWidgetItem, QVBoxLayout, QWidget)
 
 
 class Ui_MainWindow(object):
@@ -36,24 +36,10 @@ class Ui_MainWindow(object):
         self.verticalLayout = QVBoxLayout(self.verticalLayoutWidget)
         self.verticalLayout.setObjectName(u"verticalLayout")
         self.verticalLayout.setContentsMargins(0, 0, 0, 0)
-        self.table_widget_expense = QTableWidget(self.verticalLayoutWidget)
-        if (self.table_widget_expense.columnCount() < 4):
-            self.table_widget_expense.setColumnCount(4)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.table_widget_expense.setHorizontalHeaderItem(
-            0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.table_widget_expense.setHorizontalHeaderItem(
-            1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.table_widget_expense.setHorizontalHeaderItem(
-            2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.table_widget_expense.setHorizontalHeaderItem(
-            3, __qtablewidgetitem3)
-        self.table_widget_expense.setObjectName(u"table_widget_expense")
-
-        self.verticalLayout.addWidget(self.table_widget_expense)
+        self.table_view_expense = QTableView(self.verticalLayoutWidget)
+        self.table_view_expense.setObjectName(u"table_view_expense")
+
+        self.verticalLayout.addWidget(self.table_view_expense)
 
         self.verticalLayoutWidget_2 = QWidget(self.central_widget)
         self.verticalLayoutWidget_2.setObjectName(u"verticalLayoutWidget_2")
@@ -164,21 +150,6 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         MainWindow.setWindowTitle(
             QCoreApplication.translate("MainWindow", u"Bookkeeper", None))
-        ___qtablewidgetitem = self.table_widget_expense.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(
-            QCoreApplication.translate("MainWindow", u"Date", None))
-        ___qtablewidgetitem1 = self.table_widget_expense.horizontalHeaderItem(
-            1)
-        ___qtablewidgetitem1.setText(
-            QCoreApplication.translate("MainWindow", u"Amount", None))
-        ___qtablewidgetitem2 = self.table_widget_expense.horizontalHeaderItem(
-            2)
-        ___qtablewidgetitem2.setText(
-            QCoreApplication.translate("MainWindow", u"Category", None))
-        ___qtablewidgetitem3 = self.table_widget_expense.horizontalHeaderItem(
-            3)
-        ___qtablewidgetitem3.setText(
-            QCoreApplication.translate("MainWindow", u"Comment", None))
         ___qtablewidgetitem4 = self.table_widget_budget.horizontalHeaderItem(0)
         ___qtablewidgetitem4.setText(
             QCoreApplication.translate("MainWindow", u"Tern", None))
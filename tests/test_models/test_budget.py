@@ -0,0 +1,9 @@
+import decimal
+
+from bookkeeper.models.budget import Budget
+
+
+def test_create_brief():
+    b = Budget(decimal.Decimal(100))
+    assert b.amount == 100
+    assert b.tern == 'month'
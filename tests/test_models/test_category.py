@@ -5,7 +5,7 @@ from inspect import isgenerator
 
 import pytest
 
-from bookkeeper.models.category import Category
+from bookkeeper.models.category import Category, CategoryTree
 from bookkeeper.repository.memory_repository import MemoryRepository
 
 
@@ -106,3 +106,77 @@ def test_create_from_tree_error(repo):
     tree = [('1', 'parent'), ('parent', None)]
     with pytest.raises(KeyError):
         Category.create_from_tree(tree, repo)
+
+
+@pytest.fixture
+def tree_repo(repo):
+    # 0 -> 1 -> 3, 0 -> 2, 4
+    root_pk = repo.add(Category('0'))
+    pk1 = repo.add(Category('1', root_pk))
+    repo.add(Category('2', root_pk))
+    repo.add(Category('3', pk1))
+    repo.add(Category('4'))
+    return repo
+
+
+def test_tree_lookups(tree_repo):
+    tree = CategoryTree.from_repo(tree_repo)
+    assert len(tree) == 5
+    assert [c.name for c in tree.roots()] == ['0', '4']
+    assert [c.name for c in tree.children(1)] == ['1', '2']
+    assert tree.parent(4).name == '1'
+    assert tree.parent(1) is None
+    assert tree.path(4) == (1, 2)
+    assert tree.depth(4) == 2
+    assert [c.name for c in tree.ancestors(4)] == ['1', '0']
+    assert [c.name for c in tree.descendants(1)] == ['1', '3', '2']
+
+
+def test_methods_with_tree(tree_repo):
+    tree = CategoryTree.from_repo(tree_repo)
+    c = tree.get(4)
+    assert c.get_parent(tree_repo, tree) == c.get_parent(tree_repo)
+    assert list(c.get_all_parents(tree_repo, tree)) == list(c.get_all_parents(tree_repo))
+    root = tree.get(1)
+    assert list(root.get_subcategories(tree_repo, tree)) == \
+        list(root.get_subcategories(tree_repo))
+    assert list(root.get_all_children(tree_repo, tree)) == \
+        list(root.get_all_children(tree_repo))
+
+
+def test_tree_add_update_remove(tree_repo):
+    tree = CategoryTree.from_repo(tree_repo)
+    new = Category('5', 4)
+    tree_repo.add(new)
+    tree.add(new)
+    assert tree.path(new.pk) == (1, 2, 4)
+    # перенос поддерева 1 -> 3 -> 5 под категорию 4
+    moved = Category('1', 5, pk=2)
+    tree.update(moved)
+    assert [c.name for c in tree.children(1)] == ['2']
+    assert tree.path(2) == (5, )
+    assert tree.path(new.pk) == (5, 2, 4)
+    assert tree.depth(4) == 2
+    tree.update(Category('renamed', 5, pk=2))
+    assert tree.get(2).name == 'renamed'
+    assert [c.name for c in tree.children(5)] == ['renamed']
+    tree.remove(2)
+    assert len(tree) == 3
+    assert tree.children(5) == []
+    assert 4 not in tree and new.pk not in tree
+
+
+def test_tree_find(tree_repo):
+    tree = CategoryTree.from_repo(tree_repo)
+    assert tree.find('3').pk == 4
+    assert tree.find('missing') is None
+    tree.update(Category('renamed', 2, pk=4))
+    assert tree.find('3') is None
+    assert tree.find('renamed').pk == 4
+    new = Category('renamed', None)
+    tree_repo.add(new)
+    tree.add(new)
+    assert tree.find('renamed').pk == 4
+    tree.remove(2)
+    assert tree.find('1') is None
+    assert tree.find('renamed').pk == new.pk
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 
@@ -32,3 +32,7 @@ def test_can_add_to_repo(repo):
     e = Expense(100, 1)
     pk = repo.add(e)
     assert e.pk == pk
+
+
+def test_date_defaults_to_today():
+    assert Expense(100, 1).date == date.today().isoformat()
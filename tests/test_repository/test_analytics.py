@@ -0,0 +1,99 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository import migrations, totals
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+analytics = pytest.importorskip('bookkeeper.repository.analytics')
+
+EXPENSES = [
+    (100, 1, '2024-01-01'),
+    (250, 2, '2024-01-07'),
+    (5, 2, '2024-01-08'),
+    (7, None, None),
+    (None, 1, '2024-03-31'),
+    (9, 1, ''),
+    (40, 2, '2024-03-01'),
+]
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(':memory:')
+    migrations.migrate(con)
+    con.execute("INSERT INTO category (name, parent) VALUES ('child', 1)")
+    con.executemany(
+        "INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)",
+        EXPENSES)
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def columns(con):
+    return analytics.from_connection(con)
+
+
+def test_from_connection(columns):
+    assert len(columns) == len(EXPENSES)
+    assert columns.amount.tolist() == [100, 250, 5, 7, 0, 9, 40]
+    assert columns.category.tolist() == [1, 2, 2, 0, 1, 1, 2]
+    assert columns.day[0] == (datetime.date(2024, 1, 1)
+                              - datetime.date(1970, 1, 1)).days
+    assert columns.day[3] == columns.day[5] == analytics.NO_DAY
+
+
+def test_from_repository(columns):
+    repo = MemoryRepository[Expense]()
+    repo.add_many(Expense(None if amount is None else amount / 100,
+                          category, None, date)
+                  for amount, category, date in EXPENSES)
+    loaded = analytics.from_repository(repo, batch_size=2)
+    for name in ('amount', 'category', 'day'):
+        assert getattr(loaded, name).tolist() == getattr(columns, name).tolist()
+
+
+def test_sums_match_totals(con, columns):
+    assert analytics.sums_by_category(columns) == totals.sums_by_category(con)
+    for day in (datetime.date(2024, 1, 8), datetime.date(2024, 3, 31),
+                datetime.date(2023, 12, 31)):
+        assert analytics.sum_by_periods(columns, day) == \
+            totals.sum_by_periods(con, day)
+
+
+def test_sums_by_period(columns):
+    assert analytics.sums_by_period(columns, 'week') == \
+        {'2024-01-01': 350, '2024-01-08': 5, '2024-02-26': 40,
+         '2024-03-25': 0}
+    assert analytics.sums_by_period(columns, 'month') == \
+        {'2024-01-01': 355, '2024-03-01': 40}
+    with pytest.raises(ValueError):
+        analytics.sums_by_period(columns, 'decade')
+
+
+def test_series(columns):
+    days, sums = analytics.daily_sums(columns)
+    assert str(days[0]) == '2024-01-01' and str(days[-1]) == '2024-03-31'
+    assert sums.sum() == 395 and sums[6] == 250
+    days, means = analytics.rolling_mean(columns, 3)
+    assert means[:3].tolist() == [100, 50, 100 / 3]
+    assert means[7] == pytest.approx(255 / 3)
+    months, deltas = analytics.month_deltas(columns)
+    assert [str(month) for month in months] == ['2024-02-01', '2024-03-01']
+    assert deltas.tolist() == [-355, 40]
+
+
+def test_percentiles(columns):
+    assert analytics.percentiles(columns, (0, 50, 100)) == \
+        {0: 0.0, 50: 9.0, 100: 250.0}
+
+
+def test_empty():
+    columns = analytics.from_repository(MemoryRepository[Expense]())
+    assert analytics.sums_by_category(columns) == {}
+    assert analytics.sums_by_period(columns, 'day') == {}
+    assert len(analytics.rolling_mean(columns)[1]) == 0
+    assert len(analytics.month_deltas(columns)[1]) == 0
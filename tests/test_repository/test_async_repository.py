@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository import connection
+from bookkeeper.repository.async_repository import (AsyncMemoryRepository,
+                                                    AsyncSQLiteRepository)
+
+TASKS = 300
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    with sqlite3.connect(db_file) as con:
+        con.execute(
+            "CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, parent INTEGER)")
+    return db_file
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_repo(request, db_file):
+    def make():
+        if request.param == 'memory':
+            return AsyncMemoryRepository[Category]()
+        return AsyncSQLiteRepository[Category](db_file, Category)
+    return make
+
+
+async def close(repo):
+    if isinstance(repo, AsyncSQLiteRepository):
+        await repo.close()
+
+
+def test_crud(make_repo):
+    async def scenario():
+        repo = make_repo()
+        cat = Category('name')
+        pk = await repo.add(cat)
+        assert cat.pk == pk
+        assert await repo.get(pk) == cat
+        cat.name = 'new'
+        await repo.update(cat)
+        assert await repo.get_all({'name': 'new'}) == [cat]
+        await repo.delete(pk)
+        assert await repo.get(pk) is None
+        await close(repo)
+    asyncio.run(scenario())
+
+
+def test_concurrent_tasks(make_repo):
+    async def scenario():
+        repo = make_repo()
+        cats = [Category(str(i)) for i in range(TASKS)]
+        pks = await asyncio.gather(*(repo.add(c) for c in cats))
+        assert len(set(pks)) == TASKS
+        got = await asyncio.gather(*(repo.get(pk) for pk in pks))
+        assert [c.name for c in got] == [c.name for c in cats]
+        # чтение и запись вперемешку
+        await asyncio.gather(*(
+            repo.delete(pk) if i % 2 else repo.get_all({'pk': pk})
+            for i, pk in enumerate(pks)))
+        assert len(await repo.get_all()) == TASKS // 2
+        await close(repo)
+    asyncio.run(scenario())
+
+
+def test_bulk_and_iter_all(make_repo):
+    async def scenario():
+        repo = make_repo()
+        cats = [Category(str(i)) for i in range(25)]
+        pks = await repo.add_many(cats)
+        assert pks == [c.pk for c in cats]
+        for c in cats:
+            c.name += '!'
+        await repo.update_many(cats)
+        assert await repo.get_many(pks[:3]) == {c.pk: c for c in cats[:3]}
+        await repo.delete_many(pks[20:])
+        names = [c.name async for c in repo.iter_all(batch_size=7)]
+        assert names == [c.name for c in cats[:20]]
+        page = await repo.page(pks[4], 3)
+        assert [c.pk for c in page] == pks[5:8]
+        await close(repo)
+    asyncio.run(scenario())
+
+
+def test_sqlite_uses_wal(db_file):
+    async def scenario():
+        repo = AsyncSQLiteRepository[Category](db_file, Category)
+        await repo.add(Category('name'))
+        await repo.close()
+    asyncio.run(scenario())
+    with sqlite3.connect(db_file) as con:
+        assert con.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_sqlite_rejects_non_wal_manager(db_file):
+    manager = connection.ConnectionManager(db_file, connection.LEGACY)
+    with pytest.raises(ValueError):
+        AsyncSQLiteRepository[Category](db_file, Category, manager)
+    manager.close()
@@ -0,0 +1,53 @@
+import datetime
+import decimal
+
+import pytest
+
+from bookkeeper.models.budget import Budget
+from bookkeeper.repository.budgets import BudgetChecker
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+DAY = datetime.date(2024, 1, 10)
+
+
+@pytest.fixture
+def checker():
+    return BudgetChecker([Budget(decimal.Decimal(100), 'day'),
+                          Budget(decimal.Decimal(500), 'week')], DAY)
+
+
+def test_from_repo():
+    repo = MemoryRepository[Budget]()
+    repo.add(Budget(decimal.Decimal(10), 'day'))
+    checker = BudgetChecker.from_repo(repo, DAY)
+    assert checker.limit('day') == 10
+    assert checker.limit('month') is None
+    assert checker.exceeded() == []
+
+
+def test_counters(checker):
+    checker.reconcile(DAY, {'day': decimal.Decimal(90), 'week': decimal.Decimal(90),
+                            'month': decimal.Decimal(90),
+                            'year': decimal.Decimal(90)})
+    checker.add(decimal.Decimal(20), '2024-01-10')
+    assert checker.exceeded() == ['day']
+    checker.add(decimal.Decimal(1000), '2024-01-08')
+    assert checker.spent == {'day': 110, 'week': 1110, 'month': 1110,
+                             'year': 1110}
+    assert checker.exceeded() == ['day', 'week']
+    checker.remove(decimal.Decimal(1000), '2024-01-08')
+    checker.remove(decimal.Decimal(20), '2024-01-10')
+    assert checker.exceeded() == []
+    # расходы вне текущих периодов и без суммы не учитываются
+    checker.add(decimal.Decimal(1000), '2023-12-31')
+    checker.add(None, '2024-01-10')
+    checker.add(decimal.Decimal(1000), None)
+    assert checker.spent['year'] == 90
+
+
+def test_set_budget(checker):
+    checker.add(decimal.Decimal(50), '2024-01-10')
+    checker.set_budget(Budget(decimal.Decimal(10), 'month'))
+    assert checker.exceeded() == ['month']
+    checker.set_budget(Budget(None, 'month'))
+    assert checker.exceeded() == []
@@ -0,0 +1,135 @@
+import dataclasses
+
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.cached_repository import CachedRepository
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+
+class CountingRepository(MemoryRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get(self, pk):
+        self.reads += 1
+        return super().get(pk)
+
+    def get_all(self, where=None, order_by=None, limit=None, offset=None):
+        self.reads += 1
+        return super().get_all(where, order_by, limit, offset)
+
+
+@pytest.fixture
+def inner():
+    return CountingRepository()
+
+
+@pytest.fixture
+def repo(inner):
+    return CachedRepository[Category](inner)
+
+
+def test_get_is_cached(repo, inner):
+    cat = Category('food')
+    repo.add(cat)
+    assert repo.get(cat.pk) == cat
+    assert repo.get(cat.pk) == cat
+    assert repo.get(100) is None
+    assert repo.get(100) is None
+    assert inner.reads == 2
+    assert (repo.stats.hits, repo.stats.misses) == (2, 2)
+
+
+def test_get_all_key_is_normalized(repo, inner):
+    repo.add_many([Category('a'), Category('b', 1)])
+    assert repo.get_all({'name': 'a', 'parent': None}) == [Category('a', pk=1)]
+    assert repo.get_all({'parent': ('=', None), 'name': 'a'}) == \
+        [Category('a', pk=1)]
+    assert repo.get_all({'pk': ('IN', [1, 2])}) == \
+        repo.get_all({'pk': ('IN', (1, 2))})
+    assert inner.reads == 2
+
+
+def test_writes_invalidate_precisely(repo, inner):
+    food = Category('food')
+    repo.add(food)
+    repo.get_all({'name': 'food'})
+    repo.get_all({'name': 'car'})
+    repo.get_all({'name': 'meat'})
+    # новая запись сбрасывает только выборки, в которые попадает
+    repo.add(Category('car'))
+    reads = inner.reads
+    assert repo.get_all({'name': 'food'}) == [food]
+    assert len(repo.get_all({'name': 'car'})) == 1
+    assert inner.reads == reads + 1
+    # переименование сбрасывает старую и новую выборки
+    repo.get(food.pk)
+    repo.update(dataclasses.replace(food, name='meat'))
+    reads = inner.reads
+    assert repo.get_all({'name': 'food'}) == []
+    assert repo.get_all({'name': 'meat'})[0].pk == food.pk
+    assert repo.get(food.pk).name == 'meat'
+    assert repo.get_all({'name': 'car'})[0].name == 'car'
+    assert inner.reads == reads + 3
+    repo.delete(food.pk)
+    assert repo.get(food.pk) is None
+    assert repo.get_all({'name': 'meat'}) == []
+
+
+def test_offset_query_is_invalidated(repo):
+    repo.add_many([Category('a'), Category('b'), Category('c')])
+    assert [c.name for c in repo.get_all(order_by=('name', ), offset=1)] == \
+        ['b', 'c']
+    repo.update(Category('z', pk=1))
+    assert [c.name for c in repo.get_all(order_by=('name', ), offset=1)] == \
+        ['c', 'z']
+
+
+def test_lru_eviction(inner):
+    repo = CachedRepository[Category](inner, maxsize=2)
+    pks = repo.add_many([Category(str(i)) for i in range(3)])
+    for pk in pks:
+        repo.get(pk)
+    assert repo.stats.evictions == 1
+    repo.get(pks[2])
+    assert repo.stats.hits == 1
+    repo.get(pks[0])
+    assert repo.stats.misses == 4
+
+
+def test_ttl(inner, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    repo = CachedRepository[Category](inner, ttl=10)
+    cat = Category('food')
+    repo.add(cat)
+    repo.get(cat.pk)
+    now[0] = 5
+    repo.get(cat.pk)
+    now[0] = 11
+    repo.get(cat.pk)
+    assert (repo.stats.hits, repo.stats.misses) == (1, 2)
+
+
+def test_sqlite_update_item_and_session(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    manager = ConnectionManager(db_file)
+    repo = CachedRepository[Category](
+        SQLiteRepository[Category](db_file, Category, manager))
+    food = Category('food')
+    repo.add(food)
+    assert repo.get_all({'name': 'food'}) == [food]
+    repo.update_item(food.pk, 'name', 'meat')
+    assert repo.get_all({'name': 'food'}) == []
+    assert repo.get(food.pk).name == 'meat'
+    with pytest.raises(RuntimeError):
+        with repo.session():
+            repo.update_item(food.pk, 'name', 'car')
+            assert repo.get(food.pk).name == 'car'
+            raise RuntimeError
+    assert repo.get(food.pk).name == 'meat'
+    manager.close()
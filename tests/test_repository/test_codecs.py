@@ -0,0 +1,53 @@
+import datetime
+import decimal
+
+import pytest
+
+from bookkeeper.repository import codecs
+
+
+def test_money_round_trip():
+    assert codecs.MONEY.encode(decimal.Decimal('12.34')) == 1234
+    assert codecs.MONEY.encode(12) == 1200
+    assert codecs.MONEY.encode(decimal.Decimal('0.005')) == 0
+    assert codecs.MONEY.decode(1234) == decimal.Decimal('12.34')
+    assert str(codecs.MONEY.decode(500)) == '5.00'
+    assert codecs.MONEY.encode(None) is None
+    assert codecs.MONEY.decode(None) is None
+
+
+def test_datetime_round_trip():
+    value = datetime.datetime(2024, 1, 2, 3, 4, 5, 6)
+    assert codecs.DATETIME.encode(value) == '2024-01-02 03:04:05.000006'
+    assert codecs.DATETIME.decode(codecs.DATETIME.encode(value)) == value
+    assert codecs.DATETIME.decode(None) is None
+
+
+def test_decode_column():
+    assert list(codecs.MONEY.decode_column((1234, 500))) == \
+        [decimal.Decimal('12.34'), decimal.Decimal('5.00')]
+    assert list(codecs.MONEY.decode_column((1234, None))) == \
+        [decimal.Decimal('12.34'), None]
+    assert list(codecs.DATETIME.decode_column(
+        ('2024-01-02 03:04:05', None))) == \
+        [datetime.datetime(2024, 1, 2, 3, 4, 5), None]
+
+
+@pytest.mark.parametrize('text, value', [
+    ('12', '12.00'), ('12.5', '12.50'), (' 12,05 ', '12.05'), ('-1', '-1.00'),
+])
+def test_parse_money(text, value):
+    assert str(codecs.parse_money(text)) == value
+
+
+@pytest.mark.parametrize('text', ['', 'abc', '1.005', 'nan', 'inf'])
+def test_parse_money_illegal(text):
+    with pytest.raises(ValueError):
+        codecs.parse_money(text)
+
+
+def test_for_type():
+    assert codecs.for_type(decimal.Decimal) is codecs.MONEY
+    assert codecs.for_type(datetime.datetime | None) is codecs.DATETIME
+    assert codecs.for_type(int) is None
+    assert codecs.for_type(str | None) is None
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from bookkeeper.repository.connection import (LEGACY, TUNED, ConnectionManager,
+                                              ConnectionProfile)
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    with sqlite3.connect(db_file) as con:
+        con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, value INTEGER)")
+    return db_file
+
+
+def pragma(con, name):
+    return con.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def test_tuned_profile_is_default(db_file):
+    manager = ConnectionManager(db_file)
+    con = manager.connection()
+    assert manager.profile == TUNED
+    assert pragma(con, 'journal_mode') == 'wal'
+    assert pragma(con, 'synchronous') == 1
+    assert pragma(con, 'cache_size') == TUNED.cache_size
+    assert pragma(con, 'temp_store') == 2
+    assert pragma(con, 'busy_timeout') == TUNED.busy_timeout
+    assert pragma(con, 'foreign_keys') == 1
+    manager.close()
+
+
+def test_legacy_profile(db_file):
+    manager = ConnectionManager(db_file, LEGACY)
+    con = manager.connection()
+    assert pragma(con, 'journal_mode') == 'delete'
+    assert pragma(con, 'synchronous') == 2
+    manager.close()
+
+
+def test_invalid_profile():
+    with pytest.raises(ValueError):
+        ConnectionProfile(journal_mode='WAL; DROP TABLE t')
+    with pytest.raises(ValueError):
+        ConnectionProfile(cache_size='1; DROP TABLE t')
+
+
+def test_periodic_checkpoint(db_file):
+    manager = ConnectionManager(db_file, ConnectionProfile(checkpoint_every=5))
+    con = manager.connection()
+    statements = []
+    con.set_trace_callback(statements.append)
+    for i in range(10):
+        con.execute('INSERT INTO t (value) VALUES (?)', (i, ))
+        manager.commit()
+    checkpoints = [i for i, sql in enumerate(statements)
+                   if sql.startswith('PRAGMA wal_checkpoint')]
+    assert len(checkpoints) == 2
+    manager.close()
+    with sqlite3.connect(db_file) as other:
+        assert other.execute('SELECT count(*) FROM t').fetchone()[0] == 10
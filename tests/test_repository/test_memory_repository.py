@@ -70,3 +70,111 @@ def test_get_all_with_condition(repo, custom_class):
         objects.append(o)
     assert repo.get_all({'name': '0'}) == [objects[0]]
     assert repo.get_all({'test': 'test'}) == objects
+
+
+def test_get_many(repo, custom_class):
+    objects = [custom_class() for i in range(5)]
+    for o in objects:
+        repo.add(o)
+    assert repo.get_many([1, 3, 10]) == {1: objects[0], 3: objects[2]}
+
+
+def test_add_many(repo, custom_class):
+    objects = [custom_class() for i in range(5)]
+    pks = repo.add_many(objects)
+    assert pks == [o.pk for o in objects]
+    assert repo.get_all() == objects
+    assert repo.add(custom_class()) == pks[-1] + 1
+
+
+def test_cannot_add_many_with_pk(repo, custom_class):
+    obj = custom_class()
+    obj.pk = 1
+    with pytest.raises(ValueError):
+        repo.add_many([custom_class(), obj])
+    assert repo.get_all() == []
+
+
+def test_update_many(repo, custom_class):
+    pks = repo.add_many([custom_class() for i in range(3)])
+    objects = [custom_class() for pk in pks]
+    for pk, o in zip(pks, objects):
+        o.pk = pk
+    repo.update_many(objects)
+    assert repo.get_all() == objects
+    with pytest.raises(ValueError):
+        repo.update_many([custom_class()])
+
+
+def test_delete_many(repo, custom_class):
+    objects = [custom_class() for i in range(5)]
+    repo.add_many(objects)
+    repo.delete_many([1, 3])
+    assert repo.get_all() == [objects[1], objects[3], objects[4]]
+    with pytest.raises(KeyError):
+        repo.delete_many([2, 1])
+    assert len(repo.get_all()) == 3
+
+
+@pytest.fixture
+def indexed_repo():
+    return MemoryRepository(index_on=('name', 'parent'), range_index_on=('date', ))
+
+
+def make_objects(custom_class, n):
+    objects = []
+    for i in range(n):
+        o = custom_class()
+        o.name = str(i % 3)
+        o.parent = i % 2
+        o.date = f'2024-01-{i + 1:02}'
+        objects.append(o)
+    return objects
+
+
+def test_indexed_get_all(indexed_repo, repo, custom_class):
+    objects = make_objects(custom_class, 10)
+    indexed_repo.add_many(objects)
+    repo.add_many(make_objects(custom_class, 10))
+    for where in ({'name': '1'}, {'parent': 0}, {'name': '2', 'parent': 1},
+                  {'name': '0', 'date': '2024-01-04'}, {'name': 'none'}):
+        expected = [o.pk for o in repo.get_all(where)]
+        assert [o.pk for o in indexed_repo.get_all(where)] == expected
+
+
+def test_index_follows_changes(indexed_repo, custom_class):
+    objects = make_objects(custom_class, 6)
+    indexed_repo.add_many(objects)
+    objects[0].name = 'new'
+    assert indexed_repo.get_all({'name': 'new'}) == []
+    indexed_repo.update(objects[0])
+    assert indexed_repo.get_all({'name': 'new'}) == [objects[0]]
+    assert objects[0] not in indexed_repo.get_all({'name': '0'})
+    indexed_repo.delete(objects[3].pk)
+    assert indexed_repo.get_all({'name': '0'}) == []
+    indexed_repo.delete_many([objects[1].pk])
+    assert indexed_repo.get_all({'name': '1'}) == [objects[4]]
+
+
+def test_get_range(indexed_repo, repo, custom_class):
+    objects = make_objects(custom_class, 10)
+    objects[5].date = None
+    indexed_repo.add_many(objects)
+    repo.add_many(make_objects(custom_class, 10))
+    assert indexed_repo.get_range('date', '2024-01-03', '2024-01-05') == objects[2:4]
+    assert indexed_repo.get_range('date', end='2024-01-02') == objects[:1]
+    assert indexed_repo.get_range('date', '2024-01-09') == objects[8:]
+    assert [o.date for o in repo.get_range('date', '2024-01-03', '2024-01-05')] == \
+        ['2024-01-03', '2024-01-04']
+    objects[9].date = '2023-12-31'
+    indexed_repo.update(objects[9])
+    assert indexed_repo.get_range('date', end='2024-01-02') == [objects[9], objects[0]]
+
+
+def test_iter_all_and_page(repo, custom_class):
+    objects = make_objects(custom_class, 10)
+    repo.add_many(objects)
+    assert list(repo.iter_all({'name': '0'})) == repo.get_all({'name': '0'})
+    assert repo.page(n=3) == objects[:3]
+    assert repo.page(objects[7].pk, 3) == objects[8:]
+    assert repo.page(objects[0].pk, 2, {'parent': 1}) == [objects[1], objects[3]]
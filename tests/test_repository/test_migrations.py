@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+from bookkeeper.repository import migrations
+from bookkeeper.repository.connection import ConnectionManager
+
+LEGACY_SCHEMA = (
+    "CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, parent INTERGER)",
+    "CREATE TABLE expense (id INTEGER PRIMARY KEY, amount INTERGER, "
+    "category INTERGER, expense_date TEXT, date TEXT, comment TEXT, "
+    "FOREIGN KEY (category) REFERENCES category (id) "
+    "ON DELETE CASCADE ON UPDATE CASCADE)",
+    "INSERT INTO category (id, name, parent) VALUES (1, 'Uncategorized', NULL), "
+    "(3, 'food', NULL), (5, 'meat', 3)",
+    "INSERT INTO expense (id, amount, category, date) VALUES "
+    "(2, 100, 5, '2024-01-01'), (7, 50, 3, '2024-01-02'), "
+    "(8, 0.29, 3, '2024-01-02')",
+)
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / 'test.db')
+
+
+def schema(con, kind):
+    return {name for name, in con.execute(
+        "SELECT name FROM sqlite_master WHERE type = ?", (kind, ))}
+
+
+def test_new_database(db_file):
+    con = sqlite3.connect(db_file)
+    assert migrations.migrate(con) == migrations.VERSION
+    assert {'category', 'expense', 'budget', 'expense_rollup'} <= \
+        schema(con, 'table')
+    assert {'expense_category_idx', 'expense_date_amount_idx',
+            'category_parent_idx', 'category_name_idx'} <= schema(con, 'index')
+    assert con.execute("SELECT name FROM category").fetchall() == \
+        [('Uncategorized', )]
+    # повторный запуск ничего не меняет
+    assert migrations.migrate(con) == migrations.VERSION
+    assert con.execute("SELECT count(*) FROM category").fetchone()[0] == 1
+    con.close()
+
+
+def test_upgrade_legacy_database(db_file):
+    with sqlite3.connect(db_file) as con:
+        for statement in LEGACY_SCHEMA:
+            con.execute(statement)
+    manager = ConnectionManager(db_file)
+    con = manager.connection()
+    assert migrations.version(con) == migrations.VERSION
+    for table in ('category', 'expense'):
+        assert 'INTERGER' not in con.execute(
+            "SELECT sql FROM sqlite_master WHERE name = ?",
+            (table, )).fetchone()[0]
+    # дробная сумма REAL округляется до целых копеек
+    assert con.execute("SELECT id, amount, typeof(amount), category "
+                       "FROM expense").fetchall() == \
+        [(2, 10000, 'integer', 5), (7, 5000, 'integer', 3),
+         (8, 29, 'integer', 3)]
+    assert con.execute("SELECT category, amount FROM expense_rollup "
+                       "ORDER BY category").fetchall() == [(3, 5029), (5, 10000)]
+    # внешний ключ и триггеры работают после пересоздания таблиц
+    con.execute("DELETE FROM category WHERE id = 5")
+    manager.commit()
+    assert con.execute("SELECT id FROM expense").fetchall() == [(7, ), (8, )]
+    assert con.execute("SELECT category FROM expense_rollup").fetchall() == \
+        [(3, )]
+    manager.close()
+
+
+def test_non_numeric_amount_aborts_upgrade(db_file):
+    with sqlite3.connect(db_file) as con:
+        for statement in LEGACY_SCHEMA:
+            con.execute(statement)
+        con.execute("INSERT INTO expense (id, amount, category) "
+                    "VALUES (9, 'ten', 3)")
+    con = sqlite3.connect(db_file)
+    with pytest.raises(sqlite3.IntegrityError, match=r'\[9\]'):
+        migrations.migrate(con)
+    # прерванная миграция ничего не меняет
+    assert migrations.version(con) == \
+        migrations.MIGRATIONS.index(migrations.store_minor_units)
+    assert con.execute("SELECT id, amount FROM expense ORDER BY id").fetchall() \
+        == [(2, 100), (7, 50), (8, 0.29), (9, 'ten')]
+    con.close()
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT * FROM expense WHERE category = 1",
+    "SELECT * FROM expense WHERE date BETWEEN '2024-01-01' AND '2024-02-01'",
+    "SELECT * FROM category WHERE parent = 1",
+    "SELECT * FROM category WHERE name = 'food'",
+    "DELETE FROM category WHERE id = 1",
+])
+def test_queries_use_indexes(db_file, sql):
+    con = sqlite3.connect(db_file)
+    migrations.migrate(con)
+    con.execute('PRAGMA foreign_keys = ON')
+    plan = ' '.join(row[-1] for row in
+                    con.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall())
+    assert 'SCAN' not in plan
+    con.close()
@@ -0,0 +1,59 @@
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository import query
+
+
+def test_compile_select():
+    sql, params = query.compile_select(
+        'expense', ('pk', 'amount'),
+        {'amount': ('>=', 10), 'category': ('IN', [1, 2]), 'comment': None,
+         'date': ('BETWEEN', ('2024-01-01', '2024-12-31'))},
+        order_by=('-date', 'pk'), limit=10, offset=5, column_names={'pk': 'id'})
+    assert sql == ('SELECT id, amount FROM expense WHERE amount >= ? '
+                   'AND category IN (?, ?) AND comment IS NULL '
+                   'AND date BETWEEN ? AND ? ORDER BY date DESC, id LIMIT ? OFFSET ?')
+    assert params == [10, 1, 2, '2024-01-01', '2024-12-31', 10, 5]
+
+
+def test_compile_select_offset_without_limit():
+    sql, params = query.compile_select('category', ('*', ), {'parent': ('!=', None)},
+                                       offset=3)
+    assert sql == 'SELECT * FROM category WHERE parent IS NOT NULL LIMIT -1 OFFSET ?'
+    assert params == [3]
+
+
+def test_statement_shape_is_cached():
+    query.compile_select('category', ('*', ), {'name': 'a'})
+    hits = query._select_sql.cache_info().hits
+    query.compile_select('category', ('*', ), {'name': 'b'})
+    assert query._select_sql.cache_info().hits == hits + 1
+
+
+@pytest.fixture
+def cats():
+    return [Category('food', None, 1), Category('Fruit', 1, 2),
+            Category('meat', 1, 3), Category('books', None, 4)]
+
+
+@pytest.mark.parametrize('where, names', [
+    ({'parent': 1}, ['Fruit', 'meat']),
+    ({'parent': None}, ['food', 'books']),
+    ({'parent': ('!=', None)}, ['Fruit', 'meat']),
+    ({'parent': ('!=', 1)}, []),
+    ({'pk': ('>', 2)}, ['meat', 'books']),
+    ({'pk': ('IN', (1, 4))}, ['food', 'books']),
+    ({'pk': ('NOT IN', (1, 4))}, ['Fruit', 'meat']),
+    ({'name': ('LIKE', 'f%')}, ['food', 'Fruit']),
+    ({'name': ('LIKE', '_eat')}, ['meat']),
+    ({'pk': ('BETWEEN', (2, 3)), 'name': ('<', 'm')}, ['Fruit']),
+])
+def test_apply_where(cats, where, names):
+    assert [c.name for c in query.apply(cats, where)] == names
+
+
+def test_apply_order_limit_offset(cats):
+    assert [c.pk for c in query.apply(cats, order_by=('parent', '-pk'))] == \
+        [4, 1, 3, 2]
+    assert [c.pk for c in query.apply(cats, order_by=('-name', ), limit=2,
+                                      offset=1)] == [1, 4]
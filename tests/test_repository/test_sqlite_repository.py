@@ -0,0 +1,311 @@
+import datetime
+import decimal
+import sqlite3
+import threading
+
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository import rollup, totals
+from bookkeeper.repository.connection import ConnectionManager
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    with sqlite3.connect(db_file) as con:
+        con.execute(
+            "CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, parent INTEGER)")
+        con.execute(
+            "CREATE TABLE expense (id INTEGER PRIMARY KEY, amount INTEGER, "
+            "category INTEGER, expense_date TEXT, date TEXT, comment TEXT, "
+            "FOREIGN KEY (category) REFERENCES category (id) "
+            "ON DELETE CASCADE ON UPDATE CASCADE)")
+    return db_file
+
+
+@pytest.fixture
+def manager(db_file):
+    manager = ConnectionManager(db_file)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def repo(db_file, manager):
+    return SQLiteRepository[Category](db_file, Category, manager)
+
+
+@pytest.fixture
+def expense_repo(db_file, manager):
+    return SQLiteRepository[Expense](db_file, Expense, manager)
+
+
+def test_crud(repo):
+    obj = Category('name')
+    pk = repo.add(obj)
+    assert obj.pk == pk
+    assert repo.get(pk) == obj
+    obj2 = Category('other', pk=pk)
+    repo.update(obj2)
+    assert repo.get(pk) == obj2
+    repo.delete(pk)
+    assert repo.get_all() == []
+
+
+def test_get_all_with_condition(repo):
+    parent = Category('parent')
+    repo.add(parent)
+    children = [Category(str(i), parent.pk) for i in range(3)]
+    for c in children:
+        repo.add(c)
+    assert repo.get_all({'name': '0'}) == [children[0]]
+    assert repo.get_all({'parent': parent.pk}) == children
+    assert repo.get_all({'parent': None}) == [parent]
+
+
+def test_repositories_share_connection(repo, expense_repo):
+    assert repo.connection_manager.connection() is \
+        expense_repo.connection_manager.connection()
+
+
+def test_connection_per_thread(manager):
+    connections = []
+    thread = threading.Thread(
+        target=lambda: connections.append(manager.connection()))
+    thread.start()
+    thread.join()
+    assert connections[0] is not manager.connection()
+
+
+def test_session_commits_once(repo, db_file):
+    with repo.session():
+        for i in range(5):
+            repo.add(Category(str(i)))
+        with sqlite3.connect(db_file) as other:
+            assert other.execute('SELECT COUNT(*) FROM category').fetchone()[0] == 0
+    with sqlite3.connect(db_file) as other:
+        assert other.execute('SELECT COUNT(*) FROM category').fetchone()[0] == 5
+
+
+def test_session_rollback(repo):
+    with pytest.raises(RuntimeError):
+        with repo.session():
+            repo.add(Category('name'))
+            raise RuntimeError
+    assert repo.get_all() == []
+
+
+def test_nested_session(repo):
+    with repo.session():
+        with repo.session():
+            repo.add(Category('name'))
+        assert repo.connection_manager.in_session()
+    assert not repo.connection_manager.in_session()
+    assert len(repo.get_all()) == 1
+
+
+def test_get_by_primary_key(repo):
+    cats = [Category(str(i)) for i in range(3)]
+    for c in cats:
+        repo.add(c)
+    repo.connection_manager.connection().execute(
+        'DELETE FROM category WHERE id = ?', (cats[0].pk, ))
+    assert repo.get(cats[2].pk) == cats[2]
+    assert repo.get(cats[0].pk) is None
+
+
+def test_get_many(repo):
+    cats = [Category(str(i)) for i in range(1200)]
+    with repo.session():
+        for c in cats:
+            repo.add(c)
+    pks = [c.pk for c in cats[::2]] + [10_000]
+    assert repo.get_many(pks) == {c.pk: c for c in cats[::2]}
+
+
+def test_delete_keeps_primary_keys(expense_repo, repo):
+    cat = Category('name')
+    repo.add(cat)
+    expenses = [Expense(i, cat.pk) for i in range(5)]
+    for e in expenses:
+        expense_repo.add(e)
+    expense_repo.delete(expenses[1].pk)
+    assert [e.pk for e in expense_repo.get_all()] == \
+        [e.pk for e in expenses[:1] + expenses[2:]]
+    assert expense_repo.get(expenses[4].pk).amount == expenses[4].amount
+
+
+def test_delete_category_subtree(repo, expense_repo):
+    root = Category('root')
+    repo.add(root)
+    child = Category('child', root.pk)
+    repo.add(child)
+    grandchild = Category('grandchild', child.pk)
+    repo.add(grandchild)
+    other = Category('other')
+    repo.add(other)
+    expense_repo.add(Expense(1, grandchild.pk))
+    kept = Expense(2, other.pk)
+    expense_repo.add(kept)
+    repo.delete(child.pk)
+    assert repo.get_all() == [root, other]
+    assert [e.pk for e in expense_repo.get_all()] == [kept.pk]
+
+
+def test_add_many(repo):
+    repo.add(Category('first'))
+    cats = [Category(str(i)) for i in range(5)]
+    pks = repo.add_many(cats)
+    assert pks == [c.pk for c in cats]
+    assert repo.get_all()[1:] == cats
+
+
+def test_update_many(repo):
+    cats = [Category(str(i)) for i in range(5)]
+    repo.add_many(cats)
+    for c in cats:
+        c.name += '!'
+    repo.update_many(cats)
+    assert repo.get_all() == cats
+
+
+def test_update_items(repo):
+    cats = [Category(str(i)) for i in range(5)]
+    repo.add_many(cats)
+    repo.update_items('name', [(cats[0].pk, 'a'), (cats[3].pk, 'b')])
+    assert [c.name for c in repo.get_all()] == ['a', '1', '2', 'b', '4']
+    with pytest.raises(ValueError):
+        repo.update_items('name = 1; --', [(1, 'c')])
+
+
+def test_update_items_rollback(repo):
+    cats = [Category(str(i)) for i in range(2)]
+    repo.add_many(cats)
+    with pytest.raises(RuntimeError):
+        with repo.session():
+            repo.update_items('name', [(cats[0].pk, 'a')])
+            raise RuntimeError
+    assert repo.get(cats[0].pk).name == '0'
+
+
+def test_delete_many(repo):
+    cats = [Category(str(i)) for i in range(5)]
+    repo.add_many(cats)
+    repo.add(Category('child', cats[0].pk))
+    repo.delete_many([cats[0].pk, cats[2].pk])
+    assert repo.get_all() == [cats[1], cats[3], cats[4]]
+
+
+def test_create_from_tree(repo):
+    tree = [('parent', None), ('1', 'parent'), ('2', '1'), ('3', 'parent')]
+    cats = Category.create_from_tree(tree, repo)
+    assert repo.get_all() == sorted(cats, key=lambda c: c.pk)
+    assert {c.name: c.parent for c in cats} == {
+        'parent': None, '1': cats[0].pk, '2': cats[1].pk, '3': cats[0].pk}
+
+
+def test_create_index(expense_repo):
+    expense_repo.create_index('comment', 'amount')
+    expense_repo.create_index('comment', 'amount')
+    indexes = expense_repo.connection_manager.connection().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = 'expense'").fetchall()
+    assert indexes.count(('expense_comment_amount_idx', )) == 1
+
+
+def test_create_index_unknown_column(expense_repo):
+    with pytest.raises(ValueError):
+        expense_repo.create_index('comment) WHERE 1; DROP TABLE expense; --')
+    with pytest.raises(ValueError):
+        expense_repo.create_index()
+
+
+def test_rollup_follows_cascade_delete(repo, expense_repo):
+    con = repo.connection_manager.connection()
+    rollup.install(con)
+    cat = Category('name')
+    repo.add(cat)
+    expense_repo.add_many([Expense(1, cat.pk, date='2024-01-01'),
+                           Expense(2, cat.pk, date='2024-01-02')])
+    assert totals.sum_by_category(con, cat.pk) == 300
+    repo.delete(cat.pk)
+    assert totals.sum_by_category(con) == 0
+
+
+@pytest.mark.parametrize('where, order_by, limit, offset', [
+    (None, None, None, None),
+    ({'name': 'b', 'parent': None}, None, None, None),
+    ({'parent': ('IN', [1, 2]), 'name': ('>=', 'b')}, ('-name', 'pk'), None, None),
+    ({'name': ('LIKE', 'A%')}, ('parent', ), 2, 1),
+    ({'pk': ('BETWEEN', (2, 5)), 'parent': ('!=', None)}, ('-pk', ), None, 1),
+    (None, ('name', '-pk'), 3, None),
+    ({'parent': ('IN', [])}, None, None, None),
+    ({'parent': ('NOT IN', [])}, ('pk', ), None, None),
+    ({'name': ('NOT IN', [])}, None, None, None),
+])
+def test_get_all_matches_memory_repository(repo, where, order_by, limit, offset):
+    memory = MemoryRepository[Category](index_on=('parent', ))
+    data = [('a', None), ('b', None), ('ab', 1), ('b', 1), ('c', 2), ('Ac', 2),
+            ('a', 3)]
+    repo.add_many(Category(name, parent) for name, parent in data)
+    memory.add_many(Category(name, parent) for name, parent in data)
+    assert repo.get_all(where, order_by, limit, offset) == \
+        memory.get_all(where, order_by, limit, offset)
+
+
+def test_select(repo):
+    repo.add_many([Category('a'), Category('b', 1), Category('c', 1)])
+    assert repo.select(('pk', 'name'), {'parent': 1}, ('-name', )) == \
+        [(3, 'c'), (2, 'b')]
+
+
+def test_get_all_rejects_unknown_fields(repo):
+    with pytest.raises(ValueError):
+        repo.get_all({'name; DROP TABLE category': 1})
+    with pytest.raises(ValueError):
+        repo.get_all(order_by=('unknown', ))
+
+
+def test_iter_all(repo):
+    cats = [Category(str(i), i % 2 or None) for i in range(25)]
+    repo.add_many(cats)
+    gen = repo.iter_all(batch_size=4)
+    assert next(gen) == cats[0]
+    assert [cats[0]] + list(gen) == cats
+    assert list(repo.iter_all({'parent': 1}, batch_size=3)) == cats[1::2]
+
+
+def test_page(repo):
+    cats = [Category(str(i)) for i in range(10)]
+    repo.add_many(cats)
+    repo.delete(cats[3].pk)
+    first = repo.page(n=4)
+    assert first == cats[:3] + cats[4:5]
+    assert repo.page(first[-1].pk, 4) == cats[5:9]
+    assert repo.page(cats[-1].pk, 4) == []
+
+
+def test_expense_codecs(expense_repo):
+    con = expense_repo.connection_manager.connection()
+    con.execute("INSERT INTO category (name) VALUES ('name')")
+    spent = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    exp = Expense(decimal.Decimal('12.34'), 1, spent, '2024-01-02')
+    undated = Expense(5, 1, None, '2024-01-03')
+    expense_repo.add_many([exp, undated])
+    assert con.execute("SELECT amount, expense_date FROM expense "
+                       "ORDER BY id").fetchall() == \
+        [(1234, '2024-01-02 03:04:05'), (500, None)]
+    assert expense_repo.get(exp.pk) == exp
+    assert expense_repo.get(undated.pk).expense_date is None
+    assert [e.amount for e in expense_repo.get_all(order_by=('-amount', ))] == \
+        [decimal.Decimal('12.34'), decimal.Decimal('5.00')]
+    assert expense_repo.get_all({'amount': ('>', decimal.Decimal('5.5'))}) == [exp]
+    assert expense_repo.get_all({'expense_date': ('BETWEEN', (
+        spent, spent + datetime.timedelta(days=1)))}) == [exp]
+    expense_repo.update_items('amount', [(exp.pk, decimal.Decimal('0.5'))])
+    assert expense_repo.select(('amount', 'expense_date'), {'pk': exp.pk}) == \
+        [(decimal.Decimal('0.50'), spent)]
@@ -0,0 +1,114 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from bookkeeper.repository import rollup
+from bookkeeper.repository.totals import (period_bounds, subtree_sum,
+                                          subtree_sums, sum_by_category,
+                                          sum_by_periods, sums_by_category)
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(':memory:')
+    con.execute("CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, "
+                "parent INTEGER)")
+    con.execute("CREATE TABLE expense (id INTEGER PRIMARY KEY, amount INTEGER, "
+                "category INTEGER, expense_date TEXT, date TEXT, comment TEXT)")
+    rollup.install(con)
+    yield con
+    con.close()
+
+
+def test_period_bounds():
+    bounds = period_bounds(datetime.date(2024, 12, 31))
+    assert bounds['day'] == ('2024-12-31', '2025-01-01')
+    assert bounds['week'] == ('2024-12-30', '2025-01-06')
+    assert bounds['month'] == ('2024-12-01', '2025-01-01')
+    assert bounds['year'] == ('2024-01-01', '2025-01-01')
+
+
+def test_sum_by_periods(con):
+    con.executemany('INSERT INTO expense (amount, date) VALUES (?, ?)', [
+        (1, '2024-06-06'), (2, '2024-06-06'), (4, '2024-06-01'),
+        (8, '2024-01-01'), (16, '2023-06-06'), (32, '2025-06-06'),
+        (64, None), (128, '2024-06-03')])
+    assert sum_by_periods(con, datetime.date(2024, 6, 6)) == {
+        'day': 3, 'week': 131, 'month': 135, 'year': 143}
+    assert sum_by_periods(con, datetime.date(2022, 1, 1)) == {
+        'day': 0, 'week': 0, 'month': 0, 'year': 0}
+
+
+def test_sum_by_periods_uses_index(con):
+    plan = con.execute(
+        'EXPLAIN QUERY PLAN SELECT SUM(amount) FROM expense_rollup '
+        'WHERE date >= ? AND date < ?', ('2024-01-01', '2025-01-01')).fetchall()
+    assert 'expense_rollup_date_idx' in plan[0][-1]
+
+
+def test_sum_by_category(con):
+    con.executemany('INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)',
+                    [(1, 1, '2024-01-01'), (2, 1, '2024-01-02'), (4, 2, None)])
+    assert sum_by_category(con) == 7
+    assert sum_by_category(con, 1) == 3
+    assert sum_by_category(con, 3) == 0
+    assert sums_by_category(con) == {1: 3, 2: 4}
+
+
+def raw_rollup(con):
+    return con.execute(
+        "SELECT COALESCE(category, 0), COALESCE(date, ''), SUM(amount), COUNT(*) "
+        "FROM expense GROUP BY 1, 2 ORDER BY 1, 2").fetchall()
+
+
+def stored_rollup(con):
+    return con.execute(
+        'SELECT * FROM expense_rollup ORDER BY category, date').fetchall()
+
+
+def test_rollup_follows_writes(con):
+    con.executemany('INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)',
+                    [(1, 1, '2024-01-01'), (2, 1, '2024-01-01'), (4, 2, '2024-01-02')])
+    assert stored_rollup(con) == raw_rollup(con)
+    con.execute("UPDATE expense SET amount = 10, category = 2 WHERE id = 1")
+    assert stored_rollup(con) == raw_rollup(con)
+    con.execute("UPDATE expense SET comment = 'test'")
+    con.execute("DELETE FROM expense WHERE id = 2")
+    assert stored_rollup(con) == raw_rollup(con)
+    con.execute("DELETE FROM expense")
+    assert stored_rollup(con) == []
+
+
+def test_install_fills_existing_expenses():
+    con = sqlite3.connect(':memory:')
+    con.execute("CREATE TABLE expense (id INTEGER PRIMARY KEY, amount INTEGER, "
+                "category INTEGER, expense_date TEXT, date TEXT, comment TEXT)")
+    con.execute("INSERT INTO expense (amount, category, date) "
+                "VALUES (5, 1, '2024-01-01')")
+    rollup.install(con)
+    rollup.install(con)
+    assert stored_rollup(con) == [(1, '2024-01-01', 5, 1)]
+
+
+def test_rebuild(con):
+    con.execute("INSERT INTO expense (amount, category, date) "
+                "VALUES (5, 1, '2024-01-01')")
+    con.execute("UPDATE expense_rollup SET amount = 0")
+    rollup.rebuild(con)
+    assert stored_rollup(con) == raw_rollup(con)
+
+
+def test_subtree_sums(con):
+    # 1 -> 2 -> 3, 1 -> 4, 5
+    con.executemany('INSERT INTO category (id, name, parent) VALUES (?, ?, ?)',
+                    [(1, 'a', None), (2, 'b', 1), (3, 'c', 2), (4, 'd', 1),
+                     (5, 'e', None)])
+    con.executemany('INSERT INTO expense (amount, category, date) VALUES (?, ?, ?)',
+                    [(1, 1, '2024-01-01'), (2, 2, '2024-01-01'), (4, 3, '2024-01-02'),
+                     (8, 4, '2024-01-01'), (16, 5, '2024-01-01'), (32, 3, None)])
+    expected = {1: 47, 2: 38, 3: 36, 4: 8, 5: 16}
+    assert subtree_sums(con) == expected
+    for pk, amount in expected.items():
+        assert subtree_sum(con, pk) == amount
+    assert subtree_sum(con, 100) == 0
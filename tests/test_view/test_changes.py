@@ -0,0 +1,52 @@
+import pytest
+
+from bookkeeper.view.changes import Change, ChangeJournal
+
+
+@pytest.fixture
+def journal():
+    return ChangeJournal()
+
+
+def test_update_keeps_newest_value(journal):
+    journal.update(1, Change('update', 1, 'amount', '10'))
+    journal.update(1, Change('update', 1, 'comment', 'a'))
+    journal.update(1, Change('update', 1, 'amount', '20'))
+    assert [(c.col, c.new_value) for c in journal.batch()] == \
+        [('amount', '20'), ('comment', 'a')]
+
+
+def test_delete_drops_updates(journal):
+    journal.update(1, Change('update', 1, 'amount', '10'))
+    journal.update(2, Change('update', 2, 'amount', '10'))
+    journal.delete(1, Change('delete', 1))
+    assert [(c.operator, c.row) for c in journal.batch()] == \
+        [('update', 2), ('delete', 1)]
+
+
+def test_add_then_delete_collapses(journal):
+    journal.add(-1, Change('add', -1, 'date', '2024-01-01'))
+    journal.update(-1, Change('update', -1, 'amount', '10'))
+    assert journal.is_added(-1)
+    journal.delete(-1, Change('delete', -1))
+    assert journal.batch() == []
+    assert len(journal) == 0
+
+
+def test_delete_uses_saved_value(journal):
+    item = object()
+    journal.update(item, Change('update', new_value='b', old_value='a'))
+    journal.update(item, Change('update', new_value='c', old_value='b'))
+    assert journal.batch()[0].old_value == 'a'
+    journal.delete(item, Change('delete', old_value='c'))
+    assert [(c.operator, c.old_value) for c in journal.batch()] == \
+        [('delete', 'a')]
+
+
+def test_discard_and_clear(journal):
+    journal.add('x', Change('add', new_value='x'))
+    journal.add('y', Change('add', new_value='y', old_value='x'))
+    journal.discard('y')
+    assert [c.new_value for c in journal] == ['x']
+    journal.clear()
+    assert journal.batch() == []